@@ -0,0 +1,84 @@
+"""
+Micro-benchmark du moteur de parsing des tableaux (_parse_table, specs VDA 4932 et Faurecia)
+Mesure le débit en lignes/seconde sur des tableaux synthétiques avec de longues listes de codes.
+
+Usage :
+    python benchmarks/bench_row_classifier.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from extract_edi_adaptive import AdaptiveEDIExtractor
+
+
+def make_vda_table(elements: int, codes_per_element: int):
+    """Tableau VDA 4932 : 'CODE Description' | Format | Exemple | Usage (+ suites d'usage)"""
+    table = [["S.Format Description", "Format", "Example", "Usage"]]
+    for idx in range(elements):
+        if idx % 5 == 0:
+            table.append([f"C{100 + idx % 900:03d} Composite {idx}", "M", "", "--"])
+        table.append([f"{1000 + idx % 9000:04d} Data element {idx} M C", "M an..35", f"+V{idx}", f"'{idx % 1000:03d}'= Meaning {idx}"])
+        for code in range(codes_per_element):
+            table.append(["", "", "", f"'{code:03d}'= Qualifier meaning {code}"])
+    return table
+
+
+def make_faurecia_table(elements: int, codes_per_element: int):
+    """Tableau Faurecia : en-tête 'Segment:' puis Code | Description | . | . | Format | . | Valeur | Usage"""
+    table = [["Segment: NAD", "Pos.: 14 Level: 1", "", "", "", "", "", "Name and address"]]
+    for idx in range(elements):
+        if idx % 5 == 0:
+            table.append([f"C{100 + idx % 900:03d}", f"Composite {idx}", "M", "", "", "", "", ""])
+        table.append([f"{1000 + idx % 9000:04d}", f"Data element {idx} M C", "M", "", "M  an..35", "", f"+V{idx}", f"{idx % 1000:03d} = Meaning"])
+        for code in range(codes_per_element):
+            table.append(["", "", "", "", "", "", "", f"{code:03d} = Qualifier meaning {code}"])
+    return table
+
+
+def bench(label: str, parse, table, repeat: int):
+    """Exécute le parseur `repeat` fois et affiche le débit"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(table)
+        best = min(best, time.perf_counter() - start)
+    rows = len(table)
+    print(f"{label:<28} {rows:>8} lignes  {best * 1000:>9.2f} ms  {rows / best:>12,.0f} lignes/s")
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark des parseurs de tableaux EDI")
+    parser.add_argument("--elements", type=int, default=200, help="éléments par tableau (défaut : 200)")
+    parser.add_argument("--codes", type=int, default=20, help="lignes de codes par élément (défaut : 20)")
+    parser.add_argument("--repeat", type=int, default=5, help="répétitions, meilleur temps retenu (défaut : 5)")
+    args = parser.parse_args()
+
+    vda_table = make_vda_table(args.elements, args.codes)
+    faurecia_table = make_faurecia_table(args.elements, args.codes)
+
+    def parse_vda(table):
+        extractor = AdaptiveEDIExtractor("bench.pdf")
+        extractor.pdf_format = "vda4932"
+        extractor.model.open_segment("NAD", "")
+        extractor._parse_table(table, 1)
+
+    def parse_faurecia(table):
+        extractor = AdaptiveEDIExtractor("bench.pdf")
+        extractor.pdf_format = "faurecia"
+        extractor._parse_table(table, 1)
+
+    print(f"{'='*70}")
+    print("MICRO-BENCHMARK PARSEURS DE TABLEAUX")
+    print(f"{'='*70}")
+    bench("VDA 4932 (_parse_table)", parse_vda, vda_table, args.repeat)
+    bench("Faurecia (_parse_table)", parse_faurecia, faurecia_table, args.repeat)
+    print(f"{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark du validateur EDIFACT (edi_validate, guides exportés)
+Mesure le débit en messages/seconde sur un interchange INVOIC synthétique (un cœur),
+puis sur plusieurs fichiers répartis entre processus.
+
+Usage :
+    python benchmarks/bench_validator.py [--messages N] [--lines N] [--jobs N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_validate import MessageValidator, validate_files
+
+EXPORT = Path(__file__).resolve().parent.parent / "export" / "Faurecia_EDI_Guideline_INVOIC_D96A_V2R6.json"
+
+
+def make_message(reference: int, lines: int) -> str:
+    """Message INVOIC : en-tête, `lines` lignes d'articles, totaux"""
+    segments = [
+        f"UNH+{reference}+INVOIC:D:96A:UN:A14051",
+        f"BGM+380+{9010200000 + reference}+9",
+        "DTM+137:20170324:102",
+        "NAD+BY+0931071502397::10++FAURECIA INTERIOR+12 RUE EMILE ZOLA+MERU++60114+FR",
+        "NAD+SE+0004711::92++SUPPLIER GMBH+INDUSTRIESTRASSE 1+KOELN++50667+DE",
+        "CUX+2:EUR:4",
+    ]
+    for line in range(1, lines + 1):
+        segments += [
+            f"LIN+{line}++4711{line:06d}:IN",
+            f"QTY+47:{line * 10}:PCE",
+            f"MOA+203:{line * 32.28:.2f}",
+            "PRI+AAA:3.228",
+            f"RFF+ON:PO{reference:08d}",
+        ]
+    segments += ["UNS+S", "MOA+79:3897.66", "MOA+77:4677.19", "TAX+7+VAT++:::20"]
+    segments.append(f"UNT+{len(segments) + 1}+{reference}")
+    return "'\n".join(segments) + "'\n"
+
+
+def make_interchange(messages: int, lines: int) -> str:
+    body = "".join(make_message(reference, lines) for reference in range(1, messages + 1))
+    return ("UNA:+.? '\nUNB+UNOA:3+SENDER+RECEIVER+170325:2242+0010753'\n"
+            f"{body}UNZ+{messages}+0010753'\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark du validateur EDIFACT")
+    parser.add_argument("--messages", type=int, default=2000, help="messages par interchange (défaut : 2000)")
+    parser.add_argument("--lines", type=int, default=10, help="lignes d'articles par message (défaut : 10)")
+    parser.add_argument("--jobs", type=int, default=4, help="processus pour la mesure multi-fichiers (défaut : 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions, meilleur temps retenu (défaut : 3)")
+    args = parser.parse_args()
+
+    validator = MessageValidator.from_export(EXPORT)
+    data = make_interchange(args.messages, args.lines)
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = validator.validate(data)
+        best = min(best, time.perf_counter() - start)
+    invalid = sum(1 for result in results if not result["valid"])
+    print(f"{'1 cœur':<14} {len(results):>8} messages  {best * 1000:>9.2f} ms  "
+          f"{len(results) / best:>12,.0f} messages/s  ({invalid} invalide(s))")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for index in range(args.jobs * 4):
+            path = Path(tmp) / f"interchange_{index}.edi"
+            path.write_text(data, encoding="latin-1")
+            files.append(path)
+        for jobs in (1, args.jobs):
+            start = time.perf_counter()
+            messages = sum(report["messages"] for report in validate_files(EXPORT, files, jobs=jobs))
+            duration = time.perf_counter() - start
+            print(f"{f'{jobs} processus':<14} {messages:>8} messages  {duration * 1000:>9.2f} ms  "
+                  f"{messages / duration:>12,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Suite de benchmarks de l'extracteur EDI (hors ligne, guides synthétiques)
+
+Étapes mesurées pour chaque scénario :
+    pdf_open, text_extraction, table_extraction, table_extraction_words (scénarios PDF,
+    moteur par mots de edi_words), format_detection, parsing, add_standard_descriptions,
+    get_statistics, save_to_json
+
+Les temps sont comparés à benchmarks/baseline.json, normalisés par une mesure de
+calibration CPU prise juste avant chaque scénario : toute étape plus lente que la
+tolérance fait échouer la suite.
+
+Usage :
+    python benchmarks/run_benchmarks.py                    # compare au baseline
+    python benchmarks/run_benchmarks.py --update-baseline  # enregistre un nouveau baseline
+    python benchmarks/run_benchmarks.py --quick            # scénarios réduits
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic
+from edi_raw_store import StoredSession
+from edi_rows import FORMAT_SPECS
+from edi_words import WordTableEngine
+from extract_edi_adaptive import AdaptiveEDIExtractor, PDFSession, _region_tables
+
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+# Scénarios : (source, format, pages de spécification, pages annexes, suites d'usage par élément)
+SCENARIOS = {
+    "pdf_faurecia": ("pdf", "faurecia", 20, 8, 3),
+    "pdf_vda4932": ("pdf", "vda4932", 20, 8, 3),
+    "raw_faurecia": ("raw", "faurecia", 600, 0, 6),
+    "raw_vda4932": ("raw", "vda4932", 600, 0, 6),
+}
+QUICK_SCALE = 4  # --quick : divise le nombre de pages
+
+
+def calibrate() -> float:
+    """Charge CPU fixe (regex, dict, json) servant à normaliser les temps entre machines"""
+    pattern = re.compile(r'^([SC]?\d{3,4})\s+(.+)$')
+    start = time.perf_counter()
+    total = 0
+    for idx in range(20000):
+        match = pattern.match(f"{1000 + idx % 9000} Data element {idx}")
+        record = {"champ": match.group(1), "description": match.group(2), "usage": str(idx)}
+        total += len(json.dumps(record))
+    return time.perf_counter() - start
+
+
+def _timed(timings: Dict[str, float], stage: str, func: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = func()
+    timings[stage] = time.perf_counter() - start
+    return result
+
+
+def run_scenario(source: str, fmt: str, spec_pages: int, filler_pages: int, codes: int,
+                 work_dir: Path) -> Dict[str, float]:
+    """Exécute un scénario et retourne le temps de chaque étape (secondes)"""
+    guideline = synthetic.make_guideline(fmt, spec_pages, filler_pages, codes)
+    timings: Dict[str, float] = {}
+
+    if source == "pdf":
+        pdf_path = synthetic.write_pdf(guideline, work_dir / f"{fmt}.pdf")
+        session = PDFSession(pdf_path)
+        page_count = _timed(timings, "pdf_open", lambda: session.open().page_count)
+        _timed(timings, "text_extraction", lambda: [session.page_text(i) for i in range(page_count)])
+        # Tableaux des seules pages qualifiées par le préfiltre, comme lors du parsing
+        marker = FORMAT_SPECS[fmt].page_marker
+        qualified = [i for i in range(page_count) if marker.search(session.page_text(i))]
+        tables = _timed(timings, "table_extraction", lambda: [session.page_region_tables(i, fmt) for i in qualified])
+        engine = WordTableEngine()
+        word_tables = _timed(timings, "table_extraction_words", lambda: [
+            _region_tables(session.page(i), FORMAT_SPECS[fmt], engine) for i in qualified
+        ])
+        if word_tables != tables or engine.stats["pages_fallback"]:
+            raise AssertionError(f"Moteur par mots : tableaux différents ou replis ({engine.stats})")
+    else:
+        session = StoredSession(f"{fmt}.pdf", synthetic.raw_pages(guideline))
+
+    extractor = AdaptiveEDIExtractor(f"{fmt}.pdf", session=session)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.pdf_format = _timed(timings, "format_detection", extractor.detect_pdf_format)
+            _timed(timings, "parsing", extractor.extract_format)
+            _timed(timings, "add_standard_descriptions", extractor.add_standard_descriptions)
+            stats = _timed(timings, "get_statistics", extractor.get_statistics)
+            _timed(timings, "save_to_json", lambda: extractor.save_to_json(str(work_dir / f"{fmt}.json")))
+    finally:
+        session.close()
+
+    # Un benchmark rapide mais faux ne vaut rien : vérifier le résultat
+    if extractor.pdf_format != fmt:
+        raise AssertionError(f"Format détecté {extractor.pdf_format}, attendu {fmt}")
+    expected = synthetic.expected_statistics(guideline)
+    actual = {key: stats[key] for key in expected}
+    if actual != expected:
+        raise AssertionError(f"Statistiques inattendues: {actual} != {expected}")
+
+    return timings
+
+
+def run_suite(quick: bool = False, repeat: int = 3, names=None) -> Dict[str, Any]:
+    """Exécute les scénarios (tous par défaut), meilleur temps sur `repeat` exécutions"""
+    results: Dict[str, Any] = {"calibration": {}, "scenarios": {}, "quick": quick}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (source, fmt, spec_pages, filler_pages, codes) in SCENARIOS.items():
+            if names is not None and name not in names:
+                continue
+            if quick:
+                spec_pages, filler_pages = max(1, spec_pages // QUICK_SCALE), filler_pages // QUICK_SCALE
+            # Calibration au plus près du scénario (machines partagées, fréquence variable)
+            results["calibration"][name] = min(calibrate() for _ in range(repeat))
+            best: Dict[str, float] = {}
+            for _ in range(repeat):
+                for stage, seconds in run_scenario(source, fmt, spec_pages, filler_pages, codes, Path(tmp)).items():
+                    best[stage] = min(seconds, best.get(stage, float("inf")))
+            results["scenarios"][name] = best
+    return results
+
+
+def _scale(results: Dict[str, Any], baseline: Dict[str, Any], name: str) -> float:
+    """Rapport de vitesse machine actuelle / machine du baseline pour un scénario"""
+    return results["calibration"][name] / baseline["calibration"][name]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_delta: float) -> list:
+    """Liste des régressions (scénario, étape, temps mesuré, temps attendu)"""
+    regressions = []
+    for name, stages in results["scenarios"].items():
+        for stage, seconds in stages.items():
+            reference = baseline["scenarios"].get(name, {}).get(stage)
+            if reference is None:
+                continue
+            expected = reference * _scale(results, baseline, name)
+            if seconds > expected * (1 + tolerance) and seconds - expected > min_delta:
+                regressions.append((name, stage, seconds, expected))
+    return regressions
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+    print(f"{'='*70}")
+    print("BENCHMARKS EXTRACTEUR EDI")
+    print(f"{'='*70}")
+    for name, stages in results["scenarios"].items():
+        scale = _scale(results, baseline, name) if baseline else None
+        print(f"\n{name} (calibration {results['calibration'][name] * 1000:.1f} ms)")
+        for stage, seconds in stages.items():
+            line = f"   {stage:<27} {seconds * 1000:>10.2f} ms"
+            reference = baseline["scenarios"].get(name, {}).get(stage) if baseline else None
+            if reference:
+                line += f"   (baseline {reference * scale * 1000:>9.2f} ms, x{seconds / (reference * scale):.2f})"
+            print(line)
+    print(f"\n{'='*70}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de l'extracteur EDI")
+    parser.add_argument("--update-baseline", action="store_true", help="enregistrer les temps comme baseline")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="fichier baseline")
+    parser.add_argument("--quick", action="store_true", help="scénarios réduits (non comparés au baseline)")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions, meilleur temps retenu (défaut : 3)")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="ralentissement toléré par étape (défaut : 1.0 = +100%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="écart absolu minimal en secondes pour signaler une régression (défaut : 0.005)")
+    parser.add_argument("--json", help="écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    results = run_suite(quick=args.quick, repeat=args.repeat)
+    baseline_path = Path(args.baseline)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=4), encoding="utf-8")
+
+    if args.update_baseline:
+        if args.quick:
+            parser.error("--update-baseline est incompatible avec --quick")
+        baseline_path.write_text(json.dumps(results, indent=4) + "\n", encoding="utf-8")
+        print_results(results)
+        print(f"✓ Baseline enregistré: {baseline_path}")
+        return 0
+
+    baseline = None
+    if not args.quick and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print_results(results, baseline)
+
+    if baseline is None:
+        print("⚠️  Pas de comparaison au baseline" + (" (mode --quick)" if args.quick else ""))
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        # Confirmer avant d'échouer : un pic de charge de la machine ne doit pas suffire
+        suspects = sorted({name for name, _, _, _ in regressions})
+        print(f"⚠️  Ralentissement suspect ({', '.join(suspects)}), nouvelle mesure...")
+        retry = run_suite(quick=args.quick, repeat=max(args.repeat, 5), names=suspects)
+        for name in suspects:
+            retry_scale = _scale(retry, baseline, name)
+            for stage, seconds in retry["scenarios"][name].items():
+                # Garder la mesure la plus favorable, exprimée à l'échelle de la première calibration
+                normalized = seconds * _scale(results, baseline, name) / retry_scale
+                results["scenarios"][name][stage] = min(results["scenarios"][name][stage], normalized)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+
+    if regressions:
+        print("❌ RÉGRESSIONS DE PERFORMANCE:")
+        for name, stage, seconds, expected in regressions:
+            print(f"   {name}/{stage}: {seconds * 1000:.2f} ms (attendu ≤ {expected * (1 + args.tolerance) * 1000:.2f} ms)")
+        return 1
+
+    print("✅ Aucune régression de performance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
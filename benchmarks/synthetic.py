@@ -0,0 +1,316 @@
+"""
+Générateurs de guides EDI synthétiques pour les benchmarks
+- Guides Faurecia (tableaux 8 colonnes, en-tête "Segment: XXX Pos.: N Level: N")
+- Guides VDA 4932 (ligne "Segment: XXX Cons. No.: N Level: N" + tableaux 4 colonnes)
+- Sorties : PDF (écrit à la main, sans dépendance) ou pages brutes {"text", "tables"}
+  au format de edi_raw_store (fixtures de parsing sans PDF)
+
+Tout est déterministe pour une graine donnée.
+"""
+
+import random
+from itertools import product
+from pathlib import Path
+from string import ascii_uppercase
+from typing import List, Dict, Any, Optional
+
+
+FORMATS = ("faurecia", "vda4932")
+
+# Dimensions de page (points PDF) : paysage A4 pour les 8 colonnes Faurecia
+PAGE_SIZES = {"faurecia": (842, 595), "vda4932": (595, 842)}
+COLUMN_WIDTHS = {
+    "faurecia": [40, 160, 24, 24, 70, 24, 90, 340],
+    "vda4932": [190, 70, 80, 195],
+}
+MARGIN = 30
+ROW_HEIGHT = 11
+FONT_SIZE = 6.5
+
+SEGMENT_NAMES = [
+    "Beginning of message", "Date/time/period", "Reference", "Name and address",
+    "Contact information", "Duty/tax/fee details", "Currencies", "Payment terms basis",
+    "Monetary amount", "Line item", "Additional product id", "Item description",
+    "Quantity", "Price details", "Free text", "Measurements",
+]
+WORDS = ["party", "qualifier", "identification", "code", "list", "agency", "number",
+         "date", "amount", "currency", "reference", "name", "street", "city", "type"]
+
+FILLER_LINES = [
+    "Table of contents", "Change history", "Introduction", "Message structure",
+    "Branching diagram", "Appendix", "Examples of messages", "Version notes",
+]
+
+
+def _segment_codes():
+    """Codes segment uniques : XAA, XAB, ... (jamais en conflit avec les vrais segments)"""
+    for first, second, third in product("XYZ", ascii_uppercase, ascii_uppercase):
+        yield first + second + third
+
+
+def make_guideline(fmt: str, spec_pages: int, filler_pages: int = 0, codes_per_element: int = 3,
+                   seed: int = 0) -> Dict[str, Any]:
+    """Modèle logique d'un guide : une page de spécification par segment, plus des pages annexes"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt}")
+
+    rnd = random.Random(seed)
+    usable_rows = (PAGE_SIZES[fmt][1] - 2 * MARGIN - 3 * ROW_HEIGHT) // ROW_HEIGHT
+    codes = _segment_codes()
+    segments = []
+
+    for pos in range(1, spec_pages + 1):
+        items, rows_used = [], 2  # en-tête de segment / de colonnes
+        while True:
+            is_group = rnd.random() < 0.3
+            children = rnd.randint(1, 4) if is_group else 1
+            need = (1 if is_group else 0) + children * (1 + codes_per_element)
+            if rows_used + need > usable_rows:
+                break
+            rows_used += need
+
+            elements = []
+            for _ in range(children):
+                qualifiers = [f"{rnd.randint(1, 999):03d}" for _ in range(codes_per_element + 1)]
+                elements.append({
+                    "code": f"{rnd.randint(1000, 9999)}",
+                    "description": " ".join(rnd.sample(WORDS, 2)).capitalize(),
+                    "status": rnd.choice("MC"),
+                    "format": f"an..{rnd.choice([3, 6, 17, 35])}",
+                    "value": f"+{qualifiers[0]}" if rnd.random() < 0.7 else "",
+                    "codes": qualifiers,
+                })
+            if is_group:
+                items.append({
+                    "group": f"C{rnd.randint(100, 999)}",
+                    "description": " ".join(rnd.sample(WORDS, 2)).capitalize(),
+                    "elements": elements,
+                })
+            else:
+                items.extend(elements)
+
+        # Éléments simples avant les groupes : un élément qui suit un groupe
+        # est rattaché à ce groupe par les parseurs
+        items.sort(key=lambda item: "group" in item)
+        segments.append({
+            "code": next(codes),
+            "pos": pos,
+            "description": rnd.choice(SEGMENT_NAMES),
+            "items": items,
+        })
+
+    # Pages annexes réparties dans le document (couverture, sommaire, historique...)
+    layout: List[Optional[int]] = list(range(len(segments)))
+    for _ in range(filler_pages):
+        layout.insert(rnd.randint(0, len(layout)), None)
+
+    return {"format": fmt, "segments": segments, "layout": layout, "seed": seed}
+
+
+def expected_statistics(guideline: Dict[str, Any]) -> Dict[str, int]:
+    """Statistiques attendues de l'extraction (mêmes clés que get_statistics)"""
+    stats = {"segments": len(guideline["segments"]), "simple_elements": 0, "groups": 0,
+             "elements_in_groups": 0}
+    for segment in guideline["segments"]:
+        for item in segment["items"]:
+            if "group" in item:
+                stats["groups"] += 1
+                stats["elements_in_groups"] += len(item["elements"])
+            else:
+                stats["simple_elements"] += 1
+    return stats
+
+
+def _element_rows(fmt: str, element: Dict[str, Any]) -> List[List[str]]:
+    """Ligne d'un élément suivie de ses suites d'usage (une valeur de code par ligne)"""
+    code_list = element["codes"]
+    if fmt == "faurecia":
+        rows = [[element["code"], element["description"], element["status"], "1",
+                 f"{element['status']} {element['format']}", "", element["value"],
+                 f"{code_list[0]} = Meaning {code_list[0]}"]]
+        rows += [["", "", "", "", "", "", "", f"{code} = Meaning {code}"] for code in code_list[1:]]
+    else:
+        rows = [[f"{element['code']} {element['description']}",
+                 f"{element['status']} {element['format']}", element["value"],
+                 f"'{code_list[0]}'= Meaning {code_list[0]}"]]
+        rows += [["", "", "", f"'{code}'= Meaning {code}"] for code in code_list[1:]]
+    return rows
+
+
+def segment_table(fmt: str, segment: Dict[str, Any]) -> List[List[str]]:
+    """Tableau (liste de lignes) d'un segment, tel que extract_tables() le restitue"""
+    if fmt == "faurecia":
+        rows = [["", f"Segment: {segment['code']}", "", "", "", "", f"Pos.: {segment['pos']} Level: 1",
+                 segment["description"]],
+                ["Tag", "Name", "S", "R", "Repr.", "", "Value", "Usage"]]
+    else:
+        rows = [["S.Format Description", "Format", "Example", "Usage"]]
+
+    for item in segment["items"]:
+        if "group" in item:
+            if fmt == "faurecia":
+                rows.append([item["group"], item["description"], "M", "1", "", "", "", ""])
+            else:
+                rows.append([f"{item['group']} {item['description']}", "M", "", "--"])
+            for element in item["elements"]:
+                rows += _element_rows(fmt, element)
+        else:
+            rows += _element_rows(fmt, item)
+    return rows
+
+
+def _segment_title(fmt: str, segment: Dict[str, Any]) -> Optional[str]:
+    """Ligne de titre au-dessus du tableau (VDA uniquement)"""
+    if fmt == "vda4932":
+        return f"Segment: {segment['code']} Cons. No.: {segment['pos']} Level: 1 {segment['description']}"
+    return None
+
+
+def _filler_text(page_num: int) -> List[str]:
+    return [f"EDIFACT INVOIC D96A - {FILLER_LINES[page_num % len(FILLER_LINES)]}"] + [
+        f"{idx}. Section {idx} ............................................ {page_num + idx}"
+        for idx in range(1, 25)
+    ]
+
+
+def raw_pages(guideline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pages brutes {"text", "tables"} (fixture de parsing, format edi_raw_store)"""
+    fmt = guideline["format"]
+    pages = []
+    for page_num, segment_idx in enumerate(guideline["layout"]):
+        if segment_idx is None:
+            pages.append({"text": "\n".join(_filler_text(page_num)), "tables": []})
+            continue
+        segment = guideline["segments"][segment_idx]
+        table = segment_table(fmt, segment)
+        lines = [title for title in [_segment_title(fmt, segment)] if title]
+        lines += [" ".join(cell for cell in row if cell) for row in table]
+        pages.append({"text": "\n".join(lines), "tables": [table]})
+    return pages
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _fit(text: str, width: float) -> str:
+    """Tronque un texte pour qu'il tienne dans la cellule (largeur moyenne Helvetica)"""
+    max_chars = int((width - 4) / (FONT_SIZE * 0.6))
+    return text[:max_chars]
+
+
+def _page_content(fmt: str, page_num: int, segment: Optional[Dict[str, Any]]) -> bytes:
+    """Flux de contenu d'une page : texte + tableau tracé (lignes) pour la détection pdfplumber"""
+    width, height = PAGE_SIZES[fmt]
+    ops = ["0.5 w"]
+
+    def text_at(x, y, text):
+        ops.append(f"BT /F1 {FONT_SIZE} Tf {x:.2f} {y:.2f} Td {_pdf_string(text)} Tj ET")
+
+    top = height - MARGIN
+    text_at(MARGIN, top, "EDIFACT INVOIC D96A - Synthetic guideline")
+    top -= 2 * ROW_HEIGHT
+
+    if segment is None:
+        for line in _filler_text(page_num):
+            text_at(MARGIN, top, line)
+            top -= ROW_HEIGHT
+        return "\n".join(ops).encode("latin-1")
+
+    title = _segment_title(fmt, segment)
+    if title:
+        text_at(MARGIN, top, title)
+    top -= ROW_HEIGHT
+
+    rows = segment_table(fmt, segment)
+    col_widths = COLUMN_WIDTHS[fmt]
+    table_width = sum(col_widths)
+    bottom = top - len(rows) * ROW_HEIGHT
+
+    # Lignes horizontales puis verticales
+    for row_idx in range(len(rows) + 1):
+        y = top - row_idx * ROW_HEIGHT
+        ops.append(f"{MARGIN} {y:.2f} m {MARGIN + table_width} {y:.2f} l S")
+    x = MARGIN
+    for col_width in col_widths + [0]:
+        ops.append(f"{x} {top:.2f} m {x} {bottom:.2f} l S")
+        x += col_width
+
+    for row_idx, row in enumerate(rows):
+        y = top - (row_idx + 1) * ROW_HEIGHT + 3
+        x = MARGIN
+        for cell, col_width in zip(row, col_widths):
+            if cell:
+                text_at(x + 2, y, _fit(cell, col_width))
+            x += col_width
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(guideline: Dict[str, Any], output_path: Path) -> Path:
+    """Écrit le guide sous forme de PDF minimal (police Helvetica standard, sans dépendance)"""
+    fmt = guideline["format"]
+    width, height = PAGE_SIZES[fmt]
+    page_total = len(guideline["layout"])
+
+    # Objets : 1 catalogue, 2 arbre des pages, 3 police, puis (page, contenu) par page
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    for page_num, segment_idx in enumerate(guideline["layout"]):
+        page_id, content_id = 4 + 2 * page_num, 5 + 2 * page_num
+        segment = guideline["segments"][segment_idx] if segment_idx is not None else None
+        content = _page_content(fmt, page_num, segment)
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {page_total} >>".encode("latin-1")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = {}
+        for obj_id in sorted(objects):
+            offsets[obj_id] = f.tell()
+            f.write(b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n")
+        xref_offset = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for obj_id in sorted(objects):
+            f.write(b"%010d 00000 n \n" % offsets[obj_id])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return output_path
+
+
+def main():
+    """Génère un guide synthétique (PDF et/ou fixture JSON)"""
+    import argparse
+    import gzip
+    import json
+
+    parser = argparse.ArgumentParser(description="Génère un guide EDI synthétique")
+    parser.add_argument("format", choices=FORMATS)
+    parser.add_argument("output", help="fichier .pdf, .json ou .json.gz (pages brutes)")
+    parser.add_argument("--pages", type=int, default=20, help="pages de spécification (défaut : 20)")
+    parser.add_argument("--filler", type=int, default=0, help="pages annexes sans segment (défaut : 0)")
+    parser.add_argument("--codes", type=int, default=3, help="suites d'usage par élément (défaut : 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    guideline = make_guideline(args.format, args.pages, args.filler, args.codes, args.seed)
+    if args.output.endswith(".pdf"):
+        write_pdf(guideline, Path(args.output))
+    else:
+        document = {"version": 1, "source": Path(args.output).name, "pages": raw_pages(guideline)}
+        opener = gzip.open if args.output.endswith(".gz") else open
+        with opener(args.output, "wt", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False)
+    print(f"✓ Guide synthétique {args.format} ({len(guideline['layout'])} pages): {args.output}")
+
+
+if __name__ == "__main__":
+    main()
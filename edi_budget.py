@@ -0,0 +1,156 @@
+"""
+Budgets de temps et de mémoire de l'extraction
+- Par page : durée maximale (interruption par SIGALRM, Unix) et nombre maximal d'objets
+  de mise en page (caractères, traits, courbes...) avant la détection des tableaux
+- Par document : durée maximale (vérifiée entre deux pages) et mémoire maximale du processus
+  d'extraction (appliquée aux seuls workers, jamais au processus appelant)
+- Une page hors budget est ignorée et signalée ; un document hors budget est en échec
+- Pools de processus recyclés après N documents (mémoire rendue au système)
+"""
+
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from edi_metrics import logger
+
+try:
+    import resource
+except ImportError:  # Windows : pas de limite mémoire par processus
+    resource = None
+
+
+class BudgetExceeded(Exception):
+    """Budget de temps ou de mémoire dépassé"""
+
+
+class PageBudgetExceeded(BudgetExceeded):
+    """Page trop lourde ou trop longue à analyser (page ignorée)"""
+
+
+class DocumentBudgetExceeded(BudgetExceeded):
+    """Document trop long à extraire (extraction abandonnée)"""
+
+
+class Budget:
+    """Limites d'une extraction (None : pas de limite)
+
+    page_seconds     : durée maximale de l'analyse d'une page
+    page_objects     : objets de mise en page au-delà desquels les tableaux ne sont pas cherchés
+    document_seconds : durée maximale de l'extraction d'un document
+    memory_mb        : mémoire maximale (espace d'adressage) d'un processus d'extraction
+    """
+
+    def __init__(self, page_seconds: Optional[float] = None, page_objects: Optional[int] = None,
+                 document_seconds: Optional[float] = None, memory_mb: Optional[int] = None):
+        self.page_seconds = page_seconds
+        self.page_objects = page_objects
+        self.document_seconds = document_seconds
+        self.memory_mb = memory_mb
+
+    def check_objects(self, page_num: int, count: int):
+        """Refuse une page dont le nombre d'objets dépasse le budget"""
+        if self.page_objects is not None and count > self.page_objects:
+            raise PageBudgetExceeded(f"page {page_num}: {count} objets de mise en page (max {self.page_objects})")
+
+    def check_document(self, started: float):
+        """Abandonne un document dont la durée dépasse le budget (started : time.perf_counter())"""
+        if self.document_seconds is not None:
+            elapsed = time.perf_counter() - started
+            if elapsed > self.document_seconds:
+                raise DocumentBudgetExceeded(
+                    f"extraction interrompue après {elapsed:.1f}s (max {self.document_seconds:g}s)"
+                )
+
+    def to_dict(self):
+        return {"page_seconds": self.page_seconds, "page_objects": self.page_objects,
+                "document_seconds": self.document_seconds, "memory_mb": self.memory_mb}
+
+
+def _alarm_available() -> bool:
+    return hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def page_time_limit(seconds: Optional[float], page_num: int):
+    """Interrompt l'analyse d'une page au-delà de `seconds` (sans effet hors Unix ou hors thread principal)"""
+    if not seconds or not _alarm_available():
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PageBudgetExceeded(f"page {page_num}: analyse interrompue après {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def apply_memory_limit(memory_mb: Optional[int]) -> bool:
+    """Plafonne l'espace d'adressage du processus courant (MemoryError au-delà) ; False si non supporté
+
+    Limite définitive : à n'appeler que dans un worker (voir make_process_pool).
+    """
+    if not memory_mb:
+        return False
+    if resource is None or not hasattr(resource, "RLIMIT_AS"):
+        logger.debug("   Limite mémoire non supportée sur cette plateforme")
+        return False
+    limit = memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return True
+
+
+# max_tasks_per_child : Python 3.11+
+NATIVE_RECYCLING = sys.version_info >= (3, 11)
+
+
+def _init_worker(memory_mb: Optional[int], initializer: Optional[Callable], initargs: tuple):
+    """Initialisation d'un worker : limite mémoire, puis initialisation demandée par l'appelant"""
+    apply_memory_limit(memory_mb)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def make_process_pool(jobs: int, recycle_after: Optional[int] = None, memory_mb: Optional[int] = None,
+                      initializer: Optional[Callable] = None, initargs: tuple = ()) -> ProcessPoolExecutor:
+    """Pool de processus dont chaque worker est remplacé après `recycle_after` documents
+
+    memory_mb : espace d'adressage maximal de chaque worker (le processus appelant n'est pas limité)
+    Avant Python 3.11, l'appelant recycle le pool entier (voir pool_needs_recycling).
+    """
+    options = {"initializer": _init_worker, "initargs": (memory_mb, initializer, initargs)}
+    if recycle_after and NATIVE_RECYCLING:
+        return ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=recycle_after, **options)
+    return ProcessPoolExecutor(max_workers=jobs, **options)
+
+
+def run_with_memory_limit(memory_mb: Optional[int], function: Callable, *args, **kwargs) -> Any:
+    """Exécute function(*args, **kwargs), dans un worker limité à `memory_mb` si une limite est fixée
+
+    Un worker tué faute de mémoire est signalé par MemoryError, comme un dépassement dans le worker.
+    """
+    if not memory_mb:
+        return function(*args, **kwargs)
+    with make_process_pool(1, memory_mb=memory_mb) as pool:
+        try:
+            return pool.submit(function, *args, **kwargs).result()
+        except BrokenProcessPool as e:
+            raise MemoryError(f"processus d'extraction interrompu (max {memory_mb} Mo): {e}") from None
+
+
+def pool_needs_recycling(submitted: int, jobs: int, recycle_after: Optional[int]) -> bool:
+    """Vrai quand un pool sans recyclage natif a traité son quota de documents"""
+    return bool(recycle_after) and not NATIVE_RECYCLING and submitted >= recycle_after * jobs
@@ -0,0 +1,107 @@
+"""
+Cache des résultats d'extraction EDI, adressé par contenu
+- Clé : empreinte SHA-256 du PDF + version de l'extracteur et du parseur
+- Valeur : liste des segments extraits (et format détecté, listes de codes)
+- Taille plafonnée, éviction des entrées les moins récemment utilisées (LRU)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+DEFAULT_CACHE_DIR = Path(".edi_cache") / "results"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 Mo
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache disque des extractions, une entrée JSON par (PDF, version)"""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(pdf_hash: str, version: str) -> str:
+        """Clé de cache : contenu du PDF + version extracteur/parseur"""
+        return hashlib.sha256(f"{pdf_hash}:{version}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'entrée {'pdf_format', 'segments'[, 'code_lists']} ou None"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Marquer l'entrée comme récemment utilisée (LRU sur mtime)
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, pdf_format: str, segments: List[Dict[str, Any]],
+            code_lists: Optional[Dict[str, Any]] = None):
+        """Enregistre une extraction (écriture atomique) puis applique le plafond de taille
+
+        code_lists : index des codes avec leurs pages (CodeListIndex.to_dict), les pages
+        n'étant pas retrouvables depuis les seuls segments
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"pdf_format": pdf_format, "segments": segments}
+        if code_lists is not None:
+            entry["code_lists"] = code_lists
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_name, self._entry_path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les plus anciennes tant que le cache dépasse max_bytes"""
+        if not self.cache_dir.exists():
+            return
+
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Vide complètement le cache"""
+        if self.cache_dir.exists():
+            for entry_path in self.cache_dir.glob("*.json"):
+                entry_path.unlink(missing_ok=True)
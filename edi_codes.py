@@ -0,0 +1,276 @@
+"""
+Listes de codes des guides EDI, extraites une fois du texte d'usage
+- "380 = Commercial Invoice", "'PCE'=Piece or", "‘ZZZ’=Contractual agreement",
+  "9 = Original 5 = Duplicated" → code, signification et page source
+- Index par chemin d'élément (NAD/3035, NAD/C082/3055...) et par code élément (*/3035)
+- Persisté à côté de l'export (.edic, JSON compact) et relu en dictionnaires :
+  vérifier ou décoder un qualifiant = deux accès de dictionnaire, sans regex
+
+Exemples :
+    python edi_codes.py build export/INVOICE4932englisch.json      # exports existants (sans pages)
+    python edi_codes.py lookup export/INVOICE4932englisch.edic NAD/3035 BY
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Union
+
+from edi_export import dumps_compact, loads, load_segments, mkstemp_export
+from edi_metrics import logger, configure_logging
+
+
+CODES_SUFFIX = ".edic"
+CODES_VERSION = 1
+PATH_SEPARATOR = "/"
+ELEMENT_KEY_PREFIX = "*/"  # toutes les occurrences d'un code élément (même convention que edi_spec)
+
+# Code entre apostrophes facultatives, suivi de "=" : en début de ligne ou après un blanc
+# (candidat seulement : voir _code_entries)
+CODE_ENTRY_RE = re.compile(r"(?:^|(?<=\s))['\"‘’`]?([A-Z0-9][A-Z0-9/.-]{0,16})['\"‘’`]?[ \t]*=(?!=)[ \t]*", re.MULTILINE)
+MEANING_TRAILERS = (" or", " and", " ou", " et", ",", ";")  # "'PCE'=Piece or" → "Piece"
+
+
+def _meaning(usage: str, start: int, end: int) -> str:
+    """Signification d'un code : jusqu'au code suivant ou à la fin de la ligne"""
+    newline = usage.find("\n", start, end)
+    meaning = usage[start:newline if newline != -1 else end].strip()
+    while meaning.endswith(MEANING_TRAILERS):
+        meaning = meaning[:-1] if meaning[-1] in ",;" else meaning.rsplit(None, 1)[0]
+        meaning = meaning.rstrip()
+    return meaning
+
+
+def _code_entries(usage: str) -> List["re.Match"]:
+    """Candidats "CODE =" qui relèvent d'une liste de codes, dans l'ordre
+
+    Retenus : le code commence la ligne ("380 = Commercial Invoice"), ou la ligne répète
+    le motif ("9 = Original 5 = Duplicated"). Un "=" isolé dans une phrase ("Note: if A = B
+    then use X", "format CCYYMMDD = 102") n'est pas une entrée : les listes servent de
+    listes fermées à la validation (edi_validate --codes).
+    """
+    by_line: Dict[int, List["re.Match"]] = {}
+    for match in CODE_ENTRY_RE.finditer(usage):
+        by_line.setdefault(usage.rfind("\n", 0, match.start()) + 1, []).append(match)
+    entries = []
+    for line_start, matches in by_line.items():
+        if len(matches) > 1 or not usage[line_start:matches[0].start()].strip():
+            entries.extend(matches)
+    return entries
+
+
+def parse_usage_codes(usage: str) -> List[Tuple[str, str]]:
+    """Codes d'un texte d'usage, dans l'ordre : [(code, signification)]
+
+    Plusieurs codes peuvent partager une ligne ("9 = Original 5 = Duplicated") ;
+    les lignes sans "CODE =" (texte libre, suite de phrase) sont ignorées.
+    """
+    if not usage or "=" not in usage:
+        return []
+    codes: List[Tuple[str, str]] = []
+    previous = None
+    for match in _code_entries(usage):
+        if previous is not None:
+            meaning = _meaning(usage, previous.end(), match.start())
+            if meaning:
+                codes.append((previous.group(1), meaning))
+        previous = match
+    if previous is not None:
+        meaning = _meaning(usage, previous.end(), len(usage))
+        if meaning:
+            codes.append((previous.group(1), meaning))
+    return codes
+
+
+def _path(*codes: Optional[str]) -> str:
+    return PATH_SEPARATOR.join(code for code in codes if code)
+
+
+class CodeListIndex:
+    """Listes de codes par chemin : {chemin: {code: (signification, page)}}
+
+    Un même chemin décrit plusieurs fois (variantes NAD+BY, NAD+SE..., composants répétés)
+    cumule ses codes ; la première signification rencontrée est conservée.
+    Pendant l'extraction, les usages sont seulement notés : ils sont analysés à la première
+    consultation de l'index (écriture de l'export), hors de la boucle de parsing.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, Dict[str, Tuple[str, Optional[int]]]]] = None):
+        self._paths: Dict[str, Dict[str, Tuple[str, Optional[int]]]] = paths if paths is not None else {}
+        self._pending: List[Tuple[str, Optional[str], str, str, Optional[int]]] = []
+
+    @property
+    def paths(self) -> Dict[str, Dict[str, Tuple[str, Optional[int]]]]:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for entry in pending:
+                self._index_usage(*entry)
+        return self._paths
+
+    def __len__(self) -> int:
+        return sum(1 for key in self.paths if not key.startswith(ELEMENT_KEY_PREFIX))
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.paths
+
+    def add_usage(self, segment: str, group: Optional[str], element: str, usage: str,
+                  page: Optional[int] = None):
+        """Note le texte d'usage d'un élément (analysé à la première consultation)"""
+        if "=" in usage:
+            self._pending.append((segment, group, element, usage, page))
+
+    def _index_usage(self, segment: str, group: Optional[str], element: str, usage: str,
+                     page: Optional[int]):
+        codes = parse_usage_codes(usage)
+        if not codes:
+            return
+        by_path = self._paths.setdefault(_path(segment, group, element), {})
+        by_element = self._paths.setdefault(ELEMENT_KEY_PREFIX + element, {})
+        for code, meaning in codes:
+            by_path.setdefault(code, (meaning, page))
+            by_element.setdefault(code, (meaning, page))
+
+    def add_segments(self, segments: Iterable[Dict[str, Any]]) -> "CodeListIndex":
+        """Indexe les usages d'un guide sous forme JSON (pages inconnues)"""
+        for segment in segments:
+            code = segment["segment"]
+            for item in segment.get("elements", []):
+                if "groupe" in item:
+                    for champ in item.get("champs", []):
+                        self.add_usage(code, item["groupe"], champ["champ"], champ.get("usage", ""))
+                elif "champ" in item:
+                    self.add_usage(code, None, item["champ"], item.get("usage", ""))
+        return self
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]]) -> "CodeListIndex":
+        return cls().add_segments(segments)
+
+    def codes(self, path: str) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Liste de codes d'un chemin (SEG/ELEM, SEG/GRP/ELEM ou */ELEM), vide si aucune"""
+        return self.paths.get(path, {})
+
+    def decode(self, path: str, code: str) -> Optional[str]:
+        """Signification d'un code (None si le code n'est pas dans la liste du guide)"""
+        entry = self.paths.get(path, {}).get(code)
+        return entry[0] if entry else None
+
+    def is_allowed(self, path: str, code: str) -> bool:
+        """Vrai si le chemin n'a pas de liste de codes ou si le code y figure"""
+        allowed = self.paths.get(path)
+        return not allowed or code in allowed
+
+    def lookup(self, path: str, code: str) -> Optional[Dict[str, Any]]:
+        """Entrée complète d'un code : {path, code, meaning, page}"""
+        entry = self.paths.get(path, {}).get(code)
+        if entry is None:
+            return None
+        return {"path": path, "code": code, "meaning": entry[0], "page": entry[1]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": CODES_VERSION,
+                "paths": {path: {code: list(entry) for code, entry in codes.items()}
+                          for path, codes in self.paths.items()}}
+
+    def write(self, output_path: Union[str, Path]) -> Path:
+        """Persiste l'index (.edic, écriture atomique)"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = mkstemp_export(output_path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dumps_compact(self.to_dict()))
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return output_path
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = "") -> "CodeListIndex":
+        """Depuis la forme sérialisée (to_dict)"""
+        if data.get("version") != CODES_VERSION:
+            raise ValueError(f"Index de codes non supporté: {source} (version {data.get('version')})")
+        return cls({path_key: {code: (entry[0], entry[1]) for code, entry in codes.items()}
+                    for path_key, codes in data["paths"].items()})
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CodeListIndex":
+        """Relit un fichier .edic"""
+        with open(path, 'rb') as f:
+            return cls.from_dict(loads(f.read()), str(path))
+
+
+def codes_path_for(export_path: Union[str, Path]) -> Path:
+    """Fichier .edic associé à un export (même dossier, même nom)"""
+    return Path(export_path).with_suffix(CODES_SUFFIX)
+
+
+def load_code_lists(path: Union[str, Path]) -> CodeListIndex:
+    """Index d'un fichier .edic, ou de l'export (celui écrit à côté s'il existe, sinon reparsé)"""
+    path = Path(path)
+    if path.suffix == CODES_SUFFIX:
+        return CodeListIndex.load(path)
+    codes_path = codes_path_for(path)
+    if codes_path.exists() and codes_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return CodeListIndex.load(codes_path)
+    return CodeListIndex.from_segments(load_segments(path))
+
+
+def write_code_lists(code_lists: CodeListIndex, export_path: Union[str, Path]) -> Optional[Path]:
+    """Écrit l'index à côté de l'export ; une erreur d'écriture n'interrompt pas l'extraction"""
+    try:
+        return code_lists.write(codes_path_for(export_path))
+    except OSError as e:
+        logger.warning(f"⚠️  Index des codes non écrit ({export_path}): {e}")
+        return None
+
+
+def main():
+    """Construction des index .edic et recherche de codes"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Listes de codes des guides EDI (depuis le texte d'usage)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="écrire l'index .edic d'un ou plusieurs exports")
+    build_parser.add_argument("exports", nargs="+", help="exports JSON ou .edib")
+
+    lookup_parser = commands.add_parser("lookup", help="codes d'un chemin (ex. NAD/3035), ou un code précis")
+    lookup_parser.add_argument("codes", help="index .edic ou export")
+    lookup_parser.add_argument("path", help="chemin de l'élément, ou */CODE pour toutes ses occurrences")
+    lookup_parser.add_argument("code", nargs="?", help="code à décoder (ex. BY)")
+
+    args = parser.parse_args()
+    configure_logging(1)
+
+    if args.command == "build":
+        for export_path in args.exports:
+            code_lists = CodeListIndex.from_segments(load_segments(export_path))
+            output_path = code_lists.write(codes_path_for(export_path))
+            logger.info(f"✓ Index des codes: {output_path} ({len(code_lists)} listes)")
+        return
+
+    try:
+        code_lists = load_code_lists(args.codes)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ Index des codes illisible: {e}")
+        raise SystemExit(1)
+    if args.code is not None:
+        entry = code_lists.lookup(args.path, args.code)
+        if entry is None:
+            logger.warning(f"⚠️  Code {args.code} absent de la liste de {args.path}")
+            raise SystemExit(1)
+        logger.info(json.dumps(entry, indent=4, ensure_ascii=False))
+        return
+    codes = code_lists.codes(args.path)
+    if not codes:
+        logger.warning(f"⚠️  Aucune liste de codes pour {args.path}")
+        raise SystemExit(1)
+    for code, (meaning, page) in codes.items():
+        logger.info(f"{code:<8} {meaning}" + (f"  (p. {page})" if page else ""))
+
+
+if __name__ == "__main__":
+    main()
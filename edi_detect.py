@@ -0,0 +1,183 @@
+"""
+Détection rapide du format d'un guide EDI
+- Lecture du texte brut des premières pages avec PyPDF2 (sans analyse de mise en page)
+- Tous les détecteurs enregistrés sont notés en une fois sur le même texte
+- Analyse de mise en page pdfplumber uniquement si les scores sont ambigus
+- Résultat avec un indice de confiance : une détection incertaine est signalée, jamais silencieuse
+- Aucun motif reconnu : format "unknown" (aucun format imposé par défaut)
+"""
+
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Pattern
+
+from PyPDF2 import PdfReader
+
+from edi_metrics import logger, configure_logging
+
+
+SNIFF_PAGES = 10       # pages lues au maximum (texte brut puis mise en page)
+MIN_CONFIDENCE = 0.5   # écart de score minimal entre les deux meilleurs formats
+UNKNOWN_FORMAT = 'unknown'  # aucun détecteur n'a reconnu le document
+
+# Méthodes de détection (dans l'ordre où elles sont tentées)
+METHOD_SNIFF = "sniff"
+METHOD_LAYOUT = "layout"
+METHOD_NONE = "none"
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def compact_text(text: str) -> str:
+    """Texte sans blancs : le texte brut PyPDF2 coupe souvent les mots ("Statu s: M")"""
+    return _WHITESPACE_RE.sub('', text)
+
+
+class FormatDetector:
+    """Détecteur d'un format : motifs pondérés cherchés dans le texte compacté
+
+    patterns : [(motif, poids)], le score d'une page est le poids du meilleur motif trouvé
+    """
+
+    def __init__(self, name: str, label: str, patterns: List[Tuple[str, float]]):
+        self.name = name
+        self.label = label
+        self.patterns: List[Tuple[Pattern, float]] = [(re.compile(pattern), weight) for pattern, weight in patterns]
+
+    def score(self, text: str) -> float:
+        """Score (0 à 1) d'un texte compacté"""
+        best = 0.0
+        for pattern, weight in self.patterns:
+            if weight > best and pattern.search(text):
+                best = weight
+        return best
+
+
+DETECTORS: Dict[str, FormatDetector] = {}
+
+
+def register_detector(detector: FormatDetector):
+    """Ajoute (ou remplace) un détecteur de format"""
+    DETECTORS[detector.name] = detector
+
+
+# Format VDA 4932 : "Segment: NAD Cons. No.: 14 Level: 1"
+register_detector(FormatDetector('vda4932', 'VDA 4932 (Automotive standard)', [
+    (r'Segment:[A-Z]{3}Cons\.No\.:\d+Level:', 1.0),
+    (r'Segment:[A-Z]{3}Cons\.No\.:', 0.8),
+]))
+
+# Format Faurecia : "Segment: UNB Pos.: 1 Level: 0", l'en-tête pouvant être sur plusieurs lignes
+register_detector(FormatDetector('faurecia', 'Faurecia EDI Guideline', [
+    (r'Segment:[A-Z]{0,3}Pos\.:\d+Level:', 1.0),
+    (r'Segment:.*Pos\.:\d+.*Level:', 0.8),
+    (r'Pos\.:\d+.*(?:UNH|BGM|DTM|NAD|LIN|MOA)|(?:UNH|BGM|DTM|NAD|LIN|MOA).*Pos\.:\d+', 0.4),
+]))
+
+
+def score_text(text: str, scores: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Note tous les détecteurs sur le texte d'une page (scores cumulés : meilleur par format)"""
+    scores = scores if scores is not None else {name: 0.0 for name in DETECTORS}
+    compact = compact_text(text)
+    for name, detector in DETECTORS.items():
+        scores[name] = max(scores.get(name, 0.0), detector.score(compact))
+    return scores
+
+
+def _decide(scores: Dict[str, float]) -> Tuple[Optional[str], float]:
+    """Meilleur format et confiance (écart avec le second, 0 si aucun motif trouvé)"""
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    if not ranked or ranked[0][1] <= 0:
+        return None, 0.0
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    return ranked[0][0], round(ranked[0][1] - second, 3)
+
+
+def _score_pages(texts, max_pages: int) -> Tuple[Dict[str, float], int]:
+    """Note les pages une à une, arrêt dès qu'un format est reconnu sans ambiguïté"""
+    scores = {name: 0.0 for name in DETECTORS}
+    pages_read = 0
+    for text in texts:
+        if pages_read >= max_pages:
+            break
+        pages_read += 1
+        score_text(text, scores)
+        best, confidence = _decide(scores)
+        if best is not None and scores[best] >= 1.0 and confidence >= MIN_CONFIDENCE:
+            break
+    return scores, pages_read
+
+
+def _sniff_texts(pdf_path: Path):
+    """Texte brut PyPDF2 des pages, lu à la demande"""
+    reader = PdfReader(str(pdf_path))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def detect_format(session, max_pages: int = SNIFF_PAGES) -> Dict[str, Any]:
+    """Détecte le format d'un document ouvert (PDFSession ou StoredSession)
+
+    Retourne {"format", "label", "confidence", "method", "scores", "pages_read"} ;
+    format UNKNOWN_FORMAT (méthode METHOD_NONE) si aucun détecteur ne reconnaît le document.
+    """
+    page_count = min(max_pages, session.page_count)
+    method = METHOD_LAYOUT
+    scores: Dict[str, float] = {}
+    pages_read = 0
+
+    # 1. Texte brut PyPDF2 (quelques millisecondes par page)
+    if session.has_layout:
+        try:
+            scores, pages_read = _score_pages(_sniff_texts(session.pdf_path), page_count)
+            method = METHOD_SNIFF
+        except Exception as e:
+            logger.debug(f"   Lecture rapide impossible ({e}), analyse de mise en page")
+    best, confidence = _decide(scores)
+
+    # 2. Scores ambigus : texte de mise en page (mis en cache par la session, réutilisé ensuite)
+    if best is None or confidence < MIN_CONFIDENCE:
+        layout_scores, pages_read = _score_pages(
+            (session.page_text(index) for index in range(page_count)), page_count
+        )
+        layout_best, layout_confidence = _decide(layout_scores)
+        if layout_best is not None and (best is None or layout_confidence > confidence):
+            scores, best, confidence, method = layout_scores, layout_best, layout_confidence, METHOD_LAYOUT
+        elif best is None:
+            scores = layout_scores
+
+    if best is None:
+        best, confidence, method = UNKNOWN_FORMAT, 0.0, METHOD_NONE
+
+    return {
+        "format": best,
+        "label": DETECTORS[best].label if best in DETECTORS else "Format inconnu",
+        "confidence": confidence,
+        "method": method,
+        "scores": scores,
+        "pages_read": pages_read,
+    }
+
+
+def main():
+    """Affiche la détection de format de un ou plusieurs PDF"""
+    import argparse
+    from extract_edi_adaptive import PDFSession
+
+    parser = argparse.ArgumentParser(description="Détection rapide du format de guides EDI")
+    parser.add_argument("pdf_files", nargs="+", help="fichiers PDF à analyser")
+    args = parser.parse_args()
+    configure_logging(1)
+
+    for pdf_file in args.pdf_files:
+        with PDFSession(pdf_file) as session:
+            detection = detect_format(session)
+        scores = ", ".join(f"{name}={score:.1f}" for name, score in detection["scores"].items())
+        status = "✅" if detection["confidence"] >= MIN_CONFIDENCE else "⚠️ "
+        logger.info(f"{status} {Path(pdf_file).name}: {detection['format']} "
+                    f"(confiance {detection['confidence']:.2f}, {detection['method']}, "
+                    f"{detection['pages_read']} page(s)) [{scores}]")
+
+
+if __name__ == "__main__":
+    main()
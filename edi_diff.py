@@ -0,0 +1,248 @@
+"""
+Différences structurelles entre deux versions d'un guide EDI (ou deux corpus d'exports)
+- Chaque nœud segment / groupe / champ porte une empreinte de son contenu et de ses enfants
+- Deux sous-arbres d'empreinte égale sont identiques : ils sont ignorés sans être parcourus
+- Résultat exploitable par programme : liste des ajouts, suppressions, modifications (par champ)
+  et changements d'ordre, chacun repéré par son chemin (ex. NAD/C082/3039)
+- Corpus : documents appariés par nom, fichiers identiques écartés sur leur empreinte SHA-256
+
+Exemples :
+    python edi_diff.py export_v2r6/Faurecia.json export_v2r7/Faurecia.json
+    python edi_diff.py release_2025/ release_2026/ --json changes.json
+"""
+
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from edi_cache import file_sha256
+from edi_export import load_segments
+from edi_metrics import logger, configure_logging
+
+
+EXPORT_PATTERNS = ("*.json", "*.edib")
+NODE_FIELDS = {
+    "segment": ("description",),
+    "group": ("description",),
+    "element": ("description", "format", "valeur", "usage"),
+}
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_MODIFIED = "modified"
+CHANGE_REORDERED = "reordered"
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.blake2b("\x1f".join(parts).encode('utf-8'), digest_size=16).digest()
+
+
+class HashNode:
+    """Nœud de l'arbre d'empreintes : champs propres, enfants par clé (code, occurrence)"""
+
+    __slots__ = ("kind", "code", "path", "fields", "children", "digest", "data")
+
+    def __init__(self, kind: str, code: str, path: str, data: Dict[str, Any],
+                 children: Optional[Dict[Tuple[str, int], "HashNode"]] = None):
+        self.kind = kind
+        self.code = code
+        self.path = path
+        self.data = data
+        self.fields = tuple(data.get(field, "") or "" for field in NODE_FIELDS.get(kind, ()))
+        self.children = children or {}
+        self.digest = _digest(kind, code, *self.fields, *(child.digest.hex() for child in self.children.values()))
+
+
+def _node_path(parent: str, code: str, occurrence: int) -> str:
+    """Chemin d'un nœud ; "#n" distingue les répétitions d'un même code (à partir de la 2e)"""
+    name = f"{code}#{occurrence}" if occurrence else code
+    return f"{parent}/{name}" if parent else name
+
+
+def _keyed_children(parent_path: str, items, build) -> Dict[Tuple[str, int], HashNode]:
+    """Enfants indexés par (code, rang d'occurrence), dans l'ordre du guide"""
+    children: Dict[Tuple[str, int], HashNode] = {}
+    seen: Dict[str, int] = {}
+    for item in items:
+        node = build(parent_path, item, seen)
+        if node is not None:
+            children[(node.code, seen[node.code] - 1)] = node
+    return children
+
+
+def _build_item(parent_path: str, item: Dict[str, Any], seen: Dict[str, int]) -> Optional[HashNode]:
+    if "groupe" in item:
+        code, kind = item["groupe"], "group"
+    elif "champ" in item:
+        code, kind = item["champ"], "element"
+    else:
+        return None
+    occurrence = seen.get(code, 0)
+    seen[code] = occurrence + 1
+    path = _node_path(parent_path, code, occurrence)
+    children = _keyed_children(path, item.get("champs", []), _build_item) if kind == "group" else None
+    return HashNode(kind, code, path, item, children)
+
+
+def hash_tree(segments: List[Dict[str, Any]]) -> HashNode:
+    """Arbre d'empreintes d'un guide (forme JSON de l'export ou Guideline.to_dicts())"""
+    def build_segment(parent_path, segment, seen):
+        code = segment["segment"]
+        occurrence = seen.get(code, 0)
+        seen[code] = occurrence + 1
+        path = _node_path(parent_path, code, occurrence)
+        return HashNode("segment", code, path, segment,
+                        _keyed_children(path, segment.get("elements", []), _build_item))
+
+    ordered = sorted(segments, key=lambda segment: segment["segment"])
+    return HashNode("document", "", "", {}, _keyed_children("", ordered, build_segment))
+
+
+def _node_summary(node: HashNode) -> Dict[str, Any]:
+    """Contenu d'un nœud ajouté ou supprimé (forme JSON de l'export)"""
+    summary = {key: value for key, value in node.data.items() if key not in ("elements", "champs")}
+    if node.children:
+        summary["enfants"] = len(node.children)
+    return summary
+
+
+def diff_trees(old: HashNode, new: HashNode, changes: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Changements entre deux arbres d'empreintes (sous-arbres identiques ignorés)"""
+    changes = changes if changes is not None else []
+    if old.digest == new.digest:
+        return changes
+
+    if old.fields != new.fields:
+        names = NODE_FIELDS.get(old.kind, ())
+        changes.append({
+            "path": new.path, "kind": new.kind, "change": CHANGE_MODIFIED,
+            "fields": {
+                name: {"old": before, "new": after}
+                for name, before, after in zip(names, old.fields, new.fields) if before != after
+            }
+        })
+
+    for key, old_child in old.children.items():
+        new_child = new.children.get(key)
+        if new_child is None:
+            changes.append({"path": old_child.path, "kind": old_child.kind, "change": CHANGE_REMOVED,
+                            "old": _node_summary(old_child)})
+        else:
+            diff_trees(old_child, new_child, changes)
+    for key, new_child in new.children.items():
+        if key not in old.children:
+            changes.append({"path": new_child.path, "kind": new_child.kind, "change": CHANGE_ADDED,
+                            "new": _node_summary(new_child)})
+
+    # Mêmes enfants dans un ordre différent (l'ordre des segments n'est pas significatif)
+    if old.kind != "document":
+        old_order = [key for key in old.children if key in new.children]
+        new_order = [key for key in new.children if key in old.children]
+        if old_order != new_order:
+            changes.append({"path": new.path, "kind": new.kind, "change": CHANGE_REORDERED,
+                            "old": [_node_path("", *key) for key in old_order],
+                            "new": [_node_path("", *key) for key in new_order]})
+    return changes
+
+
+def _summary(changes: List[Dict[str, Any]]) -> Dict[str, int]:
+    summary = {CHANGE_ADDED: 0, CHANGE_REMOVED: 0, CHANGE_MODIFIED: 0, CHANGE_REORDERED: 0}
+    for change in changes:
+        summary[change["change"]] += 1
+    return summary
+
+
+def diff_guidelines(old_segments: List[Dict[str, Any]], new_segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Différences entre deux guides (segments sous forme JSON, ex. extractor.model.to_dicts())"""
+    old_tree, new_tree = hash_tree(old_segments), hash_tree(new_segments)
+    changes = diff_trees(old_tree, new_tree)
+    return {"identical": not changes, "summary": _summary(changes), "changes": changes}
+
+
+def diff_exports(old_path: Union[str, Path], new_path: Union[str, Path]) -> Dict[str, Any]:
+    """Différences entre deux exports (JSON ou .edib) ; fichiers identiques comparés sur leur empreinte"""
+    if Path(old_path).suffix == Path(new_path).suffix and file_sha256(Path(old_path)) == file_sha256(Path(new_path)):
+        result = {"identical": True, "summary": _summary([]), "changes": []}
+    else:
+        result = diff_guidelines(load_segments(old_path), load_segments(new_path))
+    return {"old": str(old_path), "new": str(new_path), **result}
+
+
+def _exports_by_name(export_dir: Path) -> Dict[str, Path]:
+    """Exports d'un dossier par nom (un export binaire remplace le JSON de même nom)"""
+    exports: Dict[str, Path] = {}
+    for pattern in EXPORT_PATTERNS:
+        for path in sorted(export_dir.glob(pattern)):
+            exports[path.stem] = path
+    return exports
+
+
+def diff_corpus(old_dir: Union[str, Path], new_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Différences entre deux corpus d'exports (documents appariés par nom de fichier)"""
+    old_exports, new_exports = _exports_by_name(Path(old_dir)), _exports_by_name(Path(new_dir))
+    documents = [
+        {"document": name, **diff_exports(old_exports[name], new_exports[name])}
+        for name in sorted(old_exports.keys() & new_exports.keys())
+    ]
+    return {
+        "old": str(old_dir), "new": str(new_dir),
+        "added": sorted(new_exports.keys() - old_exports.keys()),
+        "removed": sorted(old_exports.keys() - new_exports.keys()),
+        "documents": documents,
+    }
+
+
+def _log_changes(changes: List[Dict[str, Any]], indent: str = "  "):
+    symbols = {CHANGE_ADDED: "+", CHANGE_REMOVED: "-", CHANGE_MODIFIED: "~", CHANGE_REORDERED: "↕"}
+    for change in changes:
+        line = f"{indent}{symbols[change['change']]} {change['path']} ({change['kind']})"
+        if change["change"] == CHANGE_MODIFIED:
+            line += " " + ", ".join(
+                f"{name}: {values['old']!r} → {values['new']!r}" for name, values in change["fields"].items()
+            )
+        logger.info(line)
+
+
+def main():
+    """Compare deux exports ou deux dossiers d'exports"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Différences structurelles entre versions de guides EDI")
+    parser.add_argument("old", help="export ou dossier d'exports de référence")
+    parser.add_argument("new", help="export ou dossier d'exports à comparer")
+    parser.add_argument("--json", metavar="FICHIER", help="écrire le résultat complet (JSON)")
+    args = parser.parse_args()
+    configure_logging(1)
+
+    if Path(args.old).is_dir() and Path(args.new).is_dir():
+        result = diff_corpus(args.old, args.new)
+        for name in result["added"]:
+            logger.info(f"➕ {name}")
+        for name in result["removed"]:
+            logger.info(f"➖ {name}")
+        for document in result["documents"]:
+            if document["identical"]:
+                logger.debug(f"✓ {document['document']}: identique")
+                continue
+            logger.info(f"📄 {document['document']}: {document['summary']}")
+            _log_changes(document["changes"])
+        changed = sum(1 for document in result["documents"] if not document["identical"])
+        logger.info(f"\n{len(result['documents'])} document(s) comparé(s), {changed} modifié(s), "
+                    f"{len(result['added'])} ajouté(s), {len(result['removed'])} supprimé(s)")
+    else:
+        result = diff_exports(args.old, args.new)
+        if result["identical"]:
+            logger.info("✓ Guides identiques")
+        else:
+            _log_changes(result["changes"], indent="")
+            logger.info(f"\n{result['summary']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=4, ensure_ascii=False)
+        logger.info(f"✓ Différences sauvegardées: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
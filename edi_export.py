@@ -0,0 +1,206 @@
+"""
+Écriture et relecture des exports EDI, segment par segment
+- json    : JSON indenté (défaut, format historique de export/)
+- compact : JSON sans indentation ni blancs
+- binary  : enregistrements préfixés par leur longueur (.edib), relus sans analyser tout le fichier
+Tous les formats utilisent orjson s'il est installé (sortie identique au module json).
+"""
+
+import json
+import os
+import secrets
+import struct
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Union
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+
+EXPORT_FORMATS = ("json", "compact", "binary")
+EXPORT_SUFFIXES = {"json": ".json", "compact": ".json", "binary": ".edib"}
+
+# Format binaire : en-tête "EDIB" + version, puis pour chaque segment
+# une longueur (uint32 big-endian) suivie du segment en JSON compact UTF-8
+BINARY_MAGIC = b"EDIB"
+BINARY_VERSION = 1
+_HEADER = struct.Struct(">4sB")
+_LENGTH = struct.Struct(">I")
+
+
+def mkstemp_export(directory: Union[str, Path], suffix: str = ".tmp"):
+    """Fichier temporaire à renommer sur un export (mêmes droits qu'un fichier créé par open)
+
+    Créé en 0666 filtré par l'umask, comme par open() (mkstemp crée en 0600) :
+    l'umask n'est ni lue ni modifiée, sans effet sur les autres threads.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+    for _ in range(tempfile.TMP_MAX):
+        tmp_name = os.path.abspath(os.path.join(directory, f"tmp{secrets.token_hex(6)}{suffix}"))
+        try:
+            return os.open(tmp_name, flags, 0o666), tmp_name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Aucun nom de fichier temporaire disponible dans {directory}")
+
+
+def dumps_compact(item: Any) -> bytes:
+    """JSON compact UTF-8 (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.dumps(item)
+    return json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_indented(item: Any, base_indent: int = 0) -> str:
+    """JSON indenté de 4 espaces, identique à json.dumps(indent=4, ensure_ascii=False)
+
+    base_indent : espaces ajoutés en tête de chaque ligne sauf la première (élément de liste).
+    orjson n'indente que sur 2 espaces : l'indentation de chaque ligne est doublée
+    (les retours à la ligne des chaînes sont échappés, une ligne ne commence que par son indentation).
+    """
+    if orjson is None:
+        text = json.dumps(item, indent=4, ensure_ascii=False)
+        return text.replace('\n', '\n' + ' ' * base_indent) if base_indent else text
+    lines = orjson.dumps(item, option=orjson.OPT_INDENT_2).decode('utf-8').split('\n')
+    return '\n'.join([lines[0]] + [
+        ' ' * (len(line) - len(line.lstrip(' ')) + base_indent) + line for line in lines[1:]
+    ])
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Décodage JSON (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _AtomicStreamWriter:
+    """Écriture dans un fichier temporaire renommé à la fermeture ;
+    aucun fichier n'est créé si aucun élément n'a été écrit (sauf appel à ensure_open)."""
+
+    mode = 'wb'
+
+    def __init__(self, output_path: Union[str, Path]):
+        self.output_file = Path(output_path)
+        self.count = 0
+        self._file = None
+        self._tmp_name = None
+
+    def __enter__(self):
+        return self
+
+    def ensure_open(self):
+        """Ouvre le fichier temporaire (un export vide est alors écrit à la fermeture)"""
+        if self._file is not None:
+            return
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_name = mkstemp_export(self.output_file.parent)
+        if self.mode == 'wb':
+            self._file = os.fdopen(fd, 'wb')
+        else:
+            self._file = os.fdopen(fd, 'w', encoding='utf-8')
+        self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _write_footer(self):
+        pass
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is None:
+            return
+        if exc_type is None:
+            self._write_footer()
+            self._file.close()
+            os.replace(self._tmp_name, self.output_file)
+        else:
+            self._file.close()
+            Path(self._tmp_name).unlink(missing_ok=True)
+
+
+class JSONStreamWriter(_AtomicStreamWriter):
+    """Écriture incrémentale d'une liste JSON, même mise en forme que json.dump(indent=4)
+
+    compact : JSON sans indentation (séparateurs "," et ":")
+    """
+
+    mode = 'w'
+
+    def __init__(self, output_path: Union[str, Path], compact: bool = False):
+        super().__init__(output_path)
+        self.compact = compact
+
+    def _write_header(self):
+        self._file.write('[')
+
+    def write(self, item: Dict[str, Any]):
+        """Ajoute un élément à la liste"""
+        self.ensure_open()
+
+        if self.compact:
+            self._file.write((',' if self.count else '') + dumps_compact(item).decode('utf-8'))
+        else:
+            self._file.write((',\n    ' if self.count else '\n    ') + dumps_indented(item, 4))
+        self.count += 1
+
+    def _write_footer(self):
+        self._file.write(']' if self.compact or not self.count else '\n]')
+
+
+class BinaryStreamWriter(_AtomicStreamWriter):
+    """Écriture incrémentale d'un export binaire (.edib)"""
+
+    def _write_header(self):
+        self._file.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION))
+
+    def write(self, item: Dict[str, Any]):
+        """Ajoute un segment"""
+        self.ensure_open()
+        payload = dumps_compact(item)
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self.count += 1
+
+
+def open_export_writer(output_path: Union[str, Path], export_format: str = "json"):
+    """Writer en flux pour un format d'export (json, compact ou binary)"""
+    if export_format == "binary":
+        return BinaryStreamWriter(output_path)
+    if export_format in ("json", "compact"):
+        return JSONStreamWriter(output_path, compact=export_format == "compact")
+    raise ValueError(f"Format d'export inconnu: {export_format} (formats : {', '.join(EXPORT_FORMATS)})")
+
+
+def iter_binary(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Relit un export binaire segment par segment"""
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Export binaire tronqué: {path}")
+        magic, version = _HEADER.unpack(header)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"Export binaire non supporté: {path} ({magic!r}, version {version})")
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if not prefix:
+                return
+            if len(prefix) < _LENGTH.size:
+                raise ValueError(f"Export binaire tronqué: {path}")
+            (length,) = _LENGTH.unpack(prefix)
+            payload = f.read(length)
+            if len(payload) < length:
+                raise ValueError(f"Export binaire tronqué: {path}")
+            yield loads(payload)
+
+
+def load_segments(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Relit un export (JSON indenté ou compact, ou binaire selon l'extension)"""
+    path = Path(path)
+    if path.suffix == EXPORT_SUFFIXES["binary"]:
+        return list(iter_binary(path))
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,348 @@
+"""
+Index SQLite du corpus des guides extraits (requêtes transverses sans relire export/)
+- Un document par guide exporté (un même guide exporté en JSON et en .edib n'est indexé
+  qu'une fois : l'export le plus récent), ses segments, groupes composites et éléments
+- Index sur les codes de segment, de groupe et d'élément
+- Mise à jour incrémentale : process_pdf réindexe chaque export écrit,
+  `sync` ne relit que les exports nouveaux ou modifiés et retire les exports supprimés
+
+Exemples :
+    python edi_index.py sync                                   # indexe export/
+    python edi_index.py element 3035 --segment NAD --distinct  # guides et formats de 3035 dans NAD
+    python edi_index.py segment NAD
+    python edi_index.py group C082
+    python edi_index.py documents
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+
+from edi_export import load_segments
+from edi_metrics import logger, configure_logging
+
+
+DEFAULT_INDEX_PATH = Path(".edi_cache") / "corpus.sqlite"
+EXPORT_PATTERNS = ("*.json", "*.edib")
+# Version du schéma (PRAGMA user_version) : une base plus ancienne est vidée puis réindexée par sync
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    pdf_format TEXT,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS groups (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    segment TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS elements (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    segment TEXT NOT NULL,
+    group_code TEXT,
+    group_position INTEGER,
+    position INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    description TEXT,
+    format TEXT,
+    valeur TEXT,
+    usage TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_segments_code ON segments(code);
+CREATE INDEX IF NOT EXISTS idx_segments_document ON segments(document_id);
+CREATE INDEX IF NOT EXISTS idx_groups_code ON groups(code, segment);
+CREATE INDEX IF NOT EXISTS idx_groups_document ON groups(document_id);
+CREATE INDEX IF NOT EXISTS idx_elements_code ON elements(code, segment);
+CREATE INDEX IF NOT EXISTS idx_elements_segment ON elements(segment);
+CREATE INDEX IF NOT EXISTS idx_elements_group ON elements(group_code);
+CREATE INDEX IF NOT EXISTS idx_elements_document ON elements(document_id);
+"""
+DROP_SCHEMA = """
+DROP TABLE IF EXISTS elements;
+DROP TABLE IF EXISTS groups;
+DROP TABLE IF EXISTS segments;
+DROP TABLE IF EXISTS documents;
+"""
+
+
+class CorpusIndex:
+    """Base SQLite des exports (une connexion par instance, utilisable en contexte)"""
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_INDEX_PATH):
+        self.db_path = Path(db_path)
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Plusieurs processus d'extraction peuvent écrire : attente du verrou, journal WAL
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Index dérivé des exports : reconstruit plutôt que migré
+                self._conn.executescript(DROP_SCHEMA)
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "CorpusIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Mise à jour
+
+    def index_segments(self, export_path: Union[str, Path], segments: List[Dict[str, Any]],
+                       pdf_format: Optional[str] = None):
+        """(Ré)indexe un document à partir de ses segments (forme JSON de l'export)
+
+        Document identifié par le chemin absolu de l'export (chemins relatifs et absolus confondus) ;
+        il remplace l'export du même guide dans un autre format (même dossier, même nom).
+        """
+        export_path = Path(export_path).resolve()
+        paths = _document_paths(export_path)
+        placeholders = ", ".join("?" * len(paths))
+        stat = export_path.stat()
+        segment_rows, group_rows, element_rows = [], [], []
+        for position, segment in enumerate(segments):
+            code = segment["segment"]
+            segment_rows.append((position, code, segment.get("description", "")))
+            for item_position, item in enumerate(segment.get("elements", [])):
+                if "groupe" in item:
+                    group_rows.append((code, item_position, item["groupe"], item.get("description", "")))
+                    for champ_position, champ in enumerate(item.get("champs", [])):
+                        element_rows.append(_element_row(code, item["groupe"], item_position, champ_position, champ))
+                elif "champ" in item:
+                    element_rows.append(_element_row(code, None, None, item_position, item))
+
+        conn = self.conn
+        with conn:
+            if pdf_format is None:
+                # Réindexation depuis le seul export : garder le format connu du document
+                row = conn.execute(f"SELECT pdf_format FROM documents WHERE path IN ({placeholders}) "
+                                   "AND pdf_format IS NOT NULL", paths).fetchone()
+                pdf_format = row["pdf_format"] if row is not None else None
+            conn.execute(f"DELETE FROM documents WHERE path IN ({placeholders})", paths)
+            document_id = conn.execute(
+                "INSERT INTO documents (path, name, pdf_format, mtime, size, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(export_path), export_path.stem, pdf_format, stat.st_mtime, stat.st_size, time.time())
+            ).lastrowid
+            conn.executemany("INSERT INTO segments VALUES (?, ?, ?, ?)",
+                             [(document_id, *row) for row in segment_rows])
+            conn.executemany("INSERT INTO groups VALUES (?, ?, ?, ?, ?)",
+                             [(document_id, *row) for row in group_rows])
+            conn.executemany("INSERT INTO elements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [(document_id, *row) for row in element_rows])
+
+    def index_export(self, export_path: Union[str, Path], pdf_format: Optional[str] = None):
+        """(Ré)indexe un fichier d'export"""
+        self.index_segments(export_path, load_segments(export_path), pdf_format)
+
+    def sync(self, export_dir: Union[str, Path] = "export") -> Dict[str, int]:
+        """Indexe les exports nouveaux ou modifiés d'un dossier et retire les exports disparus
+
+        Un guide exporté dans plusieurs formats est indexé d'après son export le plus récent.
+        """
+        export_dir = Path(export_dir).resolve()
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.conn.execute("SELECT path, mtime, size FROM documents")
+        }
+        seen = set()
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+        for export_path, stat in _exports_by_stem(export_dir):
+            seen.add(str(export_path))
+            if known.get(str(export_path)) == (stat.st_mtime, stat.st_size):
+                counts["unchanged"] += 1
+                continue
+            try:
+                self.index_export(export_path)
+                counts["indexed"] += 1
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️  Export ignoré ({export_path.name}): {e}")
+
+        # Exports supprimés de ce dossier
+        removed = [path for path in known if Path(path).parent == export_dir and path not in seen]
+        with self.conn:
+            for path in removed:
+                self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+        counts["removed"] = len(removed)
+        return counts
+
+    # Requêtes
+
+    def find_elements(self, code: str, segment: Optional[str] = None, group: Optional[str] = None,
+                      distinct: bool = False) -> List[Dict[str, Any]]:
+        """Occurrences d'un élément (ex. 3035), éventuellement dans un segment / groupe
+
+        distinct : une ligne par document, segment, groupe et format (avec le nombre d'occurrences)
+        """
+        if distinct:
+            columns = ("d.name AS document, e.segment, e.group_code AS groupe, e.code AS champ, "
+                       "e.format, COUNT(*) AS occurrences")
+        else:
+            columns = ("d.name AS document, e.segment, e.group_code AS groupe, e.code AS champ, "
+                       "e.description, e.format, e.valeur, e.usage")
+        query = (f"SELECT {columns} "
+                 "FROM elements e JOIN documents d ON d.id = e.document_id WHERE e.code = ?")
+        params: List[Any] = [code]
+        if segment:
+            query += " AND e.segment = ?"
+            params.append(segment)
+        if group:
+            query += " AND e.group_code = ?"
+            params.append(group)
+        if distinct:
+            query += " GROUP BY d.name, e.segment, e.group_code, e.format ORDER BY d.name, e.segment, e.group_code"
+        else:
+            query += " ORDER BY d.name, e.segment, e.group_code, e.position"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def find_groups(self, code: str, segment: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Occurrences d'un groupe composite (ex. C082), une ligne par occurrence dans un segment"""
+        query = ("SELECT d.name AS document, g.segment, g.code AS groupe, g.description, "
+                 "(SELECT COUNT(*) FROM elements e WHERE e.document_id = g.document_id "
+                 " AND e.segment = g.segment AND e.group_position = g.position) AS champs "
+                 "FROM groups g JOIN documents d ON d.id = g.document_id WHERE g.code = ?")
+        params: List[Any] = [code]
+        if segment:
+            query += " AND g.segment = ?"
+            params.append(segment)
+        query += " ORDER BY d.name, g.segment, g.position"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def find_segments(self, code: str) -> List[Dict[str, Any]]:
+        """Guides contenant un segment, avec leur nombre de groupes et d'éléments"""
+        query = ("SELECT d.name AS document, s.code AS segment, s.description, "
+                 "(SELECT COUNT(*) FROM groups g WHERE g.document_id = s.document_id AND g.segment = s.code) AS groupes, "
+                 "(SELECT COUNT(*) FROM elements e WHERE e.document_id = s.document_id AND e.segment = s.code) AS champs "
+                 "FROM segments s JOIN documents d ON d.id = s.document_id WHERE s.code = ? ORDER BY d.name")
+        return [dict(row) for row in self.conn.execute(query, (code,))]
+
+    def documents(self) -> List[Dict[str, Any]]:
+        """Documents indexés avec leur nombre de segments et d'éléments"""
+        query = ("SELECT d.name AS document, d.path, d.pdf_format, "
+                 "(SELECT COUNT(*) FROM segments s WHERE s.document_id = d.id) AS segments, "
+                 "(SELECT COUNT(*) FROM elements e WHERE e.document_id = d.id) AS champs "
+                 "FROM documents d ORDER BY d.name")
+        return [dict(row) for row in self.conn.execute(query)]
+
+
+def _document_paths(export_path: Path) -> List[str]:
+    """Chemins des exports d'un même guide, tous formats confondus"""
+    return [str(export_path.with_suffix(pattern[1:])) for pattern in EXPORT_PATTERNS]
+
+
+def _exports_by_stem(export_dir: Path) -> List[tuple]:
+    """(export, stat) de chaque guide d'un dossier : l'export le plus récent parmi ses formats"""
+    exports: Dict[str, tuple] = {}
+    for pattern in EXPORT_PATTERNS:
+        for export_path in export_dir.glob(pattern):
+            stat = export_path.stat()
+            current = exports.get(export_path.stem)
+            if current is None or stat.st_mtime > current[1].st_mtime:
+                exports[export_path.stem] = (export_path, stat)
+    return [exports[stem] for stem in sorted(exports)]
+
+
+def _element_row(segment: str, group: Optional[str], group_position: Optional[int], position: int,
+                 element: Dict[str, Any]) -> tuple:
+    return (segment, group, group_position, position, element["champ"], element.get("description", ""),
+            element.get("format", ""), element.get("valeur", ""), element.get("usage", ""))
+
+
+def update_index(export_path: Union[str, Path], pdf_format: Optional[str] = None,
+                 db_path: Union[str, Path] = DEFAULT_INDEX_PATH):
+    """Réindexe un export qui vient d'être écrit (une erreur d'index n'interrompt pas l'extraction)"""
+    try:
+        with CorpusIndex(db_path) as index:
+            index.index_export(export_path, pdf_format)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.warning(f"⚠️  Index du corpus non mis à jour ({Path(export_path).name}): {e}")
+
+
+def main():
+    """Indexation et requêtes sur le corpus des exports"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Index SQLite du corpus des guides extraits")
+    parser.add_argument("--db", default=str(DEFAULT_INDEX_PATH), help=f"base SQLite (défaut : {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--json", action="store_true", help="résultats au format JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="indexer les exports nouveaux ou modifiés")
+    sync_parser.add_argument("export_dir", nargs="?", default="export")
+
+    element_parser = commands.add_parser("element", help="occurrences d'un élément (ex. 3035)")
+    element_parser.add_argument("code")
+    element_parser.add_argument("--segment", help="limiter à un segment (ex. NAD)")
+    element_parser.add_argument("--group", help="limiter à un groupe composite (ex. C082)")
+    element_parser.add_argument("--distinct", action="store_true",
+                                help="une ligne par document, segment, groupe et format")
+
+    group_parser = commands.add_parser("group", help="occurrences d'un groupe composite (ex. C082)")
+    group_parser.add_argument("code")
+    group_parser.add_argument("--segment", help="limiter à un segment (ex. NAD)")
+
+    segment_parser = commands.add_parser("segment", help="guides contenant un segment (ex. NAD)")
+    segment_parser.add_argument("code")
+
+    commands.add_parser("documents", help="documents indexés")
+
+    args = parser.parse_args()
+    configure_logging(1)
+
+    with CorpusIndex(args.db) as index:
+        if args.command == "sync":
+            counts = index.sync(args.export_dir)
+            logger.info(f"✓ Index à jour: {counts['indexed']} indexé(s), {counts['unchanged']} inchangé(s), "
+                        f"{counts['removed']} retiré(s) → {args.db}")
+            return
+        if args.command == "element":
+            rows = index.find_elements(args.code, args.segment, args.group, args.distinct)
+        elif args.command == "group":
+            rows = index.find_groups(args.code, args.segment)
+        elif args.command == "segment":
+            rows = index.find_segments(args.code)
+        else:
+            rows = index.documents()
+
+    if args.json:
+        print(json.dumps(rows, indent=4, ensure_ascii=False))
+        return
+    if not rows:
+        logger.info("Aucun résultat")
+        return
+    columns = [column for column in rows[0] if column not in ("usage", "valeur", "path")]
+    for row in rows:
+        logger.info("  ".join(f"{column}={row[column]}" for column in columns if row[column] not in (None, "")))
+    logger.info(f"\n{len(rows)} résultat(s)")
+
+
+if __name__ == "__main__":
+    main()
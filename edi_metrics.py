@@ -0,0 +1,125 @@
+"""
+Instrumentation de l'extraction EDI
+- Logger unique "mapalya.edi" (verbosité : -q avertissements, défaut info, -v détail par page)
+- Chronomètres par étape et par page, compteurs (tableaux, lignes, segments)
+- Capture optionnelle cProfile / tracemalloc
+- Export JSON des métriques, exploitable par l'ordonnanceur de jobs
+"""
+
+import cProfile
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+logger = logging.getLogger("mapalya.edi")
+
+VERBOSITY_LEVELS = {0: logging.WARNING, 1: logging.INFO, 2: logging.DEBUG}
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Écrit sur le sys.stdout courant (reste compatible avec redirect_stdout)"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(verbosity: int = 1):
+    """Configure la sortie console : 0 = avertissements, 1 = progression, 2 = détail par page"""
+    level = VERBOSITY_LEVELS.get(max(0, min(verbosity, 2)))
+    if not any(isinstance(handler, _StdoutHandler) for handler in logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+
+
+class Metrics:
+    """Chronomètres et compteurs d'une extraction"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.pages: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self.extra: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Chronomètre une étape (temps cumulé si l'étape est répétée)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    @contextmanager
+    def page(self, page_num: int):
+        """Chronomètre le traitement d'une page"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.pages.append({"page": page_num, "seconds": seconds})
+            logger.debug(f"   · page {page_num}: {seconds * 1000:.1f} ms")
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def slowest_pages(self, count: int = 5) -> List[Dict[str, Any]]:
+        return sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:count]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "pages": [{"page": page["page"], "seconds": round(page["seconds"], 6)} for page in self.pages],
+            "slowest_pages": [page["page"] for page in self.slowest_pages()],
+            **self.extra,
+        }
+
+
+def write_metrics(path: str, data: Dict[str, Any]):
+    """Écrit un fichier de métriques JSON"""
+    output_file = Path(path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    logger.info(f"✓ Métriques sauvegardées: {output_file}")
+
+
+@contextmanager
+def profiling(metrics: Optional[Metrics] = None, cprofile_path: Optional[str] = None,
+              trace_memory: bool = False):
+    """Capture optionnelle : profil cProfile (fichier .prof) et pic mémoire tracemalloc"""
+    profiler = cProfile.Profile() if cprofile_path else None
+    started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            Path(cprofile_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(cprofile_path)
+            logger.info(f"✓ Profil cProfile sauvegardé: {cprofile_path}")
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            if metrics is not None:
+                metrics.extra["tracemalloc_peak_bytes"] = peak
+            if started_tracemalloc:
+                tracemalloc.stop()
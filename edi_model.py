@@ -0,0 +1,179 @@
+"""
+Modèle mémoire compact des guides EDI : segments, groupes composites et éléments
+- Enregistrements à __slots__ (pas de dict par objet)
+- Codes, formats et descriptions internés : une seule copie des chaînes répétées du corpus
+- Statistiques tenues à jour à chaque ajout (pas de re-parcours après extraction)
+- Conversion à la demande vers la forme JSON de l'export (to_dict), inchangée
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Union
+
+from edi_export import load_segments
+
+_intern = sys.intern
+
+
+class Element:
+    """Élément de données : code, description, format, exemple/valeur, usage"""
+
+    __slots__ = ("champ", "description", "format", "valeur", "usage")
+
+    def __init__(self, champ: str, description: str, format: str, valeur: str, usage: str):
+        self.champ = _intern(champ)
+        self.description = _intern(description)
+        self.format = _intern(format)
+        self.valeur = valeur
+        self.usage = usage
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "champ": self.champ,
+            "description": self.description,
+            "format": self.format,
+            "valeur": self.valeur,
+            "usage": self.usage
+        }
+
+
+class Group:
+    """Groupe composite (C082, S001...) et ses éléments"""
+
+    __slots__ = ("groupe", "description", "champs")
+
+    def __init__(self, groupe: str, description: str):
+        self.groupe = _intern(groupe)
+        self.description = _intern(description)
+        self.champs: List[Element] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "groupe": self.groupe,
+            "description": self.description,
+            "champs": [champ.to_dict() for champ in self.champs]
+        }
+
+
+class Segment:
+    """Segment et ses éléments simples et groupes, dans l'ordre du guide"""
+
+    __slots__ = ("segment", "description", "elements")
+
+    def __init__(self, segment: str, description: str):
+        self.segment = _intern(segment)
+        self.description = _intern(description)
+        self.elements: List[Union[Element, Group]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "segment": self.segment,
+            "description": self.description,
+            "elements": [element.to_dict() for element in self.elements]
+        }
+
+
+class Guideline:
+    """Segments d'un guide (ordre du document) et statistiques tenues à jour
+
+    Tous les ajouts passent par open_segment / add_group / add_element.
+    """
+
+    __slots__ = ("segments", "total_elements", "simple_elements", "groups", "elements_in_groups",
+                 "elements_with_format", "elements_with_value", "elements_with_usage")
+
+    def __init__(self):
+        self.segments: Dict[str, Segment] = {}
+        self.total_elements = 0
+        self.simple_elements = 0
+        self.groups = 0
+        self.elements_in_groups = 0
+        self.elements_with_format = 0
+        self.elements_with_value = 0
+        self.elements_with_usage = 0
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __iter__(self) -> Iterator[Segment]:
+        return iter(self.segments.values())
+
+    def open_segment(self, code: str, description: str) -> Optional[Segment]:
+        """Crée un segment à sa première occurrence (None s'il existait déjà)"""
+        if code in self.segments:
+            return None
+        segment = self.segments[code] = Segment(code, description)
+        return segment
+
+    def add_group(self, segment: Segment, code: str, description: str) -> Group:
+        group = Group(code, description)
+        segment.elements.append(group)
+        self.total_elements += 1
+        self.groups += 1
+        return group
+
+    def add_element(self, segment: Segment, group: Optional[Group], code: str, description: str,
+                    format: str, valeur: str, usage: str) -> Element:
+        """Ajoute un élément au groupe courant, ou directement au segment"""
+        element = Element(code, description, format, valeur, usage)
+        if group is not None:
+            group.champs.append(element)
+            self.elements_in_groups += 1
+        else:
+            segment.elements.append(element)
+            self.total_elements += 1
+            self.simple_elements += 1
+        if format:
+            self.elements_with_format += 1
+        if valeur:
+            self.elements_with_value += 1
+        if usage:
+            self.elements_with_usage += 1
+        return element
+
+    def statistics(self) -> Dict[str, int]:
+        """Statistiques courantes (même forme que AdaptiveEDIExtractor.get_statistics)"""
+        return {
+            "segments": len(self.segments),
+            "total_elements": self.total_elements, "simple_elements": self.simple_elements,
+            "groups": self.groups, "elements_in_groups": self.elements_in_groups,
+            "elements_with_format": self.elements_with_format,
+            "elements_with_value": self.elements_with_value,
+            "elements_with_usage": self.elements_with_usage
+        }
+
+    def to_dicts(self, sort: bool = False) -> List[Dict[str, Any]]:
+        """Segments sous la forme JSON de l'export (triés par code si sort)"""
+        codes = sorted(self.segments) if sort else self.segments
+        return [self.segments[code].to_dict() for code in codes]
+
+    @classmethod
+    def from_dicts(cls, segments: List[Dict[str, Any]]) -> "Guideline":
+        """Reconstruit le modèle depuis la forme JSON (export, cache de résultats)"""
+        guideline = cls()
+        for data in segments:
+            segment = guideline.open_segment(data["segment"], data.get("description", ""))
+            if segment is None:
+                continue
+            for item in data.get("elements", []):
+                if "groupe" in item:
+                    group = guideline.add_group(segment, item["groupe"], item.get("description", ""))
+                    for champ in item.get("champs", []):
+                        guideline.add_element(segment, group, champ["champ"], champ.get("description", ""),
+                                              champ.get("format", ""), champ.get("valeur", ""), champ.get("usage", ""))
+                elif "champ" in item:
+                    guideline.add_element(segment, None, item["champ"], item.get("description", ""),
+                                          item.get("format", ""), item.get("valeur", ""), item.get("usage", ""))
+        return guideline
+
+
+def load_export(path: Union[str, Path]) -> Guideline:
+    """Charge un export (JSON ou binaire .edib) dans le modèle compact"""
+    return Guideline.from_dicts(load_segments(path))
+
+
+def load_corpus(export_dir: Union[str, Path] = "export") -> Dict[str, Guideline]:
+    """Charge tous les exports d'un dossier (clé : nom du fichier sans extension ;
+    un guide exporté dans les deux formats est lu depuis son export binaire)"""
+    paths = sorted(Path(export_dir).glob("*.json")) + sorted(Path(export_dir).glob("*.edib"))
+    return {path.stem: load_export(path) for path in paths}
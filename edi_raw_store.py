@@ -0,0 +1,189 @@
+"""
+Couche brute persistée : texte et tableaux de chaque page, par document
+- Écrite une fois lors de l'extraction (option --store-raw)
+- Tableaux persistés : ceux de la zone de segments réellement parsés, avec le format
+  et les réglages qui les ont produits (signature "region", voir region_signature)
+- Relue par StoredSession, qui remplace PDFSession sans ouvrir le PDF
+- Permet de rejouer le parsing (_parse_*_table, clean_description...) sur tout le corpus
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from edi_metrics import logger, configure_logging
+
+
+DEFAULT_RAW_DIR = Path(".edi_cache") / "raw"
+RAW_STORE_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # v1 : tableaux pleine page seulement ("tables")
+
+
+class StoredSession:
+    """Session de lecture sur les pages brutes persistées (même interface que PDFSession)"""
+
+    has_layout = False  # Pas d'objets pdfplumber : ni mots, ni recadrage, ni parallélisme
+
+    def __init__(self, source_name: str, pages: List[Dict[str, Any]], region: Optional[Dict[str, Any]] = None):
+        self.source_name = source_name
+        self._pages = pages
+        self.region = region  # Signature des tableaux de zone persistés (None : aucun)
+        self._region_key = _signature_key(region) if region is not None else None
+
+    def __enter__(self) -> "StoredSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def close(self):
+        pass
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def page_text(self, index: int) -> str:
+        return self._pages[index]["text"]
+
+    def page_tables(self, index: int) -> List[List[List[Optional[str]]]]:
+        """Tableaux pleine page (pages brutes v1 ou fixtures ; vide si absents)"""
+        return self._pages[index].get("tables", [])
+
+    def page_region_tables(self, index: int, region: Dict[str, Any]) -> Optional[List[List[List[Optional[str]]]]]:
+        """Tableaux de zone persistés pour cette signature (None : absents ou produits autrement)"""
+        if self._region_key is None or _signature_key(region) != self._region_key:
+            return None
+        return self._pages[index].get("region_tables")
+
+    def page_over_budget(self, index: int) -> Optional[str]:
+        """Motif d'une page persistée sans tableaux car hors budget lors de l'extraction"""
+        return self._pages[index].get("over_budget")
+
+    def raw_page(self, index: int) -> Dict[str, Any]:
+        return dict(self._pages[index])
+
+    def release_page(self, index: int):
+        pass
+
+
+def _signature_key(region: Dict[str, Any]) -> str:
+    """Forme comparable d'une signature (identique avant et après passage par JSON)"""
+    return json.dumps(region, sort_keys=True, ensure_ascii=False)
+
+
+class RawPageStore:
+    """Stockage disque des pages brutes, un fichier JSON compressé par empreinte de PDF"""
+
+    def __init__(self, store_dir: Path = DEFAULT_RAW_DIR):
+        self.store_dir = Path(store_dir)
+
+    def _entry_path(self, pdf_hash: str) -> Path:
+        return self.store_dir / f"{pdf_hash}.json.gz"
+
+    def exists(self, pdf_hash: str) -> bool:
+        return self._entry_path(pdf_hash).exists()
+
+    def save(self, pdf_hash: str, source_name: str, session, region: Optional[Dict[str, Any]] = None) -> Path:
+        """Persiste les pages brutes d'une session (session.raw_page, écriture atomique)
+
+        region : signature (format, réglages) des tableaux de zone de la session, qui ne
+        seront relus que pour cette même signature (voir StoredSession.page_region_tables).
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        pages = [session.raw_page(index) for index in range(session.page_count)]
+        document = {"version": RAW_STORE_VERSION, "source": source_name, "region": region, "pages": pages}
+
+        entry_path = self._entry_path(pdf_hash)
+        fd, tmp_name = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8') as f:
+                json.dump(document, f, ensure_ascii=False)
+            os.replace(tmp_name, entry_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        logger.info(f"✓ Pages brutes sauvegardées: {entry_path}")
+        return entry_path
+
+    def load(self, pdf_hash: str) -> StoredSession:
+        """Charge un document persisté sous forme de session"""
+        with gzip.open(self._entry_path(pdf_hash), 'rt', encoding='utf-8') as f:
+            document = json.load(f)
+        if document.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Version de stockage brut non supportée: {document.get('version')}")
+        return StoredSession(document["source"], document["pages"], document.get("region"))
+
+    def hashes(self) -> List[str]:
+        """Empreintes de tous les documents persistés"""
+        if not self.store_dir.exists():
+            return []
+        return sorted(path.name[:-len(".json.gz")] for path in self.store_dir.glob("*.json.gz"))
+
+
+def reparse_all(store: Optional[RawPageStore] = None, index: bool = True) -> List[Dict[str, Any]]:
+    """Rejoue le parsing de tous les documents persistés et réécrit leurs exports
+
+    index : réindexe chaque export réécrit dans l'index SQLite du corpus (voir edi_index)
+    """
+    from edi_codes import write_code_lists
+    from edi_index import update_index
+    from extract_edi_adaptive import AdaptiveEDIExtractor, export_path_for
+
+    store = store or RawPageStore()
+    results = []
+    for pdf_hash in store.hashes():
+        session = store.load(pdf_hash)
+        logger.info(f"\n{'='*70}")
+        logger.info(f"RE-PARSING: {session.source_name}")
+        logger.info(f"{'='*70}\n")
+
+        extractor = AdaptiveEDIExtractor(session.source_name, session=session)
+        segments = extractor.extract_all()
+        fallback_pages = extractor.metrics.counters.get("pages_full_table_fallback", 0)
+        if fallback_pages:
+            logger.warning(f"⚠️  {fallback_pages} page(s) relue(s) sur leurs tableaux pleine page "
+                           f"(format ou réglages différents de l'extraction) : résultat non garanti "
+                           f"identique, ré-extraire le PDF avec --store-raw")
+        output_json = export_path_for(Path(session.source_name))
+        if segments:
+            extractor.save_to_json(output_json)
+            write_code_lists(extractor.code_lists, output_json)
+            if index:
+                update_index(output_json, extractor.pdf_format)
+        results.append({"source": session.source_name, "segments": len(segments), "export": output_json,
+                        "fallback_pages": fallback_pages})
+    return results
+
+
+def main():
+    """Re-parsing du corpus depuis la couche brute, sans ouvrir les PDF"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-parsing des exports depuis les pages brutes persistées")
+    parser.add_argument("--store", default=str(DEFAULT_RAW_DIR),
+                        help=f"dossier des pages brutes (défaut : {DEFAULT_RAW_DIR})")
+    parser.add_argument("-q", "--quiet", action="store_true", help="n'afficher que les avertissements et erreurs")
+    parser.add_argument("--no-index", action="store_false", dest="index",
+                        help="ne pas mettre à jour l'index SQLite du corpus (edi_index)")
+    args = parser.parse_args()
+    configure_logging(0 if args.quiet else 1)
+
+    results = reparse_all(RawPageStore(Path(args.store)), index=args.index)
+    if not results:
+        logger.error(f"❌ Aucun document dans '{args.store}' (extraire avec --store-raw)")
+        return
+
+    logger.info(f"\n{'='*70}")
+    logger.info(f"✅ RE-PARSING TERMINÉ: {len(results)} document(s)")
+    logger.info(f"{'='*70}")
+    for result in results:
+        logger.info(f"  ✅ {result['source']} → {result['export']} ({result['segments']} segments)")
+
+
+if __name__ == "__main__":
+    main()
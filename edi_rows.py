@@ -0,0 +1,281 @@
+"""
+Moteur de parsing des tableaux EDI, piloté par une description déclarative de chaque format
+- FormatSpec : colonnes, en-têtes de segment, règles de suite d'usage, préfiltre des pages
+- La spec est compilée une seule fois en une boucle de classification rapide :
+  expressions régulières compilées, chaque ligne nettoyée et classée en une seule passe
+  (en-tête de segment, groupe, élément, suite d'usage ou ignorée)
+- Les suites d'usage multi-lignes sont précalculées par un parcours arrière (O(n)),
+  sans re-balayer le tableau à partir de chaque ligne
+- Un nouveau guide (Odette, VDA 4938, DELFOR/DESADV d'un client...) = une nouvelle spec
+  enregistrée avec register_format, sans nouvelle boucle de parsing
+"""
+
+import re
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Pattern, Callable
+
+
+# Types de lignes
+ROW_SKIP = "skip"
+ROW_SEGMENT = "segment"
+ROW_GROUP = "group"
+ROW_ELEMENT = "element"
+ROW_CONTINUATION = "continuation"
+
+GROUP_CODE_RE = re.compile(r'^[SC]\d{3}$')
+ELEMENT_CODE_RE = re.compile(r'^\d{4}$')
+# Code seul dans une cellule : arrête la consolidation des usages
+STOP_CODE_RE = re.compile(r'^(?:\d{4}|[SC]\d{3})$')
+
+# VDA 4932 : en-tête de page "Segment: NAD Cons. No.: 14 Level: 1 Name and address"
+VDA_SEGMENT_TEXT_RE = re.compile(
+    r'Segment:\s+(?P<code>[A-Z]{3})\s+Cons\.\s*No\.:\s*(?P<cons_no>\d+)\s+Level:\s*(?P<level>\d+)\s+(?P<description>.*?)(?=\n|$)'
+)
+# VDA 4932 : "3035 Party qualifier" ou "C082 Party identification details"
+VDA_LABEL_RE = re.compile(r'^([SC]?\d{3,4})\s+(.+)$')
+VDA_CONTINUATION_RE = re.compile(r"^['\"]?[A-Z0-9]+['\"]?\s*=|^[A-Z][a-z]+\s+[A-Z]")
+
+# Faurecia : en-tête "Segment: NAD ... Pos.: 14 Level: 1 Name and address"
+FAURECIA_SEGMENT_RE = re.compile(r'Segment:\s*([A-Z]{3})')
+FAURECIA_SEGMENT_DESC_RE = re.compile(r'Pos\.:\s*\d+.*?([A-Z][\w\s/]+)$')
+FAURECIA_CONTINUATION_RE = re.compile(r'^[A-Z0-9]+\s*=')
+
+
+def clean_row(row: List[Optional[str]]) -> List[str]:
+    """Convertit les cellules en texte sans espaces superflus"""
+    return [str(cell).strip() if cell else '' for cell in row]
+
+
+def classify_code(code: str) -> str:
+    """Type d'un code : groupe composite (C082, S001), élément (3035) ou autre"""
+    if GROUP_CODE_RE.match(code):
+        return ROW_GROUP
+    if ELEMENT_CODE_RE.match(code):
+        return ROW_ELEMENT
+    return ROW_SKIP
+
+
+class RowClassifier:
+    """Nettoyage des lignes et précalcul des suites d'usage pour une disposition de colonnes
+
+    code_col             : colonne du code (un code seul arrête une suite d'usage)
+    usage_col            : colonne de l'usage (suites d'usage lues dans cette colonne)
+    continuation_width   : nombre minimal de cellules d'une ligne de suite d'usage
+    continuation_re      : motif d'une suite d'usage ("'380'= ...", "XXX = ...")
+    """
+
+    def __init__(self, usage_col: int, continuation_width: int, continuation_re: Pattern, code_col: int = 0):
+        self.code_col = code_col
+        self.usage_col = usage_col
+        self.continuation_width = continuation_width
+        self.continuation_re = continuation_re
+
+    def prepare(self, table: List[List[Optional[str]]]) -> Tuple[List[Optional[List[str]]], List[int]]:
+        """Nettoie chaque ligne une fois et calcule la fin des suites d'usage
+
+        run_end[i] : indice de la première ligne à partir de i qui n'est pas une suite d'usage
+        (les suites d'usage d'une ligne i sont donc les lignes i+1 .. run_end[i+1]-1)
+        """
+        rows = [clean_row(row) if row else None for row in table]
+        code_col = self.code_col
+        usage_col = self.usage_col
+        width = self.continuation_width
+        match_continuation = self.continuation_re.match
+        match_stop = STOP_CODE_RE.match
+
+        count = len(rows)
+        run_end = [count] * (count + 1)
+        for index in range(count - 1, -1, -1):
+            row = rows[index]
+            if (row is not None and len(row) >= width
+                    and not (row[code_col] and match_stop(row[code_col]))
+                    and row[usage_col] and match_continuation(row[usage_col])):
+                run_end[index] = run_end[index + 1]
+            else:
+                run_end[index] = index
+        return rows, run_end
+
+    def collect_usage(self, rows: List[Optional[List[str]]], run_end: List[int], index: int, first: str) -> str:
+        """Usage de la ligne `index` complété de ses suites multi-lignes"""
+        end = run_end[index + 1]
+        if end == index + 1:
+            return first
+        usage_col = self.usage_col
+        return '\n'.join([first] + [rows[k][usage_col] for k in range(index + 1, end)])
+
+
+class FormatSpec:
+    """Description déclarative d'un format de guide EDI
+
+    Colonnes des lignes de tableau :
+        code_col          : code du groupe / de l'élément (ou "CODE Description" avec label_re)
+        label_re          : sépare code et description dans code_col (groupes 1 et 2), sinon
+        description_col   : colonne de la description
+        format_col, value_col, usage_col : format, exemple/valeur et usage de l'élément
+        normalize_format  : réduit les blancs multiples du format ("M  an..35" → "M an..35")
+        min_row_cells     : nombre minimal de cellules d'une ligne utile
+        skip_prefixes, skip_contains : lignes d'en-tête de tableau à ignorer (texte de code_col)
+        usage_ignore      : valeurs d'usage vides de sens ("--")
+    Suites d'usage :
+        continuation_re, continuation_width : voir RowClassifier
+    En-têtes de segment (l'un ou l'autre) :
+        segment_text_re   : dans le texte de la page (groupes "code" et "description") ;
+                            les tableaux complètent alors le dernier segment ouvert
+        segment_row_marker, segment_row_re, segment_desc_re : dans une ligne de tableau ;
+                            les lignes qui précèdent le premier en-tête sont ignorées
+    Tableaux :
+        min_table_rows    : taille minimale d'un tableau parsé
+        page_marker       : une page sans ce motif dans son texte n'a aucun tableau de segment
+        table_anchor      : motif cherché dans les caractères (lignes séparées par "\\n"),
+                            la détection des tableaux commence juste au-dessus de sa
+                            première occurrence (voir _region_bbox)
+        table_settings    : réglages pdfplumber de la détection des tableaux
+    """
+
+    def __init__(self, name: str, label: str, format_col: int, value_col: int, usage_col: int,
+                 continuation_re: Pattern, continuation_width: int, min_table_rows: int,
+                 page_marker: Pattern, table_anchor: Pattern, code_col: int = 0,
+                 label_re: Optional[Pattern] = None, description_col: int = 1,
+                 normalize_format: bool = False, min_row_cells: int = 1,
+                 skip_prefixes: Tuple[str, ...] = (), skip_contains: Tuple[str, ...] = (),
+                 usage_ignore: Tuple[str, ...] = (), segment_text_re: Optional[Pattern] = None,
+                 segment_row_marker: Optional[str] = None, segment_row_re: Optional[Pattern] = None,
+                 segment_desc_re: Optional[Pattern] = None, table_settings: Optional[Dict[str, Any]] = None):
+        if (segment_text_re is None) == (segment_row_re is None):
+            raise ValueError(f"Format {name}: segment_text_re ou segment_row_re (un seul) est requis")
+        self.name = name
+        self.label = label
+        self.code_col = code_col
+        self.label_re = label_re
+        self.description_col = description_col
+        self.format_col = format_col
+        self.value_col = value_col
+        self.usage_col = usage_col
+        self.normalize_format = normalize_format
+        self.min_row_cells = min_row_cells
+        self.skip_prefixes = skip_prefixes
+        self.skip_contains = skip_contains
+        self.usage_ignore = usage_ignore
+        self.min_table_rows = min_table_rows
+        self.segment_text_re = segment_text_re
+        self.segment_row_marker = segment_row_marker
+        self.segment_row_re = segment_row_re
+        self.segment_desc_re = segment_desc_re
+        self.page_marker = page_marker
+        self.table_anchor = table_anchor
+        self.table_settings = table_settings or {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+        self.rows = RowClassifier(usage_col, continuation_width, continuation_re, code_col=code_col)
+        self.iter_rows = compile_row_handler(self)
+
+    @property
+    def segments_in_tables(self) -> bool:
+        """Les en-têtes de segment sont des lignes de tableau (sinon : texte de la page)"""
+        return self.segment_row_re is not None
+
+
+def compile_row_handler(spec: FormatSpec) -> Callable[[List[List[Optional[str]]]], Iterator[Tuple[str, str, str, str, str, str]]]:
+    """Compile une spec en une fonction de classification des lignes d'un tableau
+
+    La fonction produit (type, code, description brute, format, valeur, usage) :
+    ROW_SEGMENT (format, valeur, usage vides), ROW_GROUP (idem) ou ROW_ELEMENT.
+    """
+    prepare = spec.rows.prepare
+    collect_usage = spec.rows.collect_usage
+    code_col = spec.code_col
+    description_col = spec.description_col
+    format_col = spec.format_col
+    value_col = spec.value_col
+    usage_col = spec.usage_col
+    normalize_format = spec.normalize_format
+    min_row_cells = spec.min_row_cells
+    skip_prefixes = spec.skip_prefixes
+    search_skip = re.compile('|'.join(map(re.escape, spec.skip_contains))).search if spec.skip_contains else None
+    usage_ignore = spec.usage_ignore
+    match_label = spec.label_re.match if spec.label_re is not None else None
+    segment_marker = spec.segment_row_marker
+    search_segment = spec.segment_row_re.search if spec.segment_row_re is not None else None
+    search_segment_desc = spec.segment_desc_re.search if spec.segment_desc_re is not None else None
+
+    def iter_rows(table: List[List[Optional[str]]]) -> Iterator[Tuple[str, str, str, str, str, str]]:
+        rows, run_end = prepare(table)
+
+        for index, row in enumerate(rows):
+            if row is None or len(row) < min_row_cells:
+                continue
+
+            # En-tête de segment dans le tableau (test rapide avant l'expression régulière)
+            if search_segment is not None:
+                row_text = ' '.join(row)
+                if segment_marker in row_text:
+                    segment_match = search_segment(row_text)
+                    if segment_match:
+                        desc_match = search_segment_desc(row_text) if search_segment_desc else None
+                        yield ROW_SEGMENT, segment_match.group(1), desc_match.group(1).strip() if desc_match else "", '', '', ''
+                        continue
+
+            cell = row[code_col]
+            if not cell or (skip_prefixes and cell.startswith(skip_prefixes)):
+                continue
+            if search_skip is not None and search_skip(cell):
+                continue
+
+            if match_label is not None:
+                label_match = match_label(cell)
+                if not label_match:
+                    continue
+                code, description = label_match.group(1), label_match.group(2).strip()
+            else:
+                code, description = cell, row[description_col] if len(row) > description_col else ''
+
+            kind = classify_code(code)
+            if kind == ROW_SKIP:
+                continue
+            if kind == ROW_GROUP:
+                yield kind, code, description, '', '', ''
+                continue
+
+            format_str = row[format_col] if len(row) > format_col else ''
+            if normalize_format and format_str:
+                format_str = ' '.join(format_str.split())
+            usage = row[usage_col] if len(row) > usage_col else ''
+            if usage:
+                usage = collect_usage(rows, run_end, index, usage) if usage not in usage_ignore else ''
+            yield kind, code, description, format_str, row[value_col] if len(row) > value_col else '', usage
+
+    return iter_rows
+
+
+FORMAT_SPECS: Dict[str, FormatSpec] = {}
+
+
+def register_format(spec: FormatSpec):
+    """Ajoute (ou remplace) la spec d'un format (détecteur associé : edi_detect.register_detector)"""
+    FORMAT_SPECS[spec.name] = spec
+
+
+# VDA 4932 : Col 0 "CODE Description" | Format | Exemple/Valeur | Usage, en-têtes de segment dans le texte
+VDA4932_SPEC = FormatSpec(
+    'vda4932', 'VDA 4932',
+    label_re=VDA_LABEL_RE, format_col=1, value_col=2, usage_col=3,
+    min_row_cells=2, skip_prefixes=('S.Format',), skip_contains=('Segment can/must',), usage_ignore=('--',),
+    continuation_re=VDA_CONTINUATION_RE, continuation_width=4,
+    segment_text_re=VDA_SEGMENT_TEXT_RE,
+    min_table_rows=3,
+    # Une page de suite (codes sans en-tête "Segment:") reste qualifiée
+    page_marker=re.compile(r'Segment:|^[SC]?\d{3,4}\s+\S', re.MULTILINE),
+    # Ancre : titre du segment, ligne d'en-tête du tableau, ou code en début de ligne
+    # (colonne des codes) ; un nombre dans le texte courant n'est pas une ancre
+    table_anchor=re.compile(r'Segment:|S\.Format|^[SC]?\d{3,4}\s+\S', re.MULTILINE),
+)
+register_format(VDA4932_SPEC)
+
+# Faurecia : Code | Description | . | . | Format | . | Valeur | Usage, en-tête "Segment:" dans le tableau
+FAURECIA_SPEC = FormatSpec(
+    'faurecia', 'Faurecia',
+    description_col=1, format_col=4, value_col=6, usage_col=7, normalize_format=True,
+    continuation_re=FAURECIA_CONTINUATION_RE, continuation_width=8,
+    segment_row_marker='Segment:', segment_row_re=FAURECIA_SEGMENT_RE, segment_desc_re=FAURECIA_SEGMENT_DESC_RE,
+    min_table_rows=5,
+    page_marker=re.compile(r'Segment:'),
+    table_anchor=re.compile(r'Segment:'),
+)
+register_format(FAURECIA_SPEC)
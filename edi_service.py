@@ -0,0 +1,372 @@
+"""
+Service local d'extraction : des workers déjà démarrés, sans coût de lancement par fichier
+- Serveur HTTP sur localhost, pool de processus dont pdfplumber/pdfminer sont importés au démarrage
+- POST /extract : chemin d'un PDF local ({"path": ...}) ou contenu du PDF (application/pdf)
+  → segments au format de l'export, format détecté, statistiques
+- GET /health : état du service, workers, profondeur de la file ; "degraded" dès la mort
+  d'un worker, jusqu'à la demande suivante qui recrée le pool
+- Client léger : extraction dans le processus courant si le service ne répond pas
+
+Exemples :
+    python edi_service.py serve --jobs 2                       # http://127.0.0.1:8765
+    python edi_service.py extract "schema/INVOICE4932englisch.pdf" -o invoice.json
+    python edi_service.py health
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from edi_budget import make_process_pool
+from edi_metrics import logger, configure_logging
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+HEALTH_TIMEOUT = 1.0      # secondes : un service absent est détecté rapidement
+EXTRACT_TIMEOUT = 600.0
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+
+def extract_document(pdf_path: Union[str, Path], source_name: Optional[str] = None,
+                     use_cache: bool = True) -> Dict[str, Any]:
+    """Extrait un PDF et retourne {"source", "pdf_format", "segments", "statistics", "cache_hit"}
+
+    Segments triés par code, comme dans l'export ; même cache de résultats que process_pdf.
+    """
+    from edi_cache import ResultCache, file_sha256
+    from extract_edi_adaptive import AdaptiveEDIExtractor, result_cache_key, restore_cached, store_cached
+
+    pdf_path = Path(pdf_path)
+    extractor = AdaptiveEDIExtractor(str(pdf_path))
+    cache = ResultCache() if use_cache else None
+    cache_key = None
+    cached = None
+    if cache is not None:
+        cache_key = result_cache_key(file_sha256(pdf_path))
+        cached = cache.get(cache_key)
+
+    if cached is not None:
+        restore_cached(extractor, cached)
+    else:
+        extractor.extract_all()
+        store_cached(cache, cache_key, extractor)
+
+    return {
+        "source": source_name or pdf_path.name,
+        "pdf_format": extractor.pdf_format,
+        "segments": extractor.model.to_dicts(sort=True),
+        "statistics": extractor.get_statistics(),
+        "cache_hit": cached is not None,
+    }
+
+
+def _warm_worker(verbosity: int):
+    """Initialisation d'un worker : imports lourds faits une fois pour toutes"""
+    configure_logging(verbosity)
+    import pdfplumber  # noqa: F401
+    import extract_edi_adaptive  # noqa: F401
+
+
+def _ready():
+    """Tâche vide : force le démarrage (et l'initialisation) des workers"""
+
+
+class ExtractionService:
+    """Pool de workers d'extraction et compteurs exposés par /health"""
+
+    def __init__(self, jobs: int = 1, use_cache: bool = True, verbosity: int = 0):
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.verbosity = verbosity
+        self.pool = self._new_pool()
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.queued = 0      # demandes soumises, pas encore terminées
+        self.processed = 0
+        self.failed = 0
+        self.restarts = 0    # pools recréés après la mort d'un worker
+        self._pool_broken = False  # worker mort : pool recréé à la demande suivante
+
+    def _new_pool(self):
+        return make_process_pool(self.jobs, initializer=_warm_worker, initargs=(self.verbosity,))
+
+    def _mark_broken(self, pool):
+        """Signale un pool cassé (worker mort) ; il est recréé à la demande suivante"""
+        with self._lock:
+            if self.pool is not pool or self._pool_broken:
+                return
+            self._pool_broken = True
+        logger.warning("⚠️  Worker d'extraction arrêté brutalement, pool recréé à la demande suivante")
+
+    def _restart_pool(self, broken_pool):
+        """Remplace un pool cassé (une seule fois si plusieurs demandes le trouvent cassé)"""
+        with self._lock:
+            if self.pool is not broken_pool:
+                return
+            self.pool = self._new_pool()
+            self._pool_broken = False
+            self.restarts += 1
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"   Pool de workers recréé ({self.restarts})")
+
+    def _submit(self, *args):
+        """Soumet une tâche ; un pool cassé est recréé avant la soumission"""
+        pool = self.pool
+        if self._pool_broken:
+            self._restart_pool(pool)
+            pool = self.pool
+        try:
+            return pool, pool.submit(*args)
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self.pool
+            return pool, pool.submit(*args)
+
+    def warm_up(self):
+        """Démarre tous les workers (imports faits avant la première demande)"""
+        for future in [self._submit(_ready)[1] for _ in range(self.jobs)]:
+            future.result()
+        logger.info(f"✓ {self.jobs} worker(s) prêt(s)")
+
+    def extract(self, pdf_path: Path, source_name: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            self.queued += 1
+        start = time.perf_counter()
+        try:
+            pool, future = self._submit(extract_document, pdf_path, source_name, self.use_cache)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # Worker mort (mémoire, signal) : le pool refuserait toutes les demandes suivantes
+                self._mark_broken(pool)
+                raise RuntimeError(f"Worker d'extraction arrêté brutalement pendant {source_name or pdf_path.name}")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.queued -= 1
+        with self._lock:
+            self.processed += 1
+        result["duration"] = round(time.perf_counter() - start, 6)
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                # Worker mort : dégradé jusqu'à la demande suivante, qui recrée le pool
+                "status": "degraded" if self._pool_broken else "ok",
+                "workers": self.jobs,
+                "queue_depth": max(0, self.queued - self.jobs),
+                "in_progress": min(self.queued, self.jobs),
+                "processed": self.processed,
+                "failed": self.failed,
+                "restarts": self.restarts,
+                "uptime": round(time.time() - self.started, 3),
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    service: ExtractionService = None
+
+    def log_message(self, format, *args):
+        logger.debug(f"   {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urllib.parse.urlparse(self.path).path == "/health":
+            self._send_json(200, self.service.health())
+        else:
+            self._send_json(404, {"error": f"Ressource inconnue: {self.path}"})
+
+    def do_POST(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path != "/extract":
+            self._send_json(404, {"error": f"Ressource inconnue: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            self._send_json(400, {"error": f"Corps de requête absent ou trop volumineux ({length} octets)"})
+            return
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+
+        tmp_name = None
+        if content_type == "application/json":
+            try:
+                pdf_path = Path(json.loads(body)["path"])
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"Requête invalide (attendu {{\"path\": ...}}): {e}"})
+                return
+            if not pdf_path.is_file():
+                self._send_json(404, {"error": f"Fichier introuvable: {pdf_path}"})
+                return
+            source_name = pdf_path.name
+        else:
+            # Contenu du PDF : fichier temporaire lu par le worker
+            source_name = urllib.parse.parse_qs(url.query).get("name", ["document.pdf"])[0]
+            fd, tmp_name = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            pdf_path = Path(tmp_name)
+
+        try:
+            result = self.service.extract(pdf_path, source_name)
+        except Exception as e:
+            logger.error(f"❌ ERREUR: {source_name}: {e}")
+            self._send_json(500, {"error": str(e)})
+            return
+        finally:
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+        logger.info(f"✅ {result['source']}: {len(result['segments'])} segments ({result['duration']:.2f}s)")
+        self._send_json(200, result)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, jobs: int = 1, use_cache: bool = True):
+    """Démarre le service jusqu'à Ctrl+C"""
+    service = ExtractionService(jobs=jobs, use_cache=use_cache)
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.error(f"❌ Impossible d'écouter sur {host}:{port}: {e}")
+        service.shutdown()
+        return
+    service.warm_up()
+    logger.info(f"🚀 Service d'extraction sur http://{host}:{port} ({jobs} worker(s)) - Ctrl+C pour arrêter")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("\n⏹️  Service arrêté")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+class ExtractionClient:
+    """Client du service ; extraction dans le processus courant si le service ne répond pas"""
+
+    def __init__(self, url: str = DEFAULT_URL, fallback: bool = True, timeout: float = EXTRACT_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.fallback = fallback
+        self.timeout = timeout
+
+    def _request(self, request: urllib.request.Request, timeout: float) -> Dict[str, Any]:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            # Le service a répondu : son erreur est celle de l'extraction, pas de repli
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RuntimeError(f"Service d'extraction: {message}") from None
+
+    def health(self) -> Optional[Dict[str, Any]]:
+        """État du service (None s'il ne répond pas)"""
+        try:
+            return self._request(urllib.request.Request(f"{self.url}/health"), HEALTH_TIMEOUT)
+        except (urllib.error.URLError, OSError, RuntimeError):
+            return None
+
+    def extract(self, pdf_path: Union[str, Path], upload: bool = False) -> Dict[str, Any]:
+        """Extrait un PDF (upload : envoie le contenu au lieu du chemin, service sur une autre arborescence)"""
+        pdf_path = Path(pdf_path)
+        if upload:
+            name = urllib.parse.quote(pdf_path.name)
+            request = urllib.request.Request(f"{self.url}/extract?name={name}", data=pdf_path.read_bytes(),
+                                             headers={"Content-Type": "application/pdf"})
+        else:
+            request = urllib.request.Request(f"{self.url}/extract",
+                                             data=json.dumps({"path": str(pdf_path.resolve())}).encode('utf-8'),
+                                             headers={"Content-Type": "application/json"})
+        try:
+            result = self._request(request, self.timeout)
+            result["served_by"] = "service"
+            return result
+        except (urllib.error.URLError, ConnectionError) as e:
+            if not self.fallback:
+                raise
+            logger.debug(f"   Service indisponible ({e}), extraction locale")
+        result = extract_document(pdf_path)
+        result["served_by"] = "local"
+        return result
+
+
+def main():
+    """Service d'extraction et client en ligne de commande"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Service local d'extraction EDI (workers préchargés)")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"adresse du service (défaut : {DEFAULT_URL})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="démarrer le service")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                              help="workers d'extraction (défaut : 1)")
+    serve_parser.add_argument("--no-cache", action="store_true", help="ne pas utiliser le cache de résultats")
+
+    extract_parser = commands.add_parser("extract", help="extraire un PDF via le service")
+    extract_parser.add_argument("pdf_file")
+    extract_parser.add_argument("-o", "--output", help="fichier JSON des segments (sinon résumé seul)")
+    extract_parser.add_argument("--upload", action="store_true", help="envoyer le contenu du PDF")
+    extract_parser.add_argument("--no-fallback", action="store_true",
+                                help="échouer si le service ne répond pas")
+
+    commands.add_parser("health", help="état du service")
+
+    args = parser.parse_args()
+    configure_logging(1)
+
+    if args.command == "serve":
+        if args.jobs < 1:
+            parser.error("--jobs doit être >= 1")
+        serve(args.host, args.port, args.jobs, use_cache=not args.no_cache)
+    elif args.command == "health":
+        health = ExtractionClient(args.url).health()
+        if health is None:
+            logger.error(f"❌ Service injoignable: {args.url}")
+        else:
+            logger.info(json.dumps(health, indent=4, ensure_ascii=False))
+    else:
+        client = ExtractionClient(args.url, fallback=not args.no_fallback)
+        try:
+            result = client.extract(args.pdf_file, upload=args.upload)
+        except (RuntimeError, OSError) as e:
+            logger.error(f"❌ ERREUR: {e}")
+            return
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result["segments"], f, indent=4, ensure_ascii=False)
+        logger.info(f"✅ {result['source']}: {len(result['segments'])} segments, format {result['pdf_format']} "
+                    f"({result['served_by']}{', cache' if result['cache_hit'] else ''})")
+
+
+if __name__ == "__main__":
+    main()
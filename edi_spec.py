@@ -0,0 +1,321 @@
+"""
+Accès direct à la spécification d'un guide EDI par code ou par chemin
+- Chemins "SEG", "SEG/ELEM", "SEG/GRP" et "SEG/GRP/ELEM" (ex. UNH/S009/0065)
+- Table des chemins aplatie calculée une fois : une recherche = un accès de dictionnaire
+- Table persistée en fichier (.edis, table de hachage) relue par mmap à la demande :
+  les processus qui ouvrent le même fichier partagent une seule copie en mémoire
+
+Exemples :
+    python edi_spec.py build export/INVOICE4932englisch.json   # écrit export/INVOICE4932englisch.edis
+    python edi_spec.py lookup export/INVOICE4932englisch.edis UNH/S009/0065 NAD/3035
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Union
+
+from edi_export import dumps_compact, loads, load_segments, mkstemp_export
+from edi_metrics import logger, configure_logging
+
+
+SPEC_SUFFIX = ".edis"
+PATH_SEPARATOR = "/"
+ELEMENT_KEY_PREFIX = "*/"  # clé des occurrences d'un code élément dans tout le guide
+
+KIND_SEGMENT = "segment"
+KIND_GROUP = "group"
+KIND_ELEMENT = "element"
+
+# Fichier .edis : en-tête, table de hachage (adresse ouverte, sondage linéaire)
+# puis enregistrements [longueur clé][clé][longueur entrées][entrées en JSON compact]
+SPEC_MAGIC = b"EDIS"
+SPEC_VERSION = 1
+_HEADER = struct.Struct(">4sBII")
+_SLOT = struct.Struct(">I")
+_KEY_LENGTH = struct.Struct(">H")
+_PAYLOAD_LENGTH = struct.Struct(">I")
+_EMPTY_SLOT = 0  # aucun enregistrement ne commence à l'offset 0 (en-tête)
+
+
+def _path(*codes: Optional[str]) -> str:
+    return PATH_SEPARATOR.join(code for code in codes if code)
+
+
+def build_path_table(segments: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Table aplatie {chemin: [entrées]} depuis la forme JSON de l'export
+
+    Un code répété dans un segment (ex. C082 dans chaque variante de NAD) donne plusieurs
+    entrées sous le même chemin, dans l'ordre du guide ; la clé "*/CODE" liste
+    toutes les occurrences d'un code élément.
+    """
+    table: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add(key: str, entry: Dict[str, Any]):
+        table.setdefault(key, []).append(entry)
+
+    def add_element(segment_code: str, group_code: Optional[str], position: int, element: Dict[str, Any]):
+        path = _path(segment_code, group_code, element["champ"])
+        entry = {
+            "path": path, "kind": KIND_ELEMENT, "segment": segment_code, "groupe": group_code,
+            "champ": element["champ"], "description": element.get("description", ""),
+            "format": element.get("format", ""), "valeur": element.get("valeur", ""),
+            "usage": element.get("usage", ""), "position": position
+        }
+        add(path, entry)
+        add(ELEMENT_KEY_PREFIX + element["champ"], entry)
+
+    for segment in segments:
+        code = segment["segment"]
+        items = segment.get("elements", [])
+        add(code, {
+            "path": code, "kind": KIND_SEGMENT, "segment": code,
+            "description": segment.get("description", ""),
+            "elements": [item.get("groupe") or item.get("champ") for item in items]
+        })
+        for position, item in enumerate(items):
+            if "groupe" in item:
+                champs = item.get("champs", [])
+                add(_path(code, item["groupe"]), {
+                    "path": _path(code, item["groupe"]), "kind": KIND_GROUP, "segment": code,
+                    "groupe": item["groupe"], "description": item.get("description", ""),
+                    "champs": [champ["champ"] for champ in champs], "position": position
+                })
+                for champ_position, champ in enumerate(champs):
+                    add_element(code, item["groupe"], champ_position, champ)
+            elif "champ" in item:
+                add_element(code, None, position, item)
+    return table
+
+
+class _SpecLookup(ABC):
+    """Recherches communes, sur une table {chemin: [entrées]} (mémoire ou fichier)"""
+
+    @abstractmethod
+    def entries(self, key: str) -> List[Dict[str, Any]]:
+        """Entrées d'une clé (chemin ou "*/CODE"), liste vide si absente"""
+
+    def resolve(self, path: str) -> Optional[Dict[str, Any]]:
+        """Première entrée d'un chemin (None si absent)"""
+        entries = self.entries(path)
+        return entries[0] if entries else None
+
+    def resolve_all(self, path: str) -> List[Dict[str, Any]]:
+        """Toutes les occurrences d'un chemin, dans l'ordre du guide"""
+        return self.entries(path)
+
+    def __contains__(self, path: str) -> bool:
+        return bool(self.entries(path))
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        entry = self.resolve(path)
+        if entry is None:
+            raise KeyError(path)
+        return entry
+
+    def segment(self, code: str) -> Optional[Dict[str, Any]]:
+        return self.resolve(code)
+
+    def group(self, segment: str, code: str) -> Optional[Dict[str, Any]]:
+        return self.resolve(_path(segment, code))
+
+    def element(self, segment: str, code: str, group: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self.resolve(_path(segment, group, code))
+
+    def find_element(self, code: str) -> List[Dict[str, Any]]:
+        """Toutes les occurrences d'un code élément (ex. 3035), tous segments confondus"""
+        return self.entries(ELEMENT_KEY_PREFIX + code)
+
+
+class GuidelineSpec(_SpecLookup):
+    """Spécification en mémoire d'un guide (table des chemins calculée à la construction)"""
+
+    def __init__(self, segments: Iterable[Dict[str, Any]]):
+        self.table = build_path_table(segments)
+
+    @classmethod
+    def from_guideline(cls, guideline) -> "GuidelineSpec":
+        """Depuis le modèle d'une extraction (AdaptiveEDIExtractor.model)"""
+        return cls(guideline.to_dicts())
+
+    @classmethod
+    def from_export(cls, path: Union[str, Path]) -> "GuidelineSpec":
+        """Depuis un export (JSON ou binaire .edib)"""
+        return cls(load_segments(path))
+
+    def entries(self, key: str) -> List[Dict[str, Any]]:
+        return self.table.get(key, [])
+
+    def paths(self) -> List[str]:
+        """Chemins de la table (sans les clés "*/CODE")"""
+        return [key for key in self.table if not key.startswith(ELEMENT_KEY_PREFIX)]
+
+    def write(self, output_path: Union[str, Path]) -> Path:
+        """Persiste la table des chemins (.edis, écriture atomique)"""
+        return write_spec_table(self.table, output_path)
+
+
+def _slot_index(key: bytes, slot_count: int) -> int:
+    return zlib.crc32(key) & (slot_count - 1)
+
+
+def write_spec_table(table: Dict[str, List[Dict[str, Any]]], output_path: Union[str, Path]) -> Path:
+    """Écrit une table {chemin: [entrées]} en table de hachage adressable par mmap"""
+    output_path = Path(output_path)
+    slot_count = 1
+    while slot_count < 2 * max(len(table), 1):  # taux de remplissage <= 50 %
+        slot_count *= 2
+
+    slots = [_EMPTY_SLOT] * slot_count
+    records = bytearray()
+    offset = _HEADER.size + slot_count * _SLOT.size
+    for key, entries in table.items():
+        key_bytes = key.encode('utf-8')
+        payload = dumps_compact(entries)
+        index = _slot_index(key_bytes, slot_count)
+        while slots[index] != _EMPTY_SLOT:
+            index = (index + 1) & (slot_count - 1)
+        slots[index] = offset + len(records)
+        records += _KEY_LENGTH.pack(len(key_bytes)) + key_bytes + _PAYLOAD_LENGTH.pack(len(payload)) + payload
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = mkstemp_export(output_path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(SPEC_MAGIC, SPEC_VERSION, slot_count, len(table)))
+            f.write(b"".join(_SLOT.pack(slot) for slot in slots))
+            f.write(records)
+        os.replace(tmp_name, output_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return output_path
+
+
+class MappedSpec(_SpecLookup):
+    """Spécification lue dans un fichier .edis projeté en mémoire (mmap)
+
+    Le fichier n'est ouvert qu'à la première recherche et seules les entrées demandées
+    sont décodées. L'objet peut être transmis à des processus de travail : il est
+    sérialisé par son chemin et rouvert dans chaque processus.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._map = None
+        self._slot_count = 0
+        self._key_count = 0
+        self._decoded: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _HEADER.size:
+            data.close()
+            raise ValueError(f"Table de spécification tronquée: {self.path}")
+        magic, version, slot_count, key_count = _HEADER.unpack_from(data, 0)
+        if magic != SPEC_MAGIC or version != SPEC_VERSION:
+            data.close()
+            raise ValueError(f"Table de spécification non supportée: {self.path} ({magic!r}, version {version})")
+        self._map, self._slot_count, self._key_count = data, slot_count, key_count
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._decoded.clear()
+
+    def __enter__(self) -> "MappedSpec":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __len__(self) -> int:
+        if self._map is None:
+            self._open()
+        return self._key_count
+
+    def entries(self, key: str) -> List[Dict[str, Any]]:
+        decoded = self._decoded.get(key)
+        if decoded is not None:
+            return decoded
+        if self._map is None:
+            self._open()
+
+        data = self._map
+        key_bytes = key.encode('utf-8')
+        mask = self._slot_count - 1
+        index = _slot_index(key_bytes, self._slot_count)
+        while True:
+            (offset,) = _SLOT.unpack_from(data, _HEADER.size + index * _SLOT.size)
+            if offset == _EMPTY_SLOT:
+                return []
+            (key_length,) = _KEY_LENGTH.unpack_from(data, offset)
+            key_start = offset + _KEY_LENGTH.size
+            if data[key_start:key_start + key_length] == key_bytes:
+                payload_start = key_start + key_length + _PAYLOAD_LENGTH.size
+                (payload_length,) = _PAYLOAD_LENGTH.unpack_from(data, key_start + key_length)
+                decoded = self._decoded[key] = loads(data[payload_start:payload_start + payload_length])
+                return decoded
+            index = (index + 1) & mask
+
+
+def spec_path_for(export_path: Union[str, Path]) -> Path:
+    """Fichier .edis associé à un export (même dossier, même nom)"""
+    return Path(export_path).with_suffix(SPEC_SUFFIX)
+
+
+def load_spec(path: Union[str, Path]) -> _SpecLookup:
+    """Spécification d'un fichier .edis (mmap) ou d'un export (table construite en mémoire)"""
+    path = Path(path)
+    if path.suffix == SPEC_SUFFIX:
+        return MappedSpec(path)
+    return GuidelineSpec.from_export(path)
+
+
+def main():
+    """Construction des tables .edis et recherche de chemins"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Table des chemins d'un guide EDI (accès direct par code)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="écrire la table .edis d'un ou plusieurs exports")
+    build_parser.add_argument("exports", nargs="+", help="exports JSON ou .edib")
+
+    lookup_parser = commands.add_parser("lookup", help="afficher les entrées de chemins (ex. UNH/S009/0065)")
+    lookup_parser.add_argument("spec", help="table .edis ou export")
+    lookup_parser.add_argument("paths", nargs="+", help="chemins, ou */CODE pour toutes les occurrences d'un élément")
+
+    args = parser.parse_args()
+    configure_logging(1)
+
+    if args.command == "build":
+        for export_path in args.exports:
+            spec = GuidelineSpec.from_export(export_path)
+            output_path = spec.write(spec_path_for(export_path))
+            logger.info(f"✓ Table des chemins: {output_path} ({len(spec.table)} clés)")
+        return
+
+    spec = load_spec(args.spec)
+    for path in args.paths:
+        entries = spec.resolve_all(path)
+        if not entries:
+            logger.warning(f"⚠️  Chemin introuvable: {path}")
+            continue
+        logger.info(json.dumps(entries if len(entries) > 1 else entries[0], indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+"""
+Validation de messages EDIFACT (INVOIC...) contre la spécification extraite d'un guide
+- Le guide est compilé une fois en contrôles positionnels par segment :
+  statut M/C, type (a, n, an) et longueur de chaque élément et composant
+- Lecture en flux des interchanges : chaîne UNA (séparateurs), caractère d'échappement,
+  découpage en segments / éléments / composants
+- Erreurs collectées par message (pas d'arrêt à la première erreur), avec leur chemin
+  (ex. NAD/C082/3039) ; contrôle du nombre de segments et de la référence de UNT
+- En option (--codes), qualifiants contrôlés par les listes de codes du guide (edi_codes)
+- Plusieurs fichiers : répartis sur un pool de processus (guide compilé une fois par processus)
+
+Exemples :
+    python edi_validate.py export/Faurecia_EDI_Guideline_INVOIC_D96A_V2R6.json factures/*.edi
+    python edi_validate.py export/INVOICE4932englisch.json entrant/ --jobs 4 --json rapport.json
+    python edi_validate.py export/INVOICE4932englisch.json entrant/ --codes    # + listes de codes
+"""
+
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union
+
+from edi_codes import load_code_lists
+from edi_export import load_segments
+from edi_metrics import logger, configure_logging
+
+
+INTERCHANGE_PATTERNS = ("*.edi", "*.edifact", "*.txt")
+DEFAULT_ENCODING = "latin-1"  # UNOA / UNOC
+DEFAULT_MAX_ERRORS = 100      # erreurs conservées par message
+READ_CHUNK_SIZE = 1 << 16
+
+ERROR_UNKNOWN_SEGMENT = "unknown_segment"
+ERROR_MISSING = "missing_mandatory"
+ERROR_TYPE = "invalid_type"
+ERROR_LENGTH = "invalid_length"
+ERROR_TOO_MANY_ELEMENTS = "too_many_elements"
+ERROR_TOO_MANY_COMPONENTS = "too_many_components"
+ERROR_SEGMENT_COUNT = "segment_count"
+ERROR_REFERENCE = "reference_mismatch"
+ERROR_STRUCTURE = "structure"
+ERROR_CODE = "invalid_code"
+
+TYPE_ALPHA = "a"
+TYPE_NUMERIC = "n"
+TYPE_ALPHANUMERIC = "an"
+
+# Formats relevés dans les guides : "M an..35", "C n...18", "Man..6", "C an.. 70", "M n6", "C n…12", "C"
+_FORMAT_RE = re.compile(r"([MC])?(an|a|n)?(\.{2,3}|…)?(\d+)?", re.IGNORECASE)
+_NUMERIC_RE = re.compile(r"-?(?:\d+(?:[.,]\d*)?|[.,]\d+)")
+_DIGIT_RE = re.compile(r"\d")
+
+# Segments de service dont l'extraction est souvent incomplète (structure de la syntaxe ISO 9735)
+SERVICE_SEGMENTS = {
+    "UNT": [{"champ": "0074", "format": "M n..6"}, {"champ": "0062", "format": "M an..14"}],
+    "UNZ": [{"champ": "0036", "format": "M n..6"}, {"champ": "0020", "format": "M an..14"}],
+}
+ENVELOPE_SEGMENTS = ("UNA", "UNB", "UNG", "UNE", "UNZ")
+
+
+def parse_format(fmt: str) -> Tuple[bool, Optional[str], Optional[int], bool]:
+    """Format d'un guide → (obligatoire, type, longueur, longueur fixe)
+
+    Un format illisible (ex. "C des D") ne donne que le statut : la valeur n'est pas contrôlée.
+    """
+    compact = "".join((fmt or "").split())
+    match = _FORMAT_RE.fullmatch(compact)
+    if not match:
+        return compact[:1].upper() == "M", None, None, False
+    status, kind, dots, length = match.groups()
+    return (
+        (status or "").upper() == "M",
+        kind.lower() if kind else None,
+        int(length) if length else None,
+        bool(length) and not dots,
+    )
+
+
+class Separators:
+    """Séparateurs d'un interchange (chaîne UNA ou valeurs par défaut de la syntaxe)"""
+
+    __slots__ = ("component", "element", "decimal", "release", "segment")
+
+    def __init__(self, component: str = ":", element: str = "+", decimal: str = ".",
+                 release: str = "?", segment: str = "'"):
+        self.component = component
+        self.element = element
+        self.decimal = decimal
+        self.release = release
+        self.segment = segment
+
+    @classmethod
+    def from_una(cls, una: str) -> "Separators":
+        """Depuis "UNA:+.? '" (le 5e caractère, réservé, est ignoré)"""
+        if len(una) < 9 or not una.startswith("UNA"):
+            raise ValueError(f"Chaîne UNA invalide: {una!r}")
+        component, element, decimal, release, _, segment = una[3:9]
+        return cls(component, element, decimal, release if release != " " else "", segment)
+
+
+def split_escaped(text: str, separator: str, release: str) -> List[str]:
+    """Découpe sur les séparateurs non échappés (les échappements sont conservés)"""
+    if not release or release not in text:
+        return text.split(separator)
+    parts, start, index, length = [], 0, 0, len(text)
+    while index < length:
+        char = text[index]
+        if char == release:
+            index += 2
+            continue
+        if char == separator:
+            parts.append(text[start:index])
+            start = index + 1
+        index += 1
+    parts.append(text[start:])
+    return parts
+
+
+def unescape(value: str, release: str) -> str:
+    """Retire les caractères d'échappement d'une valeur"""
+    if not release or release not in value:
+        return value
+    chars, index, length = [], 0, len(value)
+    while index < length:
+        if value[index] == release and index + 1 < length:
+            index += 1
+        chars.append(value[index])
+        index += 1
+    return "".join(chars)
+
+
+def iter_raw_segments(chunks: Iterable[str]) -> Iterator[Tuple[str, Separators]]:
+    """Segments d'un interchange lu par blocs (sans terminateur ni retours à la ligne)"""
+    separators = None
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        if separators is None:
+            buffer = buffer.lstrip()
+            if len(buffer) < 9 and "UNA".startswith(buffer[:3]):
+                continue  # chaîne UNA incomplète : attendre le bloc suivant
+            separators, buffer = _read_service_string(buffer)
+        parts = split_escaped(buffer, separators.segment, separators.release)
+        buffer = parts.pop()  # segment incomplet : complété par le bloc suivant
+        for part in parts:
+            part = part.strip("\r\n\t ")
+            if part:
+                yield part, separators
+    if separators is None:
+        separators, buffer = _read_service_string(buffer.lstrip())
+        parts = split_escaped(buffer, separators.segment, separators.release)
+        buffer = parts.pop()
+        for part in parts:
+            part = part.strip("\r\n\t ")
+            if part:
+                yield part, separators
+    buffer = buffer.strip("\r\n\t ")
+    if buffer:
+        yield buffer, separators
+
+
+def _read_service_string(data: str) -> Tuple[Separators, str]:
+    """Séparateurs de la chaîne UNA en tête de l'interchange (à défaut ceux de la syntaxe)"""
+    if data.startswith("UNA"):
+        return Separators.from_una(data[:9]), data[9:]
+    return Separators(), data
+
+
+def _leading_value(valeur: str) -> str:
+    """Valeur d'exemple d'un guide sans séparateurs ("+BY" → "BY", ":102'" → "102")"""
+    return (valeur or "").strip().strip("+:'’ ")
+
+
+def _starts_element(valeur: str) -> bool:
+    return (valeur or "").strip().startswith("+")
+
+
+def _split_variants(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Variantes d'un segment décrit plusieurs fois dans le guide (ex. NAD+BY, NAD+SE...)
+
+    Les variantes sont concaténées dans l'export : une nouvelle variante commence
+    quand le premier élément du segment réapparaît.
+    """
+    if not items:
+        return [[]]
+    first = items[0].get("groupe") or items[0].get("champ")
+    variants: List[List[Dict[str, Any]]] = [[]]
+    for item in items:
+        code = item.get("groupe") or item.get("champ")
+        if code == first and variants[-1]:
+            variants.append([])
+        variants[-1].append(item)
+    return variants
+
+
+def _component_check(segment_code: str, group_code: Optional[str], champ: Dict[str, Any],
+                     allowed: Optional[frozenset] = None) -> tuple:
+    """(chemin, obligatoire, type, longueur, longueur fixe, codes admis ou None)"""
+    mandatory, kind, length, exact = parse_format(champ.get("format", ""))
+    path = "/".join(code for code in (segment_code, group_code, champ["champ"]) if code)
+    return path, mandatory, kind, length, exact, allowed
+
+
+def _allowed_codes(code_lists, segment_code: str, group_code: Optional[str], champ: Dict[str, Any]) -> Optional[frozenset]:
+    """Codes admis d'un élément d'après l'index des listes de codes (None : pas de liste)"""
+    if code_lists is None:
+        return None
+    codes = code_lists.codes("/".join(code for code in (segment_code, group_code, champ["champ"]) if code))
+    return frozenset(codes) if codes else None
+
+
+def _compile_positions(segment_code: str, items: List[Dict[str, Any]], code_lists=None) -> Tuple[tuple, ...]:
+    """Éléments positionnels d'une variante :
+    (code, composite, contrôles des composants, composants obligatoires par rang)
+
+    Un champ de groupe dont l'exemple commence par "+" ouvre un nouvel élément :
+    l'extraction rattache parfois au composite les éléments simples qui le suivent
+    (ex. 3164, 3251, 3207 après C059 dans NAD). Les répétitions d'un même composant
+    (lignes d'adresse 3042...) sont conditionnelles au-delà de la première.
+    """
+    positions: List[list] = []
+    for item in items:
+        if "groupe" in item:
+            group_code = item["groupe"]
+            current = [group_code, True, []]
+            positions.append(current)
+            for index, champ in enumerate(item.get("champs", [])):
+                allowed = _allowed_codes(code_lists, segment_code, group_code, champ)
+                if index and _starts_element(champ.get("valeur", "")):
+                    current = [champ["champ"], False, []]
+                    positions.append(current)
+                    current[2].append(_component_check(segment_code, None, champ, allowed))
+                    continue
+                if not current[1] and current[2]:
+                    current[1] = True  # élément détaché suivi d'autres composants
+                check = _component_check(segment_code, current[0] if current[1] else None, champ, allowed)
+                if current[2] and current[2][-1][0] == check[0]:
+                    check = (check[0], False) + check[2:]  # répétition d'un composant (ex. 3124) : conditionnelle
+                current[2].append(check)
+        elif "champ" in item:
+            positions.append([item["champ"], False, [
+                _component_check(segment_code, None, item, _allowed_codes(code_lists, segment_code, None, item))
+            ]])
+    return tuple(
+        (code, composite, tuple(components),
+         tuple((index, check) for index, check in enumerate(components) if check[1]))
+        for code, composite, components in positions
+    )
+
+
+def _first_leaf(items: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    for item in items:
+        if "champs" in item:
+            return item["champs"][0] if item["champs"] else None
+        if "champ" in item:
+            return item
+    return None
+
+
+class CompiledSegment:
+    """Contrôles d'un segment : une structure positionnelle par variante du guide
+
+    Chaque variante est un couple (positions, éléments simples obligatoires par rang).
+    """
+
+    __slots__ = ("code", "variants", "by_qualifier", "default")
+
+    def __init__(self, code: str, items: List[Dict[str, Any]], code_lists=None):
+        self.code = code
+        self.variants: List[Tuple[tuple, tuple]] = []
+        self.by_qualifier: Dict[str, Tuple[tuple, tuple]] = {}
+        for variant_items in _split_variants(items):
+            positions = _compile_positions(code, variant_items, code_lists)
+            required = tuple((index, position[2][0]) for index, position in enumerate(positions)
+                             if not position[1] and position[2][0][1])
+            variant = (positions, required)
+            self.variants.append(variant)
+            leaf = _first_leaf(variant_items)
+            qualifier = _leading_value(leaf.get("valeur", "")) if leaf and _starts_element(leaf.get("valeur", "")) else ""
+            if qualifier and qualifier.isalnum():
+                self.by_qualifier.setdefault(qualifier, variant)
+        self.default = max(self.variants, key=lambda variant: len(variant[0]))
+
+    def variant_for(self, qualifier: str) -> Tuple[tuple, tuple]:
+        """Variante dont l'exemple porte le qualifiant du message (à défaut la plus complète)"""
+        return self.by_qualifier.get(qualifier) or self.default
+
+
+class MessageValidator:
+    """Guide compilé : valide des messages EDIFACT segment par segment
+
+    Les contrôles ne portent que sur ce que le guide décrit : statut, type et longueur
+    des éléments et composants. Le statut des composites n'étant pas extrait, un composite
+    absent est accepté ; présent, ses composants obligatoires sont exigés.
+    Avec code_lists (edi_codes.CodeListIndex), un élément pourvu d'une liste de codes
+    dans le guide n'admet que les codes de cette liste.
+    """
+
+    def __init__(self, segments: Iterable[Dict[str, Any]], max_errors: int = DEFAULT_MAX_ERRORS,
+                 code_lists=None):
+        self.max_errors = max_errors
+        self.segments: Dict[str, CompiledSegment] = {}
+        for segment in segments:
+            self.segments[segment["segment"]] = CompiledSegment(segment["segment"], segment.get("elements", []),
+                                                                code_lists)
+        for code, items in SERVICE_SEGMENTS.items():
+            compiled = self.segments.get(code)
+            if compiled is None or len(compiled.default[0]) < len(items):
+                self.segments[code] = CompiledSegment(code, items)
+
+    @classmethod
+    def from_guideline(cls, guideline, **options) -> "MessageValidator":
+        """Depuis le modèle d'une extraction (AdaptiveEDIExtractor.model)"""
+        return cls(guideline.to_dicts(), **options)
+
+    @classmethod
+    def from_export(cls, path: Union[str, Path], **options) -> "MessageValidator":
+        """Depuis un export (JSON ou binaire .edib)"""
+        return cls(load_segments(path), **options)
+
+    def check_segment(self, segment: str, separators: Separators, errors: List[Dict[str, Any]],
+                      message: str = "", index: int = 0) -> Optional[List[str]]:
+        """Contrôle un segment brut ; renvoie ses éléments bruts (None si segment inconnu du guide)"""
+        release = separators.release
+        escaped = bool(release) and release in segment
+        elements = split_escaped(segment, separators.element, release) if escaped else segment.split(separators.element)
+        component_separator = separators.component
+        tag = elements[0].split(component_separator, 1)[0]
+        compiled = self.segments.get(tag)
+        context = (message, index, tag)
+        if compiled is None:
+            if tag not in ENVELOPE_SEGMENTS:
+                errors.append(_error(context, tag, ERROR_UNKNOWN_SEGMENT, "segment absent du guide"))
+            return None
+
+        values = elements[1:]
+        count = len(values)
+        qualifier = values[0].split(component_separator, 1)[0] if values else ""
+        positions, required = compiled.variant_for(unescape(qualifier, release) if escaped else qualifier)
+        if count > len(positions):
+            errors.append(_error(context, tag, ERROR_TOO_MANY_ELEMENTS, f"{count} éléments, {len(positions)} au plus"))
+
+        for (code, composite, checks, required_components), raw in zip(positions, values):
+            if not composite:
+                if component_separator in raw:
+                    components = split_escaped(raw, component_separator, release) if escaped else raw.split(component_separator)
+                    if len(components) > 1:
+                        errors.append(_error(context, checks[0][0], ERROR_TOO_MANY_COMPONENTS,
+                                             f"élément simple à {len(components)} composants"))
+                    raw = components[0]
+                if raw:
+                    _check_value(unescape(raw, release) if escaped else raw, checks[0], errors, context)
+                elif checks[0][1]:
+                    errors.append(_error(context, checks[0][0], ERROR_MISSING, "valeur obligatoire absente"))
+                continue
+            if not raw:
+                continue  # composite absent : statut non décrit par le guide
+            components = split_escaped(raw, component_separator, release) if escaped else raw.split(component_separator)
+            if len(components) > len(checks):
+                errors.append(_error(context, f"{tag}/{code}", ERROR_TOO_MANY_COMPONENTS,
+                                     f"{len(components)} composants, {len(checks)} au plus"))
+            for value, check in zip(components, checks):
+                if value:
+                    _check_value(unescape(value, release) if escaped else value, check, errors, context)
+                elif check[1]:
+                    errors.append(_error(context, check[0], ERROR_MISSING, "valeur obligatoire absente"))
+            if len(components) < len(checks):
+                for component_index, check in required_components:
+                    if component_index >= len(components):
+                        errors.append(_error(context, check[0], ERROR_MISSING, "valeur obligatoire absente"))
+
+        if count < len(positions):
+            for position, check in required:
+                if position >= count:
+                    errors.append(_error(context, check[0], ERROR_MISSING, "valeur obligatoire absente"))
+        return elements
+
+    def iter_messages(self, chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Résultat de chaque message UNH...UNT d'un interchange lu par blocs"""
+        message: Optional[Dict[str, Any]] = None
+        envelope_errors: List[Dict[str, Any]] = []
+        count = 0
+
+        for segment, separators in iter_raw_segments(chunks):
+            tag = segment[:3]
+            if tag == "UNH":
+                if message is not None:
+                    message["errors"].append(_error((message["reference"], count, "UNH"), "UNT",
+                                                    ERROR_STRUCTURE, "UNT absent avant le message suivant"))
+                    yield _finish(message, count, self.max_errors)
+                message = {"reference": "", "type": "", "errors": []}
+                count = 0
+            if message is None:
+                self.check_segment(segment, separators, envelope_errors, "", 0)
+                continue
+
+            count += 1
+            errors = message["errors"]
+            elements = self.check_segment(segment, separators, errors, message["reference"], count)
+            if tag == "UNH":
+                elements = elements or split_escaped(segment, separators.element, separators.release)
+                message["reference"] = unescape(elements[1], separators.release) if len(elements) > 1 else ""
+                message["type"] = elements[2].split(separators.component, 1)[0] if len(elements) > 2 else ""
+                for error in errors:
+                    error["message"] = message["reference"]
+            elif tag == "UNT":
+                elements = elements or split_escaped(segment, separators.element, separators.release)
+                declared = elements[1] if len(elements) > 1 else ""
+                if declared.isdigit() and int(declared) != count:
+                    errors.append(_error((message["reference"], count, tag), "UNT/0074", ERROR_SEGMENT_COUNT,
+                                         f"{declared} segments déclarés, {count} reçus"))
+                reference = unescape(elements[2], separators.release) if len(elements) > 2 else ""
+                if reference != message["reference"]:
+                    errors.append(_error((message["reference"], count, tag), "UNT/0062", ERROR_REFERENCE,
+                                         f"{reference!r} au lieu de {message['reference']!r}"))
+                yield _finish(message, count, self.max_errors)
+                message = None
+
+        if message is not None:
+            message["errors"].append(_error((message["reference"], count, ""), "UNT",
+                                            ERROR_STRUCTURE, "interchange terminé sans UNT"))
+            yield _finish(message, count, self.max_errors)
+        if envelope_errors:
+            yield {"reference": "", "type": "", "segments": 0, "valid": False,
+                   "errors": envelope_errors[:self.max_errors], "error_count": len(envelope_errors)}
+
+    def validate(self, data: str) -> List[Dict[str, Any]]:
+        """Résultats des messages d'un interchange en mémoire"""
+        return list(self.iter_messages([data]))
+
+    def validate_file(self, path: Union[str, Path], encoding: str = DEFAULT_ENCODING) -> Dict[str, Any]:
+        """Valide un fichier d'interchange lu en flux ; erreurs regroupées par message"""
+        start = time.perf_counter()
+        with open(path, 'r', encoding=encoding, newline='') as f:
+            messages = list(self.iter_messages(iter(lambda: f.read(READ_CHUNK_SIZE), "")))
+        return _file_summary(str(path), messages, time.perf_counter() - start)
+
+
+def _check_value(value: str, check: tuple, errors: List[Dict[str, Any]], context: tuple):
+    """Type et longueur d'une valeur présente"""
+    path, _, kind, length, exact, allowed = check
+    if allowed is not None and value not in allowed:
+        errors.append(_error(context, path, ERROR_CODE, f"code {value!r} absent de la liste du guide"))
+        return
+    if kind == TYPE_NUMERIC:
+        if not _NUMERIC_RE.fullmatch(value):
+            errors.append(_error(context, path, ERROR_TYPE, f"{value!r} n'est pas numérique"))
+            return
+        size = len(value) - value.count("-") - value.count(".") - value.count(",")
+    else:
+        if kind == TYPE_ALPHA and _DIGIT_RE.search(value):
+            errors.append(_error(context, path, ERROR_TYPE, f"{value!r} n'est pas alphabétique"))
+        size = len(value)
+    if length is not None and (size != length if exact else size > length):
+        expected = f"{length}" if exact else f"..{length}"
+        errors.append(_error(context, path, ERROR_LENGTH, f"{value!r}: longueur {size}, attendue {expected}"))
+
+
+def _error(context: tuple, path: str, kind: str, detail: str) -> Dict[str, Any]:
+    message, index, tag = context
+    return {"message": message, "segment_index": index, "segment": tag,
+            "path": path, "error": kind, "detail": detail}
+
+
+def _finish(message: Dict[str, Any], count: int, max_errors: int = DEFAULT_MAX_ERRORS) -> Dict[str, Any]:
+    errors = message["errors"]
+    message["segments"] = count
+    message["valid"] = not errors
+    message["error_count"] = len(errors)
+    message["errors"] = errors[:max_errors]
+    return message
+
+
+def _file_summary(path: str, messages: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    counted = [message for message in messages if message["segments"]]
+    return {
+        "file": path,
+        "messages": len(counted),
+        "invalid": sum(1 for message in counted if not message["valid"]),
+        "errors": sum(message["error_count"] for message in messages),
+        "duration": round(duration, 4),
+        "results": messages,
+    }
+
+
+# Processus de travail : guide compilé une fois par processus
+_worker_validator: Optional[MessageValidator] = None
+
+
+def _init_worker(export_path: str, max_errors: int, check_codes: bool = False):
+    global _worker_validator
+    code_lists = load_code_lists(export_path) if check_codes else None
+    _worker_validator = MessageValidator.from_export(export_path, max_errors=max_errors, code_lists=code_lists)
+
+
+def _validate_in_worker(path: str, encoding: str) -> Dict[str, Any]:
+    try:
+        return _worker_validator.validate_file(path, encoding)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return {"file": path, "messages": 0, "invalid": 0, "errors": 0, "duration": 0.0,
+                "results": [], "failure": str(e) or type(e).__name__}
+
+
+def validate_files(export_path: Union[str, Path], paths: List[Union[str, Path]], jobs: int = 1,
+                   encoding: str = DEFAULT_ENCODING, max_errors: int = DEFAULT_MAX_ERRORS,
+                   check_codes: bool = False) -> Iterator[Dict[str, Any]]:
+    """Valide des fichiers d'interchange (résultats dans l'ordre des fichiers)
+
+    Avec jobs > 1, les fichiers sont répartis sur un pool de processus.
+    check_codes : contrôle les qualifiants par les listes de codes du guide (voir edi_codes)
+    """
+    paths = [str(path) for path in paths]
+    if jobs <= 1 or len(paths) <= 1:
+        _init_worker(str(export_path), max_errors, check_codes)
+        for path in paths:
+            yield _validate_in_worker(path, encoding)
+        return
+    chunksize = max(1, min(64, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(str(export_path), max_errors, check_codes)) as pool:
+        yield from pool.map(_validate_in_worker, paths, [encoding] * len(paths), chunksize=chunksize)
+
+
+def _collect_paths(inputs: List[str]) -> List[Path]:
+    """Fichiers d'interchange : chemins donnés, ou contenu des dossiers (*.edi, *.edifact, *.txt)"""
+    paths: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            found = set()
+            for pattern in INTERCHANGE_PATTERNS:
+                found.update(path.glob(pattern))
+            paths.extend(sorted(found))
+        else:
+            paths.append(path)
+    return paths
+
+
+def main():
+    """Valide des interchanges EDIFACT contre un guide extrait"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Validation de messages EDIFACT contre un guide extrait")
+    parser.add_argument("export", help="export du guide (JSON ou .edib)")
+    parser.add_argument("inputs", nargs="+", help="fichiers d'interchange ou dossiers (*.edi, *.edifact, *.txt)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="processus de validation (défaut : 1)")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING, help=f"encodage des fichiers (défaut : {DEFAULT_ENCODING})")
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS,
+                        help=f"erreurs conservées par message (défaut : {DEFAULT_MAX_ERRORS})")
+    parser.add_argument("--codes", action="store_true",
+                        help="contrôler les qualifiants par les listes de codes du guide (.edic, voir edi_codes)")
+    parser.add_argument("--json", metavar="FICHIER", help="écrire le rapport complet (JSON)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="n'afficher que le résumé")
+    args = parser.parse_args()
+    configure_logging(1)
+
+    if not Path(args.export).exists():
+        logger.error(f"❌ Export introuvable: {args.export}")
+        raise SystemExit(1)
+    paths = _collect_paths(args.inputs)
+    if not paths:
+        logger.error("❌ Aucun fichier d'interchange à valider")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    reports = []
+    for report in validate_files(args.export, paths, jobs=args.jobs, encoding=args.encoding,
+                                 max_errors=args.max_errors, check_codes=args.codes):
+        reports.append(report)
+        name = Path(report["file"]).name
+        if "failure" in report:
+            logger.error(f"❌ {name}: {report['failure']}")
+        elif report["invalid"] or report["errors"]:
+            logger.warning(f"⚠️  {name}: {report['invalid']}/{report['messages']} message(s) invalide(s), "
+                           f"{report['errors']} erreur(s)")
+            if not args.quiet:
+                for message in report["results"]:
+                    for error in message["errors"]:
+                        logger.info(f"   [{error['message'] or '-'}] segment {error['segment_index']} "
+                                    f"{error['path']}: {error['error']} - {error['detail']}")
+        else:
+            logger.debug(f"✓ {name}: {report['messages']} message(s) valide(s)")
+
+    duration = time.perf_counter() - start
+    messages = sum(report["messages"] for report in reports)
+    invalid = sum(report["invalid"] for report in reports)
+    failed = sum(1 for report in reports if "failure" in report)
+    rate = messages / duration if duration > 0 else 0.0
+    logger.info(f"\n✅ {len(reports)} fichier(s), {messages} message(s), {invalid} invalide(s), "
+                f"{failed} illisible(s) en {duration:.2f}s ({rate:,.0f} messages/s)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"export": args.export, "files": reports}, f, indent=4, ensure_ascii=False)
+        logger.info(f"✓ Rapport sauvegardé: {args.json}")
+    if invalid or failed:
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
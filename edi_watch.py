@@ -0,0 +1,173 @@
+"""
+Surveillance du dossier schema/ : extraction en continu des PDF nouveaux ou modifiés
+- Scrutation périodique (sans dépendance) de la date et de la taille des PDF
+- Un fichier n'est mis en file qu'une fois stable (copie ou téléversement terminé)
+- Extraction en arrière-plan, au plus `jobs` PDF à la fois
+- Exports remplacés atomiquement (fichier temporaire renommé, voir edi_export)
+
+Exemples :
+    python extract_all_pdfs.py --watch                 # surveille schema/ jusqu'à Ctrl+C
+    python extract_all_pdfs.py --watch --jobs 2 --interval 5
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from edi_budget import make_process_pool, pool_needs_recycling
+from edi_metrics import logger
+
+
+DEFAULT_INTERVAL = 2.0  # secondes entre deux scrutations
+DEFAULT_SETTLE = 2.0    # ancienneté minimale de la dernière modification avant extraction
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:  # fichier supprimé entre la scrutation et la lecture
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SchemaWatcher:
+    """File d'extraction des PDF d'un dossier, alimentée par scrutation
+
+    Au démarrage, seuls les PDF sans export ou plus récents que leur export sont traités ;
+    ensuite, tout PDF dont la date ou la taille change est remis en file.
+    """
+
+    def __init__(self, schema_dir: Path = Path("schema"), jobs: int = 1,
+                 interval: float = DEFAULT_INTERVAL, settle: float = DEFAULT_SETTLE,
+                 verbosity: int = 1, recycle_after: Optional[int] = None, **process_options):
+        self.schema_dir = Path(schema_dir)
+        self.jobs = jobs
+        self.interval = interval
+        self.settle = settle
+        self.verbosity = verbosity
+        self.recycle_after = recycle_after
+        self.process_options = process_options
+        self.processed: Dict[Path, Tuple[int, int]] = {}  # signature au moment de l'extraction
+        self.pending: Dict[Path, Tuple[int, int]] = {}
+        self.unsettled: Set[Path] = set()  # modifiés depuis moins de `settle` secondes
+        self.running: Dict[Future, Tuple[Path, Tuple[int, int]]] = {}
+        self.results = {'SUCCESS': 0, 'FAILED': 0}
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0  # documents soumis au pool courant
+        self.crashes: Dict[Path, int] = {}
+
+    def _export_is_current(self, pdf_path: Path, signature: Tuple[int, int]) -> bool:
+        from extract_edi_adaptive import export_path_for
+
+        export_path = Path(export_path_for(pdf_path, self.process_options.get('export_format', 'json')))
+        try:
+            return export_path.stat().st_mtime_ns >= signature[0]
+        except OSError:
+            return False
+
+    def scan(self, initial: bool = False):
+        """Met en file les PDF nouveaux ou modifiés et stables depuis `settle` secondes"""
+        in_flight = {path for path, _ in self.running.values()}
+        now_ns = time.time_ns()
+        self.unsettled = set()
+        for pdf_path in sorted(self.schema_dir.glob("*.pdf")):
+            signature = _signature(pdf_path)
+            if signature is None or self.processed.get(pdf_path) == signature:
+                continue
+            if initial and self._export_is_current(pdf_path, signature):
+                self.processed[pdf_path] = signature
+                continue
+            if pdf_path in in_flight:
+                continue  # en cours d'extraction : revu à la prochaine scrutation
+            if now_ns - signature[0] < self.settle * 1e9:
+                self.unsettled.add(pdf_path)  # en cours d'écriture : revu à la prochaine scrutation
+                continue
+            self.pending[pdf_path] = signature
+
+    def _renew_pool(self):
+        """Nouveau pool : quota de documents atteint (recyclage) ou worker interrompu"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        budget = self.process_options.get('budget')
+        self.pool = make_process_pool(self.jobs, self.recycle_after, budget.memory_mb if budget is not None else None)
+        self.submitted = 0
+
+    def _submit(self):
+        from extract_all_pdfs import _process_one
+
+        while self.pending and len(self.running) < self.jobs:
+            if pool_needs_recycling(self.submitted, self.jobs, self.recycle_after):
+                if self.running:
+                    return  # recyclage dès que les extractions en cours sont terminées
+                self._renew_pool()
+            pdf_path, signature = next(iter(self.pending.items()))
+            del self.pending[pdf_path]
+            logger.info(f"📥 En file: {pdf_path.name}")
+            try:
+                future = self.pool.submit(_process_one, pdf_path, True, self.verbosity, **self.process_options)
+            except BrokenProcessPool:
+                self._renew_pool()
+                future = self.pool.submit(_process_one, pdf_path, True, self.verbosity, **self.process_options)
+            self.running[future] = (pdf_path, signature)
+            self.submitted += 1
+
+    def _collect(self, done):
+        for future in done:
+            pdf_path, signature = self.running.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # Worker interrompu : le document est relancé une fois dans un nouveau pool
+                self.crashes[pdf_path] = self.crashes.get(pdf_path, 0) + 1
+                if self.crashes[pdf_path] < 2:
+                    self.pending[pdf_path] = signature
+                    continue
+                result = {'file': pdf_path.name, 'status': 'FAILED', 'error': f"worker interrompu: {e}"}
+            except Exception as e:
+                # Worker interrompu (crash, mémoire...) : fichier en échec jusqu'à sa prochaine modification
+                result = {'file': pdf_path.name, 'status': 'FAILED', 'error': str(e)}
+            sys.stdout.write(result.pop('output', ''))
+            self.crashes.pop(pdf_path, None)
+            self.processed[pdf_path] = signature
+            self.results[result['status']] += 1
+            if result['status'] == 'SUCCESS':
+                logger.info(f"✅ {pdf_path.name} ({result['duration']:.2f}s)")
+            else:
+                logger.error(f"❌ {pdf_path.name}: {result.get('error', 'Unknown error')}")
+
+    def run(self, once: bool = False):
+        """Boucle de surveillance (once : traite les PDF en attente, y compris ceux encore
+        en cours d'écriture une fois stables, puis s'arrête)"""
+        logger.info(f"👀 Surveillance de '{self.schema_dir}/' (toutes les {self.interval:g}s, "
+                    f"{self.jobs} extraction(s) simultanée(s)) - Ctrl+C pour arrêter")
+        self._renew_pool()
+        try:
+            self.scan(initial=True)
+            while True:
+                self._submit()
+                if self.running:
+                    done, _ = wait(list(self.running), timeout=self.interval, return_when=FIRST_COMPLETED)
+                    self._collect(done)
+                elif once and not self.unsettled:
+                    break
+                else:
+                    time.sleep(self.interval)
+                self.scan()
+        except KeyboardInterrupt:
+            logger.info("\n⏹️  Surveillance arrêtée")
+        finally:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        logger.info(f"✅ {self.results['SUCCESS']} extraction(s), {self.results['FAILED']} échec(s)")
+        return self.results
+
+
+def watch_schema(schema_dir: Path = Path("schema"), jobs: int = 1, interval: float = DEFAULT_INTERVAL,
+                 settle: float = DEFAULT_SETTLE, once: bool = False, verbosity: int = 1,
+                 recycle_after: Optional[int] = None, **process_options) -> Dict[str, int]:
+    """Extrait en continu les PDF nouveaux ou modifiés de schema/ (voir SchemaWatcher)"""
+    watcher = SchemaWatcher(schema_dir, jobs=jobs, interval=interval, settle=settle,
+                            verbosity=verbosity, recycle_after=recycle_after, **process_options)
+    return watcher.run(once=once)
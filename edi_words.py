@@ -0,0 +1,527 @@
+"""
+Moteur de tableaux par coordonnées de mots (option --engine words)
+- Les premières pages qualifiées passent par extract_tables() de pdfplumber ; les tableaux
+  relus à l'identique par le chemin rapide fixent la disposition apprise (nombre de colonnes,
+  bords gauche et droit)
+- Pages suivantes : lignes et colonnes lues directement sur les filets de la page, mots de
+  extract_words() répartis par cellule → mêmes listes de lignes que extract_tables(), sans
+  recherche d'intersections ni filtrage des caractères cellule par cellule
+- Repli automatique sur extract_tables() dès que la page s'écarte de la disposition apprise
+  ou ne se reproduit pas à l'identique (mot à cheval sur un filet, traits obliques...)
+- Vérification d'équivalence avec l'extraction de référence avant un lot : edi_words.py check
+- Les règles reproduites (alignement et fusion des filets, intersections, cellules, regroupement)
+  sont celles de pdfplumber VERIFIED_PDFPLUMBER : avec une autre série de pdfplumber, le chemin
+  rapide est désactivé jusqu'à ce que `check` confirme l'équivalence et que la série soit mise à jour
+
+Exemples :
+    python edi_words.py check "schema/Faurecia EDI Guideline INVOIC D96A V2R6.pdf"
+    python extract_all_pdfs.py --all --engine words
+"""
+
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import pdfplumber
+from pdfplumber.utils import clip_obj, extract_words
+
+from edi_metrics import logger, configure_logging
+
+
+TABLE_ENGINES = ("tables", "words")  # tables = extract_tables() sur chaque page (référence)
+LEARN_PAGES = 3  # pages qualifiées analysées par les deux chemins avant le chemin rapide
+
+# Série de pdfplumber dont le détecteur de tableaux est reproduit ci-dessous (vérifiée par check)
+VERIFIED_PDFPLUMBER = "0.11"
+PDFPLUMBER_SERIES = ".".join(pdfplumber.__version__.split(".")[:2])
+PDFPLUMBER_VERIFIED = PDFPLUMBER_SERIES == VERIFIED_PDFPLUMBER
+
+# Réglages par défaut de pdfplumber pour la stratégie "lines" (seule reproduite par le chemin rapide)
+RULED_SETTINGS = {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+SNAP_TOLERANCE = 3
+JOIN_TOLERANCE = 3
+INTERSECTION_TOLERANCE = 3
+EDGE_MIN_LENGTH = 3
+EDGE_MIN_LENGTH_PREFILTER = 1
+LINE_TOLERANCE = 3    # mots d'une même ligne de texte (extract_text)
+WORD_TOLERANCE = 0.5  # débord admis d'un mot sur le filet de sa cellule
+SPAN_TOLERANCE = 3    # écart admis sur les bords d'un tableau appris
+
+Bbox = Tuple[float, float, float, float]
+Layout = Tuple[int, float, float]  # (colonnes, bord gauche, bord droit)
+
+
+class LayoutMismatch(Exception):
+    """Page hors de la disposition reproduite par le chemin rapide (motif du repli)"""
+
+
+def _region_objects(page, bbox: Optional[Bbox]) -> Dict[str, List[Dict[str, Any]]]:
+    """Caractères, rectangles, traits et courbes de la zone, découpés comme par page.crop(bbox)
+
+    Seuls les objets débordant de la zone sont recopiés (pdfplumber recopie tous les objets).
+    """
+    objects = {kind: page.objects.get(kind, []) for kind in ("char", "rect", "line", "curve")}
+    if bbox is None:
+        return objects
+    left, top, right, bottom = bbox
+    cropped = {}
+    for kind, items in objects.items():
+        kept = []
+        for obj in items:
+            if obj["x0"] >= left and obj["top"] >= top and obj["x1"] <= right and obj["bottom"] <= bottom:
+                kept.append(obj)
+            else:
+                obj = clip_obj(obj, bbox)
+                if obj is not None:
+                    kept.append(obj)
+        cropped[kind] = kept
+    return cropped
+
+
+def _snap(edges: List[List[float]], tolerance: float) -> None:
+    """Aligne les filets distants de moins de `tolerance` sur leur position moyenne (snap_edges)"""
+    if not edges:
+        return
+    values = sorted({edge[0] for edge in edges})
+    cluster_of, cluster = {values[0]: 0}, 0
+    for previous, value in zip(values, values[1:]):
+        if value > previous + tolerance:
+            cluster += 1
+        cluster_of[value] = cluster
+    totals = [[0.0, 0] for _ in range(cluster + 1)]
+    for edge in edges:
+        total = totals[cluster_of[edge[0]]]
+        total[0] += edge[0]
+        total[1] += 1
+    for edge in edges:
+        total = totals[cluster_of[edge[0]]]
+        edge[0] = total[0] / total[1]
+
+
+def _join(edges: List[List[float]], tolerance: float, min_length: float) -> List[Tuple[float, float, float]]:
+    """Fusionne les filets d'une même droite qui se touchent (join_edge_group), puis filtre les courts"""
+    joined: List[List[float]] = []
+    for edge in sorted(edges, key=lambda edge: (edge[0], edge[1])):
+        last = joined[-1] if joined else None
+        if last is not None and last[0] == edge[0] and edge[1] <= last[2] + tolerance:
+            if edge[2] > last[2]:
+                last[2] = edge[2]
+        else:
+            joined.append(list(edge))
+    return [tuple(edge) for edge in joined if edge[2] - edge[1] >= min_length]
+
+
+def _ruling_edges(rects: List[Dict[str, Any]], lines: List[Dict[str, Any]]):
+    """Filets verticaux (x, haut, bas) et horizontaux (y, gauche, droite) après alignement et fusion"""
+    vertical: List[List[float]] = []
+    horizontal: List[List[float]] = []
+    for rect in rects:
+        x0, x1, top, height, width = rect["x0"], rect["x1"], rect["top"], rect["height"], rect["width"]
+        bottom = rect["bottom"]
+        if width >= EDGE_MIN_LENGTH_PREFILTER:
+            horizontal.append([top, x0, x1])
+            horizontal.append([top + height, x0, x1])
+        if height >= EDGE_MIN_LENGTH_PREFILTER:
+            vertical.append([x0, top, bottom])
+            vertical.append([x1, top, bottom])
+    for line in lines:
+        if line["top"] == line["bottom"]:
+            if line["width"] >= EDGE_MIN_LENGTH_PREFILTER:
+                horizontal.append([line["top"], line["x0"], line["x1"]])
+        elif line["x0"] == line["x1"]:
+            if line["height"] >= EDGE_MIN_LENGTH_PREFILTER:
+                vertical.append([line["x0"], line["top"], line["bottom"]])
+        else:
+            raise LayoutMismatch("trait oblique")
+    _snap(vertical, SNAP_TOLERANCE)
+    _snap(horizontal, SNAP_TOLERANCE)
+    return (_join(vertical, JOIN_TOLERANCE, EDGE_MIN_LENGTH),
+            _join(horizontal, JOIN_TOLERANCE, EDGE_MIN_LENGTH))
+
+
+def _grid_cells(vertical, horizontal) -> List[Bbox]:
+    """Cellules décrites par les intersections des filets (même recherche que intersections_to_cells)
+
+    Depuis chaque intersection, la plus petite cellule dont les quatre côtés sont portés par des
+    filets : les cellules fusionnées donnent, comme avec pdfplumber, des cellules absentes (None).
+    Les filets reliant deux points sont comparés par indice au lieu de leurs boîtes.
+    """
+    tolerance = INTERSECTION_TOLERANCE
+    points: Dict[Tuple[float, float], Tuple[set, set]] = {}
+    for v, (x, v_top, v_bottom) in enumerate(vertical):
+        for h, (y, h_left, h_right) in enumerate(horizontal):
+            if v_top <= y + tolerance and v_bottom >= y - tolerance and h_left - tolerance <= x <= h_right + tolerance:
+                point = points.get((x, y))
+                if point is None:
+                    point = points[(x, y)] = (set(), set())
+                point[0].add(v)
+                point[1].add(h)
+
+    below: Dict[float, List[float]] = {}  # ordonnées des intersections de chaque abscisse
+    right: Dict[float, List[float]] = {}  # abscisses des intersections de chaque ordonnée
+    for x, y in sorted(points):
+        below.setdefault(x, []).append(y)
+        right.setdefault(y, []).append(x)
+
+    cells = []
+    for (x, y), (v_edges, h_edges) in points.items():
+        column, row = below[x], right[y]
+        found = None
+        for bottom in column[column.index(y) + 1:]:
+            below_point = points[(x, bottom)]
+            if not v_edges & below_point[0]:
+                continue
+            for left_right in row[row.index(x) + 1:]:
+                right_point = points[(left_right, y)]
+                if not h_edges & right_point[1]:
+                    continue
+                corner = points.get((left_right, bottom))
+                if corner is not None and corner[0] & right_point[0] and corner[1] & below_point[1]:
+                    found = (x, y, left_right, bottom)
+                    break
+            if found is not None:
+                break
+        if found is not None:
+            cells.append(found)
+    return cells
+
+
+def _group_tables(cells: List[Bbox]) -> List[List[Bbox]]:
+    """Tableaux = cellules reliées par au moins un coin (même regroupement que cells_to_tables)"""
+    parent = list(range(len(cells)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[Tuple[float, float], int] = {}
+    for i, (x0, top, x1, bottom) in enumerate(cells):
+        for corner in ((x0, top), (x0, bottom), (x1, top), (x1, bottom)):
+            if corner in owner:
+                parent[find(i)] = find(owner[corner])
+            else:
+                owner[corner] = i
+    groups: Dict[int, List[Bbox]] = {}
+    for i, cell in enumerate(cells):
+        groups.setdefault(find(i), []).append(cell)
+    tables = sorted(groups.values(), key=lambda table: min((cell[1], cell[0]) for cell in table))
+    return [table for table in tables if len(table) > 1]
+
+
+def _cell_text(words: List[Dict[str, Any]]) -> str:
+    """Texte d'une cellule comme utils.extract_text : lignes regroupées par le haut des mots"""
+    if len(words) == 1:
+        return words[0]["text"]
+    tops = sorted({word["top"] for word in words})
+    line_of, line = {tops[0]: 0}, 0
+    for previous, top in zip(tops, tops[1:]):
+        if top > previous + LINE_TOLERANCE:
+            line += 1
+        line_of[top] = line
+    ordered = sorted(words, key=lambda word: (line_of[word["top"]], word["x0"]))
+    lines: List[List[str]] = [[] for _ in range(line + 1)]
+    for word in ordered:
+        lines[line_of[word["top"]]].append(word["text"])
+    return "\n".join(" ".join(texts) for texts in lines if texts)
+
+
+def word_tables(page, bbox: Optional[Bbox]) -> Tuple[List[List[List[Optional[str]]]], List[Layout]]:
+    """Tableaux de la zone reconstruits depuis les filets et les mots, avec leur disposition
+
+    Même forme que extract_tables() (cellule absente = None, cellule vide = "") ;
+    lève LayoutMismatch si la page sort du cas reproduit à l'identique.
+    """
+    objects = _region_objects(page, bbox)
+    if objects["curve"]:
+        raise LayoutMismatch("courbes")
+    chars = objects["char"]
+    if any(not char["upright"] for char in chars):
+        raise LayoutMismatch("texte vertical")
+    vertical, horizontal = _ruling_edges(objects["rect"], objects["line"])
+    if not vertical or not horizontal:
+        raise LayoutMismatch("sans filets")  # tableaux non tracés : extract_tables() décide
+    tables = _group_tables(_grid_cells(vertical, horizontal))
+
+    # Bandes horizontales élémentaires : cellules qui les couvrent, repérées par (tableau, ligne, colonne)
+    ys = sorted({y for table in tables for cell in table for y in (cell[1], cell[3])})
+    position = {y: i for i, y in enumerate(ys)}
+    bands: List[List[Tuple[float, float, Tuple[int, int, int]]]] = [[] for _ in ys]
+    shapes, layouts = [], []
+    for t, table in enumerate(tables):
+        row = {top: r for r, top in enumerate(sorted({cell[1] for cell in table}))}
+        xs = sorted({cell[0] for cell in table})
+        column = {x: c for c, x in enumerate(xs)}
+        shapes.append((len(row), len(xs), table, row, column))
+        layouts.append((len(xs), xs[0], max(cell[2] for cell in table)))
+        for x0, top, x1, bottom in table:
+            for b in range(position[top], position[bottom]):
+                bands[b].append((x0, x1, (t, row[top], column[x0])))
+
+    cell_words: Dict[Tuple[int, int, int], List[Dict[str, Any]]] = {}
+    for word in extract_words(chars):
+        b = bisect_right(ys, (word["top"] + word["bottom"]) / 2) - 1
+        if b < 0 or not bands[b]:
+            continue  # hors tableau (au-dessus, en dessous ou entre deux tableaux)
+        h_mid = (word["x0"] + word["x1"]) / 2
+        matches = [cell for cell in bands[b] if cell[0] <= h_mid < cell[1]]
+        if len(matches) > 1:
+            raise LayoutMismatch("cellules superposées")
+        if matches:
+            x0, x1, key = matches[0]
+            if word["x0"] < x0 - WORD_TOLERANCE or word["x1"] > x1 + WORD_TOLERANCE:
+                raise LayoutMismatch("mot à cheval sur un filet")
+            cell_words.setdefault(key, []).append(word)
+        elif any(word["x1"] > x0 and word["x0"] < x1 for x0, x1, _ in bands[b]):
+            raise LayoutMismatch("mot à cheval sur un filet")
+
+    result = []
+    for t, (rows, columns, table, row, column) in enumerate(shapes):
+        grid: List[List[Optional[str]]] = [[None] * columns for _ in range(rows)]
+        for x0, top, _, _ in table:
+            words = cell_words.get((t, row[top], column[x0]))
+            grid[row[top]][column[x0]] = _cell_text(words) if words else ""
+        result.append(grid)
+    return result, layouts
+
+
+def ruled_tables(page, bbox: Optional[Bbox], settings: Dict[str, Any]) -> List[List[List[Optional[str]]]]:
+    """Tableaux de référence : détection des filets et intersections de pdfplumber"""
+    region = page.crop(bbox) if bbox is not None else page
+    return region.extract_tables(settings)
+
+
+class WordTableEngine:
+    """Chemin rapide des tableaux, avec apprentissage de la disposition et repli sur extract_tables()
+
+    learn_pages : pages analysées par les deux chemins en début de document ; une différence
+                  désactive le chemin rapide pour tout le document
+    layouts     : disposition déjà apprise (processus d'analyse des pages, voir state)
+    Une page de repli dont les tableaux sont relus à l'identique enrichit la disposition apprise.
+    """
+
+    name = "words"
+
+    def __init__(self, learn_pages: int = LEARN_PAGES, layouts: Optional[List[Layout]] = None):
+        self.learn_pages = learn_pages
+        self.layouts: List[Layout] = list(layouts or [])
+        self.disabled = False
+        self.stats: Dict[str, Any] = {"pages_learned": 0, "pages_fast": 0, "pages_fallback": 0,
+                                      "fallback_reasons": {}}
+
+    @property
+    def learning(self) -> bool:
+        """Vrai tant que les pages d'apprentissage ne sont pas toutes analysées"""
+        return not self.disabled and self.stats["pages_learned"] < self.learn_pages
+
+    def state(self) -> Dict[str, Any]:
+        """Paramètres transmis aux processus d'analyse des pages (voir _extract_page_shard)"""
+        return {"learn_pages": self.learn_pages if self.learning else 0, "layouts": self.layouts}
+
+    def merge_stats(self, stats: Dict[str, Any]):
+        """Cumule les compteurs d'un autre moteur (processus d'analyse des pages)"""
+        for name, value in stats.items():
+            if name == "fallback_reasons":
+                reasons = self.stats["fallback_reasons"]
+                for reason, count in value.items():
+                    reasons[reason] = reasons.get(reason, 0) + count
+            else:
+                self.stats[name] = self.stats.get(name, 0) + value
+
+    def _known(self, layouts: List[Layout]) -> bool:
+        return all(
+            any(columns == known[0] and abs(left - known[1]) <= SPAN_TOLERANCE
+                and abs(right - known[2]) <= SPAN_TOLERANCE for known in self.layouts)
+            for columns, left, right in layouts
+        )
+
+    def _learn(self, layouts: List[Layout]):
+        for layout in layouts:
+            if not self._known([layout]):
+                self.layouts.append(layout)
+
+    def _confirm(self, page, tables, layouts: List[Layout], reference) -> None:
+        """Retient la disposition si les deux chemins concordent, sinon désactive le moteur"""
+        if tables == reference:
+            self._learn(layouts)
+            return
+        logger.warning(f"   ⚠️  Page {page.page_number}: tableaux différents d'extract_tables(), "
+                       "moteur par mots désactivé pour ce document")
+        self.disabled = True
+
+    def _fallback(self, reason: str):
+        self.stats["pages_fallback"] += 1
+        reasons = self.stats["fallback_reasons"]
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    def extract_tables(self, page, bbox: Optional[Bbox], settings: Dict[str, Any]) -> List[List[List[Optional[str]]]]:
+        """Tableaux de la zone `bbox` de la page (None = page entière), même forme que extract_tables()"""
+        if self.disabled or settings != RULED_SETTINGS or not PDFPLUMBER_VERIFIED:
+            if self.disabled:
+                self._fallback("désactivé")
+            elif not PDFPLUMBER_VERIFIED:
+                self._fallback(f"pdfplumber {PDFPLUMBER_SERIES} non vérifié")
+            else:
+                self._fallback("réglages")
+            return ruled_tables(page, bbox, settings)
+
+        if self.learning:
+            # Apprentissage : référence retournée, disposition retenue si les deux chemins concordent
+            self.stats["pages_learned"] += 1
+            reference = ruled_tables(page, bbox, settings)
+            try:
+                tables, layouts = word_tables(page, bbox)
+            except LayoutMismatch:
+                return reference
+            self._confirm(page, tables, layouts, reference)
+            return reference
+
+        try:
+            tables, layouts = word_tables(page, bbox)
+        except LayoutMismatch as e:
+            self._fallback(str(e))
+            return ruled_tables(page, bbox, settings)
+        if not self._known(layouts):
+            # Nouvelle disposition : apprise si la référence la confirme
+            self._fallback("disposition inconnue")
+            reference = ruled_tables(page, bbox, settings)
+            self._confirm(page, tables, layouts, reference)
+            return reference
+        self.stats["pages_fast"] += 1
+        return tables
+
+
+def make_table_engine(engine: Optional[str], **options) -> Optional[WordTableEngine]:
+    """Moteur de tableaux d'une option --engine (None pour extract_tables(), la référence)"""
+    if engine in (None, "tables"):
+        return None
+    if engine == "words":
+        return WordTableEngine(**options)
+    raise ValueError(f"Moteur de tableaux inconnu: {engine} (choix : {', '.join(TABLE_ENGINES)})")
+
+
+def check_equivalence(pdf_path: Path, learn_pages: int = LEARN_PAGES) -> Dict[str, Any]:
+    """Compare le moteur par mots à la référence extract_tables() sur un PDF
+
+    - version de pdfplumber installée comparée à la série reproduite (VERIFIED_PDFPLUMBER) ;
+      hors de cette série, le moteur se replie partout mais chaque page reste comparée
+    - deux extractions complètes : segments et listes de codes doivent être identiques
+    - chaque page qualifiée que le chemin rapide sait reproduire est comparée aux tableaux
+      d'extract_tables() (y compris celles que l'apprentissage aurait écartées), avec le
+      temps d'analyse des tableaux de chaque chemin
+    """
+    from extract_edi_adaptive import AdaptiveEDIExtractor, PDFSession, _region_bbox
+    from edi_rows import FORMAT_SPECS
+
+    extractions = {}
+    for engine in TABLE_ENGINES:
+        extractor = AdaptiveEDIExtractor(str(pdf_path), engine=engine)
+        if extractor.table_engine is not None:
+            extractor.table_engine.learn_pages = learn_pages
+        start = time.perf_counter()
+        extractor.extract_all()
+        extractions[engine] = (extractor, time.perf_counter() - start)
+    reference, fast = extractions["tables"][0], extractions["words"][0]
+    same_segments = reference.model.to_dicts() == fast.model.to_dicts()
+    same_codes = reference.code_lists.to_dict() == fast.code_lists.to_dict()
+
+    spec = FORMAT_SPECS[reference.pdf_format]
+    mismatches, reproduced, fallbacks = [], 0, {}
+    seconds = {"tables": 0.0, "words": 0.0}
+    with PDFSession(pdf_path) as session:
+        for index in range(session.page_count):
+            if spec.page_marker.search(session.page_text(index)):
+                page = session.page(index)
+                bbox = _region_bbox(page, spec)
+                start = time.perf_counter()
+                expected = ruled_tables(page, bbox, spec.table_settings)
+                seconds["tables"] += time.perf_counter() - start
+                start = time.perf_counter()
+                try:
+                    tables, _ = word_tables(page, bbox)
+                except LayoutMismatch as e:
+                    fallbacks[str(e)] = fallbacks.get(str(e), 0) + 1
+                else:
+                    reproduced += 1
+                    if tables != expected:
+                        mismatches.append(index + 1)
+                seconds["words"] += time.perf_counter() - start
+            session.release_page(index)
+
+    return {
+        "file": pdf_path.name,
+        "pdf_format": reference.pdf_format,
+        "pdfplumber": pdfplumber.__version__,
+        "pdfplumber_verified": PDFPLUMBER_VERIFIED,
+        "equivalent": same_segments and same_codes and not mismatches,
+        "segments": same_segments,
+        "code_lists": same_codes,
+        "mismatched_pages": mismatches,
+        "pages_reproduced": reproduced,
+        "pages_not_reproduced": fallbacks,
+        "table_seconds": {engine: round(value, 3) for engine, value in seconds.items()},
+        "extraction_seconds": {engine: round(duration, 3) for engine, (_, duration) in extractions.items()},
+        "engine": fast.table_engine.stats,
+    }
+
+
+def main():
+    """Vérification d'équivalence du moteur par mots sur un ou plusieurs PDF"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Moteur de tableaux par coordonnées de mots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check_parser = commands.add_parser("check", help="comparer --engine words à extract_tables() (sortie et pages)")
+    check_parser.add_argument("pdfs", nargs="+", help="PDF à vérifier")
+    check_parser.add_argument("--learn-pages", type=int, default=LEARN_PAGES, metavar="N",
+                              help=f"pages d'apprentissage (défaut : {LEARN_PAGES})")
+    check_parser.add_argument("--json", metavar="FICHIER", help="écrire le rapport (JSON)")
+    args = parser.parse_args()
+
+    reports = []
+    for pdf in args.pdfs:
+        pdf_path = Path(pdf)
+        if not pdf_path.exists():
+            configure_logging(1)
+            logger.error(f"❌ Fichier introuvable: {pdf_path}")
+            raise SystemExit(1)
+        configure_logging(0)  # extractions silencieuses, seul le rapport est affiché
+        report = check_equivalence(pdf_path, args.learn_pages)
+        configure_logging(1)
+        reports.append(report)
+
+        stats, seconds = report["engine"], report["table_seconds"]
+        status = "✅ équivalent" if report["equivalent"] else "❌ DIFFÉRENT"
+        logger.info(f"{status}: {report['file']} ({report['pdf_format']})")
+        speedup = seconds["tables"] / seconds["words"] if seconds["words"] else 0
+        logger.info(f"   tableaux : extract_tables {seconds['tables']:.2f}s, mots {seconds['words']:.2f}s "
+                    f"(x{speedup:.1f}) ; pages reproduites {report['pages_reproduced']}")
+        extraction = report["extraction_seconds"]
+        logger.info(f"   extraction complète : {extraction['tables']:.2f}s → {extraction['words']:.2f}s "
+                    f"(pages rapides {stats['pages_fast']}, apprises {stats['pages_learned']}, "
+                    f"repli {stats['pages_fallback']})")
+        if stats["fallback_reasons"]:
+            logger.info("   replis : " + ", ".join(f"{reason} ({count})"
+                                                  for reason, count in stats["fallback_reasons"].items()))
+        if not report["pdfplumber_verified"]:
+            logger.warning(f"   ⚠️  pdfplumber {report['pdfplumber']} : règles reproduites de la série "
+                           f"{VERIFIED_PDFPLUMBER}, chemin rapide désactivé (mettre à jour "
+                           "VERIFIED_PDFPLUMBER si toutes les pages sont équivalentes)")
+        if not report["segments"]:
+            logger.warning("   ⚠️  segments différents")
+        if not report["code_lists"]:
+            logger.warning("   ⚠️  listes de codes différentes")
+        if report["mismatched_pages"]:
+            logger.warning(f"   ⚠️  tableaux différents pages {', '.join(map(str, report['mismatched_pages']))}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=4, ensure_ascii=False), encoding="utf-8")
+    if not all(report["equivalent"] for report in reports):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
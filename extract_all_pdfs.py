@@ -2,97 +2,326 @@
 Script de traitement en masse de tous les PDF EDI
 """
 
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import io
 import sys
 import time
 
 # Importer l'extracteur
 sys.path.insert(0, str(Path(__file__).parent))
-from extract_edi_adaptive import AdaptiveEDIExtractor, process_pdf
+from extract_edi_adaptive import (
+    AdaptiveEDIExtractor, process_pdf, add_export_arguments, add_engine_arguments, add_budget_arguments,
+    add_instrumentation_arguments, budget_from_args, verbosity_from_args
+)
+from edi_budget import Budget, make_process_pool, pool_needs_recycling
+from edi_metrics import Metrics, logger, configure_logging, profiling, write_metrics
+from edi_detect import MIN_CONFIDENCE, UNKNOWN_FORMAT
 
 
-def process_all_pdfs():
-    """Traite tous les PDF du dossier schema/"""
+def _process_one(pdf_file: Path, capture_output: bool = False, verbosity: int = 1,
+                 **process_options) -> Dict[str, Any]:
+    """Traite un PDF et retourne son résultat (sortie console capturée si demandé)"""
+    # Nécessaire dans les workers démarrés par "spawn" (Windows, macOS)
+    configure_logging(verbosity)
+    buffer = io.StringIO() if capture_output else None
+    
+    with redirect_stdout(buffer) if buffer is not None else nullcontext():
+        try:
+            pdf_start = time.time()
+            metrics = process_pdf(pdf_file, **process_options)
+            pdf_duration = time.time() - pdf_start
+            
+            result = {
+                'file': pdf_file.name,
+                'status': 'SUCCESS',
+                'duration': pdf_duration,
+                'metrics': metrics.to_dict()
+            }
+        except Exception as e:
+            # MemoryError (budget --max-memory) sans message : le type tient lieu d'erreur
+            error = str(e) or type(e).__name__
+            logger.error(f"❌ ERREUR: {error}")
+            logger.debug("Détail de l'erreur", exc_info=True)
+            result = {
+                'file': pdf_file.name,
+                'status': 'FAILED',
+                'error': error
+            }
+    
+    if buffer is not None:
+        result['output'] = buffer.getvalue()
+    return result
+
+
+def _detected_format(result: Dict[str, Any]) -> Optional[str]:
+    """Format détecté d'un résultat réussi (None si absent, ex. résultat en cache)"""
+    return result.get('metrics', {}).get('format_detection', {}).get('format')
+
+
+def _failed(pdf_file: Path, error: str) -> Dict[str, Any]:
+    return {'file': pdf_file.name, 'status': 'FAILED', 'error': error}
+
+
+def _iter_pool_results(pdf_files: List[Path], jobs: int, recycle_after: Optional[int],
+                       process_options: Dict[str, Any],
+                       memory_mb: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Traite les PDF dans un pool de processus et produit (index, résultat) dans l'ordre de la liste
+    
+    Au plus `jobs` documents en cours : un document lent n'en bloque pas d'autres en file.
+    Un worker qui meurt (mémoire, crash) casse le pool : un nouveau pool est créé et les
+    documents en cours sont relancés une fois, puis mis en échec.
+    memory_mb : espace d'adressage maximal de chaque worker (voir edi_budget)
+    """
+    pending = list(range(len(pdf_files)))
+    attempts: Dict[int, int] = {}
+    finished: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    
+    while pending:
+        pool = make_process_pool(jobs, recycle_after, memory_mb)
+        running = {}
+        submitted = 0
+        try:
+            while pending or running:
+                while pending and len(running) < jobs and not pool_needs_recycling(submitted, jobs, recycle_after):
+                    index = pending.pop(0)
+                    attempts[index] = attempts.get(index, 0) + 1
+                    running[pool.submit(_process_one, pdf_files[index], True, **process_options)] = index
+                    submitted += 1
+                if not running:
+                    break  # quota du pool atteint : recyclage
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        finished[index] = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        if attempts[index] < 2:
+                            pending.insert(0, index)
+                        else:
+                            finished[index] = _failed(pdf_files[index], f"worker interrompu: {e}")
+                    except Exception as e:
+                        finished[index] = _failed(pdf_files[index], str(e))
+                
+                while next_index in finished:
+                    yield next_index, finished.pop(next_index)
+                    next_index += 1
+                if broken:
+                    # Les autres documents du pool cassé sont relancés dans un nouveau pool
+                    logger.warning("⚠️  Worker interrompu (mémoire, crash...) : nouveau pool de processus")
+                    for future, index in running.items():
+                        if attempts[index] < 2:
+                            pending.insert(0, index)
+                        else:
+                            finished[index] = _failed(pdf_files[index], "worker interrompu")
+                    running = {}
+                    pending.sort()
+                    break
+        finally:
+            pool.shutdown(wait=not running, cancel_futures=True)
+    
+    while next_index in finished:
+        yield next_index, finished.pop(next_index)
+        next_index += 1
+
+
+def process_all_pdfs(jobs: int = 1, use_cache: bool = True, rebuild: bool = False,
+                     store_raw: bool = False, verbosity: int = 1,
+                     metrics_path: Optional[str] = None, export_format: str = "json",
+                     index: bool = True, budget: Optional[Budget] = None,
+                     recycle_after: Optional[int] = None, engine: str = "tables",
+                     profile: Optional[str] = None, trace_memory: bool = False) -> List[Dict[str, Any]]:
+    """Traite tous les PDF du dossier schema/ (en parallèle si jobs > 1)
+    
+    metrics_path  : fichier JSON des métriques de l'exécution (totaux + métriques par document)
+    export_format : json (indenté, défaut), compact ou binary (voir edi_export)
+    index         : met à jour l'index SQLite du corpus à chaque export écrit (voir edi_index)
+    budget        : limites de temps / mémoire par page et par document (voir edi_budget)
+    recycle_after : avec jobs > 1, worker remplacé après ce nombre de documents
+    engine        : moteur des tableaux, tables (défaut) ou words (voir edi_words)
+    profile       : fichier .prof cProfile de l'exécution
+    trace_memory  : pic mémoire tracemalloc ajouté aux métriques (tracemalloc_peak_bytes)
+    
+    Avec jobs > 1, cProfile / tracemalloc ne couvrent que le processus principal.
+    """
+    process_options = {'use_cache': use_cache, 'rebuild': rebuild, 'store_raw': store_raw,
+                       'verbosity': verbosity, 'export_format': export_format, 'index': index,
+                       'budget': budget, 'engine': engine}
     
     schema_dir = Path("schema")
     if not schema_dir.exists():
-        print(f"❌ Dossier 'schema/' introuvable")
-        return
+        logger.error(f"❌ Dossier 'schema/' introuvable")
+        return []
     
     pdf_files = list(schema_dir.glob("*.pdf"))
     if not pdf_files:
-        print(f"❌ Aucun PDF trouvé dans 'schema/'")
-        return
+        logger.error(f"❌ Aucun PDF trouvé dans 'schema/'")
+        return []
     
-    print(f"\n{'='*70}")
-    print(f"TRAITEMENT EN MASSE - {len(pdf_files)} FICHIERS PDF")
-    print(f"{'='*70}\n")
+    logger.info(f"\n{'='*70}")
+    logger.info(f"TRAITEMENT EN MASSE - {len(pdf_files)} FICHIERS PDF")
+    if jobs > 1:
+        logger.info(f"Processus parallèles : {jobs}")
+    logger.info(f"{'='*70}\n")
     
     results = []
     start_time = time.time()
     
-    for idx, pdf_file in enumerate(pdf_files, 1):
-        print(f"\n[{idx}/{len(pdf_files)}] Traitement de {pdf_file.name}...")
-        
-        try:
-            pdf_start = time.time()
-            process_pdf(pdf_file)
-            pdf_duration = time.time() - pdf_start
-            
-            results.append({
-                'file': pdf_file.name,
-                'status': 'SUCCESS',
-                'duration': pdf_duration
-            })
-        except Exception as e:
-            print(f"❌ ERREUR: {str(e)}")
-            results.append({
-                'file': pdf_file.name,
-                'status': 'FAILED',
-                'error': str(e)
-            })
+    memory_mb = budget.memory_mb if budget is not None else None
+    run_metrics = Metrics()
+    with profiling(run_metrics, profile, trace_memory):
+        if jobs > 1 or memory_mb:
+            # Pool de processus : la sortie de chaque fichier est capturée dans son
+            # worker puis réaffichée dans l'ordre de la liste (limite mémoire : workers seuls)
+            for index, result in _iter_pool_results(pdf_files, jobs, recycle_after, process_options, memory_mb):
+                logger.info(f"\n[{index + 1}/{len(pdf_files)}] Traitement de {pdf_files[index].name}...")
+                if 'output' not in result and result['status'] == 'FAILED':
+                    logger.error(f"❌ ERREUR: {result['error']}")
+                sys.stdout.write(result.pop('output', ''))
+                results.append(result)
+        else:
+            for idx, pdf_file in enumerate(pdf_files, 1):
+                logger.info(f"\n[{idx}/{len(pdf_files)}] Traitement de {pdf_file.name}...")
+                results.append(_process_one(pdf_file, **process_options))
     
     total_duration = time.time() - start_time
     
     # Résumé
-    print(f"\n\n{'='*70}")
-    print("RÉSUMÉ DU TRAITEMENT EN MASSE")
-    print(f"{'='*70}\n")
+    logger.info(f"\n\n{'='*70}")
+    logger.info("RÉSUMÉ DU TRAITEMENT EN MASSE")
+    logger.info(f"{'='*70}\n")
     
-    success_count = len([r for r in results if r['status'] == 'SUCCESS'])
+    # Format non reconnu : rien n'a été extrait, le fichier n'est pas compté comme réussi
+    unknown = [r for r in results if r['status'] == 'SUCCESS' and _detected_format(r) == UNKNOWN_FORMAT]
+    success_count = len([r for r in results if r['status'] == 'SUCCESS']) - len(unknown)
     failed_count = len([r for r in results if r['status'] == 'FAILED'])
     
-    print(f"Fichiers traités  : {len(results)}")
-    print(f"Succès           : {success_count}")
-    print(f"Échecs           : {failed_count}")
-    print(f"Durée totale     : {total_duration:.2f}s")
-    print(f"Durée moyenne    : {total_duration/len(results):.2f}s/fichier\n")
+    logger.info(f"Fichiers traités  : {len(results)}")
+    logger.info(f"Succès           : {success_count}")
+    logger.info(f"Échecs           : {failed_count}")
+    if unknown:
+        logger.info(f"Formats inconnus : {len(unknown)}")
+    logger.info(f"Durée totale     : {total_duration:.2f}s")
+    logger.info(f"Durée moyenne    : {total_duration/len(results):.2f}s/fichier\n")
     
     if failed_count > 0:
-        print("FICHIERS EN ÉCHEC:")
+        logger.info("FICHIERS EN ÉCHEC:")
         for result in results:
             if result['status'] == 'FAILED':
-                print(f"  ❌ {result['file']}: {result.get('error', 'Unknown error')}")
-        print()
+                logger.error(f"  ❌ {result['file']}: {result.get('error', 'Unknown error')}")
+        logger.info("")
     
-    print("FICHIERS RÉUSSIS:")
+    logger.info("FICHIERS RÉUSSIS:")
     for result in results:
-        if result['status'] == 'SUCCESS':
-            print(f"  ✅ {result['file']} ({result['duration']:.2f}s)")
+        if result['status'] == 'SUCCESS' and result not in unknown:
+            logger.info(f"  ✅ {result['file']} ({result['duration']:.2f}s)")
+    
+    if unknown:
+        logger.info("\nFORMATS INCONNUS (non extraits):")
+        for result in unknown:
+            detection = result['metrics']['format_detection']
+            logger.error(f"  ❌ {result['file']}: aucun format reconnu ({detection['pages_read']} page(s) lue(s))")
+    
+    # Formats détectés sans certitude : export à vérifier
+    uncertain = [
+        result for result in results
+        if result['status'] == 'SUCCESS' and result not in unknown
+        and result['metrics'].get('format_detection', {}).get('confidence', 1.0) < MIN_CONFIDENCE
+    ]
+    if uncertain:
+        logger.info("\nFORMATS INCERTAINS (à vérifier):")
+        for result in uncertain:
+            detection = result['metrics']['format_detection']
+            logger.warning(f"  ⚠️  {result['file']}: {detection['format']} "
+                           f"(confiance {detection['confidence']:.2f}, {detection['method']})")
+    
+    logger.info(f"\n{'='*70}")
+    logger.info(f"✅ TRAITEMENT TERMINÉ: {success_count}/{len(results)} fichiers extraits")
+    logger.info(f"{'='*70}\n")
+    
+    if metrics_path:
+        totals = Metrics()
+        for result in results:
+            for name, value in result.get('metrics', {}).get('counters', {}).items():
+                totals.incr(name, value)
+        write_metrics(metrics_path, {
+            'files': len(results),
+            'success': success_count,
+            'failed': failed_count,
+            'duration': round(total_duration, 6),
+            'jobs': jobs,
+            'counters': totals.counters,
+            **run_metrics.extra,
+            'documents': results
+        })
     
-    print(f"\n{'='*70}")
-    print(f"✅ TRAITEMENT TERMINÉ: {success_count}/{len(results)} fichiers extraits")
-    print(f"{'='*70}\n")
+    return results
 
 
 def main():
     """Fonction principale"""
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extraction EDI en masse des PDF de 'schema/'")
+    parser.add_argument("--all", action="store_true",
+                        help="traiter tous les PDF sans confirmation")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="nombre de processus parallèles (défaut : 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ne pas lire ni écrire le cache de résultats")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ré-extraire tous les PDF même s'ils sont en cache")
+    parser.add_argument("--store-raw", action="store_true",
+                        help="persister texte et tableaux bruts des pages (re-parsing sans PDF)")
+    parser.add_argument("--watch", action="store_true",
+                        help="surveiller 'schema/' et extraire les PDF nouveaux ou modifiés (sans confirmation)")
+    parser.add_argument("--interval", type=float, default=2.0, metavar="SECONDES",
+                        help="mode --watch : délai entre deux scrutations (défaut : 2)")
+    parser.add_argument("--once", action="store_true",
+                        help="mode --watch : extraire les PDF en attente puis s'arrêter")
+    parser.add_argument("--recycle-after", type=int, metavar="N",
+                        help="avec --jobs : remplacer chaque worker après N documents (mémoire rendue)")
+    add_export_arguments(parser)
+    add_engine_arguments(parser)
+    add_budget_arguments(parser)
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    verbosity = verbosity_from_args(args)
+    configure_logging(verbosity)
+    
+    if args.jobs < 1:
+        parser.error("--jobs doit être >= 1")
+    if args.recycle_after is not None and args.recycle_after < 1:
+        parser.error("--recycle-after doit être >= 1")
+    budget = budget_from_args(args)
+    
+    if args.watch:
+        from edi_watch import watch_schema
+        watch_schema(jobs=args.jobs, interval=args.interval, once=args.once, verbosity=verbosity,
+                     recycle_after=args.recycle_after,
+                     use_cache=not args.no_cache, rebuild=args.rebuild, store_raw=args.store_raw,
+                     export_format=args.export_format, index=args.index, budget=budget,
+                     engine=args.engine)
+        return
+    
+    def run():
+        process_all_pdfs(jobs=args.jobs, use_cache=not args.no_cache, rebuild=args.rebuild,
+                         store_raw=args.store_raw, verbosity=verbosity, metrics_path=args.metrics,
+                         export_format=args.export_format, index=args.index,
+                         budget=budget, recycle_after=args.recycle_after, engine=args.engine,
+                         profile=args.profile, trace_memory=args.trace_memory)
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--all":
-        process_all_pdfs()
+    if args.all:
+        run()
     else:
-        print("""
+        logger.info("""
 ╔══════════════════════════════════════════════════════════════════════╗
 ║                 EXTRACTEUR EDI - TRAITEMENT EN MASSE                 ║
 ╚══════════════════════════════════════════════════════════════════════╝
@@ -105,9 +334,9 @@ Appuyez sur Entrée pour continuer ou Ctrl+C pour annuler...
         
         try:
             input()
-            process_all_pdfs()
+            run()
         except KeyboardInterrupt:
-            print("\n\n❌ Traitement annulé par l'utilisateur\n")
+            logger.info("\n\n❌ Traitement annulé par l'utilisateur\n")
 
 
 if __name__ == "__main__":
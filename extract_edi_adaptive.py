@@ -5,327 +5,699 @@ Supporte :
 - Format VDA 4932 (sections "Segment: XXX Cons. No.: XX")
 """
 
+import gc
 import re
-import json
+import time
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from edi_budget import Budget, BudgetExceeded, PageBudgetExceeded, page_time_limit, run_with_memory_limit
+from edi_cache import ResultCache, file_sha256
+from edi_codes import CodeListIndex, write_code_lists
+from edi_detect import detect_format, MIN_CONFIDENCE, UNKNOWN_FORMAT
+from edi_export import EXPORT_FORMATS, EXPORT_SUFFIXES, open_export_writer
+from edi_index import update_index
+from edi_model import Guideline, Segment
+from edi_metrics import Metrics, logger, configure_logging, profiling, write_metrics
+from edi_rows import ROW_SEGMENT, ROW_GROUP, FORMAT_SPECS, FormatSpec
+from edi_raw_store import RawPageStore
+from edi_words import TABLE_ENGINES, WordTableEngine, make_table_engine, ruled_tables
+
+# Versions incluses dans la clé du cache de résultats :
+# à incrémenter dès que l'extraction ou le parsing produit une sortie différente
+EXTRACTOR_VERSION = "4.3"
+PARSER_VERSION = "2"
+
+# Descriptions EDIFACT standard (complètent les descriptions absentes du PDF)
+STANDARD_DESCRIPTIONS = {
+    "UNB": "Interchange header", "UNH": "Message header",
+    "BGM": "Beginning of message", "DTM": "Date/time/period",
+    "RFF": "Reference", "NAD": "Name and address",
+    "CTA": "Contact information", "COM": "Communication contact",
+    "TAX": "Duty/tax/fee details", "CUX": "Currencies",
+    "PAT": "Payment terms basis", "PCD": "Percentage details",
+    "MOA": "Monetary amount", "LIN": "Line item",
+    "PIA": "Additional product id", "IMD": "Item description",
+    "QTY": "Quantity", "ALI": "Additional information",
+    "GIN": "Goods identity number", "GIR": "Related identification numbers",
+    "QVR": "Quantity variances", "DOC": "Document/message details",
+    "PRI": "Price details", "APR": "Additional price information",
+    "RNG": "Range details", "LOC": "Place/location identification",
+    "TOD": "Terms of delivery or transport", "PAC": "Package",
+    "PCI": "Package identification", "ALC": "Allowance or charge",
+    "RCS": "Requirements and conditions", "UNS": "Section control",
+    "CNT": "Control total", "UNT": "Message trailer",
+    "UNZ": "Interchange trailer", "FTX": "Free text",
+    "FII": "Financial institution information", "MEA": "Measurements",
+    "PAI": "Payment instructions"
+}
+
+# Détection des tableaux limitée à la zone de segments (voir FormatSpec.table_anchor)
+CROP_MARGIN = 20  # points conservés au-dessus de l'ancre (filet supérieur de l'en-tête)
+ANCHOR_LINE_TOLERANCE = 3  # écart vertical au-delà duquel deux caractères sont sur deux lignes
+
+
+UNMAPPED_GLYPH = "\ufffd"  # glyphe sans correspondance Unicode ("(cid:123)" chez pdfminer)
+
+
+def _anchor_top(chars: List[Dict[str, Any]], anchor) -> Optional[float]:
+    """Position verticale de l'ancre la plus haute de la page (None si absente)
+    
+    Le texte d'un caractère peut compter plusieurs lettres (ligatures, "(cid:123)") :
+    chaque position du texte joint est rattachée à son caractère, et un glyphe non
+    décodé compte pour un seul caractère neutre (ses chiffres ne forment pas une ancre).
+    Un saut de ligne est inséré à chaque changement de ligne : "^" (re.MULTILINE) désigne
+    un début de ligne, par exemple la colonne des codes d'un tableau.
+    """
+    pieces, owners = [], []
+    previous_top = None
+    for index, char in enumerate(chars):
+        text = char["text"]
+        if text.startswith("(cid:"):
+            text = UNMAPPED_GLYPH
+        if previous_top is not None and abs(char["top"] - previous_top) > ANCHOR_LINE_TOLERANCE:
+            text = "\n" + text
+        previous_top = char["top"]
+        pieces.append(text)
+        owners.extend([index] * len(text))
+    tops = [chars[owners[match.start()]]["top"] for match in anchor.finditer(''.join(pieces))]
+    return min(tops) if tops else None
+
+
+def _rule_above(page, y: float) -> Optional[float]:
+    """Filet horizontal (trait ou bord de rectangle) le plus proche au-dessus de y"""
+    rules = [line["top"] for line in page.objects.get("line", []) if line["top"] == line["bottom"]]
+    for rect in page.objects.get("rect", []):
+        rules.extend((rect["top"], rect["bottom"]))
+    above = [rule for rule in rules if rule <= y]
+    return max(above) if above else None
+
+
+def _region_bbox(page, spec: FormatSpec) -> Optional[Tuple[float, float, float, float]]:
+    """Zone de la page située sous la première ancre (None = page entière)
+    
+    La zone commence CROP_MARGIN au-dessus de l'ancre, ou plus haut au filet qui la précède :
+    une ligne d'en-tête haute (texte centré, libellés sur plusieurs lignes) reste entière.
+    """
+    top = _anchor_top(page.chars, spec.table_anchor)
+    if top is None:
+        return None
+    crop_top = top - CROP_MARGIN
+    rule = _rule_above(page, top)
+    if rule is not None:
+        crop_top = min(crop_top, rule - 1)
+    if crop_top > 0:
+        return (0, crop_top, page.width, page.height)
+    return None
+
+
+def region_signature(pdf_format: str) -> Dict[str, Any]:
+    """Format et réglages qui déterminent les tableaux de la zone de segments (persistés avec eux)"""
+    spec = FORMAT_SPECS[pdf_format]
+    return {"format": pdf_format, "table_anchor": spec.table_anchor.pattern,
+            "table_settings": spec.table_settings, "crop_margin": CROP_MARGIN}
+
+
+def _region_tables(page, spec: FormatSpec, engine: Optional[WordTableEngine] = None) -> List[List[List[Optional[str]]]]:
+    """Tableaux de la zone de segments de la page (moteur par mots si fourni, voir edi_words)"""
+    bbox = _region_bbox(page, spec)
+    if engine is not None:
+        return engine.extract_tables(page, bbox, spec.table_settings)
+    return ruled_tables(page, bbox, spec.table_settings)
+
+
+def _page_object_count(page) -> int:
+    """Objets de mise en page d'une page (caractères, traits, rectangles, courbes...)"""
+    return sum(len(objects) for objects in page.objects.values())
+
+
+def _extract_page_shard(pdf_path: str, indices: List[int], with_text: bool, pdf_format: Optional[str] = None,
+                        budget: Optional[Budget] = None, engine_state: Optional[Dict[str, Any]] = None
+                        ) -> Tuple[List[Tuple[int, Optional[str], Optional[list], Optional[str]]], Optional[Dict[str, Any]]]:
+    """Worker : texte et tableaux d'une tranche de pages (exécuté dans un processus séparé)
+    
+    Avec pdf_format, seules les pages qualifiées sont analysées, dans leur zone de segments
+    (tableaux à None pour une page écartée par le préfiltre).
+    Avec un budget, une page hors budget a des tableaux à None et le motif en 4e valeur.
+    Avec engine_state (WordTableEngine.state), les tableaux passent par le moteur par mots,
+    dont les compteurs sont retournés avec les pages.
+    """
+    spec = FORMAT_SPECS[pdf_format] if pdf_format else None
+    engine = WordTableEngine(**engine_state) if engine_state is not None else None
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for index in indices:
+            page = pdf.pages[index]
+            text = None
+            try:
+                with page_time_limit(budget.page_seconds if budget else None, index + 1):
+                    if spec is None:
+                        text = (page.extract_text() or "") if with_text else None
+                        if budget is not None:
+                            budget.check_objects(index + 1, _page_object_count(page))
+                        results.append((index, text, page.extract_tables(), None))
+                    else:
+                        text = page.extract_text() or ""
+                        tables = None
+                        if spec.page_marker.search(text):
+                            if budget is not None:
+                                budget.check_objects(index + 1, _page_object_count(page))
+                            tables = _region_tables(page, spec, engine)
+                        results.append((index, text, tables, None))
+            except (PageBudgetExceeded, MemoryError) as e:
+                results.append((index, text, None, str(e) or type(e).__name__))
+            page.close()
+    return results, (engine.stats if engine is not None else None)
+
+
+def _split_shards(indices: List[int], shard_count: int) -> List[List[int]]:
+    """Découpe une liste de pages en tranches contiguës de tailles équilibrées"""
+    shard_count = max(1, min(shard_count, len(indices)))
+    size, extra = divmod(len(indices), shard_count)
+    shards, start = [], 0
+    for shard_idx in range(shard_count):
+        stop = start + size + (1 if shard_idx < extra else 0)
+        shards.append(indices[start:stop])
+        start = stop
+    return [shard for shard in shards if shard]
+
+
+
+class PDFSession:
+    """Session d'extraction : ouvre le PDF une seule fois et met en cache texte, mots et tableaux par page"""
+    
+    has_layout = True  # Accès aux objets pdfplumber (voir StoredSession pour le mode sans PDF)
+    
+    def __init__(self, pdf_path: str):
+        self.pdf_path = Path(pdf_path)
+        self._pdf = None
+        self._text_cache: Dict[int, str] = {}
+        self._words_cache: Dict[int, List[Dict[str, Any]]] = {}
+        self._tables_cache: Dict[int, List[List[List[Optional[str]]]]] = {}
+        self._region_tables_cache: Dict[int, List[List[List[Optional[str]]]]] = {}
+        self._over_budget: Dict[int, str] = {}  # pages hors budget (motif), jamais réanalysées
+    
+    def open(self) -> "PDFSession":
+        """Ouvre le PDF (une seule fois par session)"""
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.pdf_path)
+        return self
+    
+    def close(self):
+        """Ferme le PDF et vide les caches"""
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        self._text_cache.clear()
+        self._words_cache.clear()
+        self._tables_cache.clear()
+        self._region_tables_cache.clear()
+        self._over_budget.clear()
+    
+    def __enter__(self) -> "PDFSession":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @property
+    def page_count(self) -> int:
+        return len(self.open()._pdf.pages)
+    
+    def page(self, index: int):
+        """Page pdfplumber (index à partir de 0)"""
+        return self.open()._pdf.pages[index]
+    
+    def page_text(self, index: int) -> str:
+        """Texte de la page, calculé une seule fois"""
+        if index not in self._text_cache:
+            self._text_cache[index] = self.page(index).extract_text() or ""
+        return self._text_cache[index]
+    
+    def page_words(self, index: int) -> List[Dict[str, Any]]:
+        """Mots (avec coordonnées) de la page, calculés une seule fois"""
+        if index not in self._words_cache:
+            self._words_cache[index] = self.page(index).extract_words()
+        return self._words_cache[index]
+    
+    def page_tables(self, index: int) -> List[List[List[Optional[str]]]]:
+        """Tableaux de la page, calculés une seule fois"""
+        if index not in self._tables_cache:
+            self._tables_cache[index] = self.page(index).extract_tables()
+        return self._tables_cache[index]
+    
+    def page_region_tables(self, index: int, pdf_format: str,
+                           engine: Optional[WordTableEngine] = None) -> List[List[List[Optional[str]]]]:
+        """Tableaux de la zone de segments de la page (réglages du format), calculés une seule fois
+        
+        engine : moteur par coordonnées de mots (voir edi_words), sinon extract_tables()
+        """
+        if index not in self._region_tables_cache:
+            self._region_tables_cache[index] = _region_tables(self.page(index), FORMAT_SPECS[pdf_format], engine)
+        return self._region_tables_cache[index]
+    
+    def check_page_budget(self, index: int, budget: Budget):
+        """Lève PageBudgetExceeded pour une page déjà hors budget ou trop chargée en objets"""
+        if index in self._over_budget:
+            raise PageBudgetExceeded(self._over_budget[index])
+        if budget.page_objects is not None and index not in self._region_tables_cache:
+            budget.check_objects(index + 1, _page_object_count(self.page(index)))
+    
+    def mark_over_budget(self, index: int, reason: str):
+        self._over_budget[index] = reason
+    
+    def raw_page(self, index: int) -> Dict[str, Any]:
+        """Page brute à persister : texte, tableaux de zone parsés (ou motif hors budget)
+        
+        Seules les pages dont la zone de segments a été analysée ont des tableaux ;
+        les pages écartées par le préfiltre n'en ont pas.
+        """
+        page = {"text": self.page_text(index)}
+        if index in self._over_budget:
+            page["over_budget"] = self._over_budget[index]
+        elif index in self._region_tables_cache:
+            page["region_tables"] = self._region_tables_cache[index]
+        return page
+    
+    def release_page(self, index: int):
+        """Libère les objets de mise en page et les caches d'une page déjà parsée"""
+        if self._pdf is not None:
+            self._pdf.pages[index].close()
+        self._text_cache.pop(index, None)
+        self._words_cache.pop(index, None)
+        self._tables_cache.pop(index, None)
+        self._region_tables_cache.pop(index, None)
+    
+    def prefetch_parallel(self, jobs: int, with_text: bool = True, pdf_format: Optional[str] = None,
+                          budget: Optional[Budget] = None, engine: Optional[WordTableEngine] = None):
+        """Pré-remplit les caches en répartissant des tranches de pages sur plusieurs processus
+        
+        Seule l'analyse de mise en page est parallélisée : le parsing reste séquentiel
+        dans l'ordre des pages, le résultat est donc identique à une exécution série.
+        Avec pdf_format, les tableaux sont ceux de page_region_tables (pages qualifiées).
+        Avec un budget, les pages hors budget sont marquées (voir check_page_budget).
+        Avec le moteur par mots, la disposition est apprise ici sur les premières pages qualifiées
+        puis transmise aux processus ; leurs compteurs sont cumulés dans `engine`.
+        """
+        tables_cache = self._region_tables_cache if pdf_format else self._tables_cache
+        with_text = with_text or pdf_format is not None
+        if engine is not None and pdf_format:
+            self._learn_layout(pdf_format, engine, budget)
+        missing = [
+            index for index in range(self.page_count)
+            if index not in self._over_budget
+            and (index not in tables_cache or (with_text and index not in self._text_cache))
+        ]
+        if not missing:
+            return
+        
+        # Plusieurs tranches par processus pour équilibrer les pages lourdes
+        shards = _split_shards(missing, jobs * 4)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_extract_page_shard, str(self.pdf_path), shard, with_text, pdf_format, budget,
+                            engine.state() if engine is not None and pdf_format else None)
+                for shard in shards
+            ]
+            for future in futures:
+                results, engine_stats = future.result()
+                if engine_stats is not None:
+                    engine.merge_stats(engine_stats)
+                for index, text, tables, over_budget in results:
+                    if text is not None:
+                        self._text_cache.setdefault(index, text)
+                    if tables is not None:
+                        tables_cache.setdefault(index, tables)
+                    if over_budget is not None:
+                        self.mark_over_budget(index, over_budget)
+    
+    def _learn_layout(self, pdf_format: str, engine: WordTableEngine, budget: Optional[Budget] = None):
+        """Analyse les premières pages qualifiées jusqu'à la fin de l'apprentissage du moteur par mots"""
+        marker = FORMAT_SPECS[pdf_format].page_marker
+        for index in range(self.page_count):
+            if not engine.learning:
+                return
+            if index in self._over_budget or index in self._region_tables_cache:
+                continue
+            try:
+                with page_time_limit(budget.page_seconds if budget else None, index + 1):
+                    if marker.search(self.page_text(index)):
+                        if budget is not None:
+                            self.check_page_budget(index, budget)
+                        self.page_region_tables(index, pdf_format, engine)
+            except (PageBudgetExceeded, MemoryError) as e:
+                self.mark_over_budget(index, str(e) or type(e).__name__)
+    
+    def materialize(self, budget: Optional[Budget] = None, started: Optional[float] = None):
+        """Complète le texte des pages pour la persistance brute, après le parsing
+        
+        Aucun tableau n'est recalculé : les tableaux persistés sont ceux de la zone de
+        segments déjà analysés par le parsing (voir raw_page). Avec un budget, la lecture
+        du texte reste dans les limites de l'extraction et la durée du document est
+        vérifiée entre deux pages ; une page hors budget n'est jamais relue.
+        """
+        started = started if started is not None else time.perf_counter()
+        for index in range(self.page_count):
+            if index in self._text_cache:
+                continue
+            if index in self._over_budget:
+                self._text_cache[index] = ""
+                continue
+            if budget is None:
+                self.page_text(index)
+                continue
+            budget.check_document(started)
+            try:
+                with page_time_limit(budget.page_seconds, index + 1):
+                    self.page_text(index)
+            except (PageBudgetExceeded, MemoryError) as e:
+                self.mark_over_budget(index, str(e) or f"page {index + 1}: mémoire insuffisante")
+                self._text_cache.setdefault(index, "")
 
 
 class AdaptiveEDIExtractor:
     """Extracteur adaptatif pour différents formats de PDF EDI"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, jobs: int = 1, session=None, metrics: Optional[Metrics] = None,
+                 budget: Optional[Budget] = None, engine: Optional[str] = None):
         self.pdf_path = Path(pdf_path)
-        self.segments_dict = {}
-        self.pdf_format = None  # 'faurecia' ou 'vda4932'
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.jobs = jobs  # Processus pour l'analyse des pages (1 = séquentiel)
+        self.model = Guideline()  # Segments, groupes et éléments (modèle compact)
+        self.pdf_format = None  # 'faurecia' ou 'vda4932' ('unknown' : format non reconnu, rien n'est extrait)
+        self.detection = None   # Détail de la détection (scores, confiance, méthode)
+        # Session fournie par l'appelant (PDFSession ou StoredSession), sinon ouverte à la demande
+        self.session = session
+        self.budget = budget  # Limites de temps / taille par page et par document (voir edi_budget)
+        self.code_lists = CodeListIndex()  # Codes des usages par chemin, avec leur page (voir edi_codes)
+        # Moteur des tableaux : None = extract_tables() (référence), sinon moteur par mots (voir edi_words)
+        self.table_engine = make_table_engine(engine)
+        self._started = None
+    
+    @property
+    def segments_dict(self) -> Dict[str, Segment]:
+        """Segments extraits par code, dans l'ordre du document"""
+        return self.model.segments
+    
+    @contextmanager
+    def _session_scope(self):
+        """Réutilise la session ouverte (ou fournie) ou en ouvre une pour la durée de l'appel"""
+        if self.session is not None:
+            yield self.session
+            return
+        with PDFSession(self.pdf_path) as session:
+            self.session = session
+            try:
+                yield session
+            finally:
+                self.session = None
     
     def detect_pdf_format(self) -> str:
-        """Détecte automatiquement le format du PDF"""
-        print("🔍 Détection du format PDF...")
+        """Détecte automatiquement le format du PDF (voir edi_detect)"""
+        logger.info("🔍 Détection du format PDF...")
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            # Analyser les 10 premières pages
-            for page in pdf.pages[:10]:
-                text = page.extract_text() if page.extract_text() else ""
-                
-                # Format VDA 4932 : "Segment: NAD Cons. No.: 14 Level: 1"
-                if re.search(r'Segment:\s+[A-Z]{3}\s+Cons\.\s*No\.:', text):
-                    print("   ✓ Format détecté: VDA 4932 (Automotive standard)\n")
-                    return 'vda4932'
-                
-                # Format Faurecia : "Segment: Pos.: N Level: N" ou ligne séparée
-                # Pattern 1: Tout sur une ligne (rare)
-                if re.search(r'Segment:.*Pos\.:\s*\d+.*Level:', text):
-                    print("   ✓ Format détecté: Faurecia EDI Guideline\n")
-                    return 'faurecia'
-                
-                # Pattern 2: "Segment: Pos.: N" sur des lignes séparées (courant)
-                if re.search(r'Segment:\s+Pos\.:\s*\d+\s+Level:', text):
-                    print("   ✓ Format détecté: Faurecia EDI Guideline\n")
-                    return 'faurecia'
-                
-                # Pattern 3: Détecter simplement la présence de "Pos.:" et segments UNH/BGM/etc
-                if 'Pos.:' in text and re.search(r'\b(UNH|BGM|DTM|NAD|LIN|MOA)\b', text):
-                    print("   ✓ Format détecté: Faurecia EDI Guideline\n")
-                    return 'faurecia'
-        
-        print("   ⚠️  Format inconnu, utilisation du format générique par défaut\n")
-        return 'faurecia'
-    
-    def extract_all(self) -> List[Dict[str, Any]]:
-        """Pipeline complet d'extraction adaptative"""
-        print(f"{'='*70}")
-        print("EXTRACTION ADAPTATIVE EDI")
-        print(f"{'='*70}\n")
-        
-        # Détection du format
-        self.pdf_format = self.detect_pdf_format()
-        
-        # Extraction selon le format
-        if self.pdf_format == 'vda4932':
-            self.extract_vda4932_format()
+        with self._session_scope() as session:
+            detection = detect_format(session)
+        self.detection = detection
+        self.metrics.extra["format_detection"] = detection
+        
+        if detection["format"] == UNKNOWN_FORMAT:
+            logger.error(f"   ❌ Format inconnu ({detection['pages_read']} page(s) lue(s)), extraction ignorée\n")
+        elif detection["confidence"] < MIN_CONFIDENCE:
+            logger.warning(f"   ⚠️  Format incertain: {detection['label']} "
+                           f"(confiance {detection['confidence']:.2f}, scores {detection['scores']})\n")
         else:
-            self.extract_faurecia_format()
+            logger.info(f"   ✓ Format détecté: {detection['label']} "
+                        f"(confiance {detection['confidence']:.2f}, {detection['method']})\n")
+        return detection["format"]
+    
+    def extract_all(self) -> List[Segment]:
+        """Pipeline complet d'extraction adaptative (segments du modèle, voir to_dict)"""
+        logger.info(f"{'='*70}")
+        logger.info("EXTRACTION ADAPTATIVE EDI")
+        logger.info(f"{'='*70}\n")
+        
+        metrics = self.metrics
+        self._started = time.perf_counter()
+        
+        # Une seule ouverture du PDF pour la détection et l'extraction
+        with self._session_scope():
+            # Détection du format
+            with metrics.stage("format_detection"):
+                self.pdf_format = self.detect_pdf_format()
+            if self.pdf_format == UNKNOWN_FORMAT:
+                return []
+            
+            # Analyse des pages par tranches en parallèle (pages qualifiées, zone de segments)
+            if self.jobs > 1 and self.session.has_layout:
+                logger.info(f"⚡ Analyse parallèle des pages ({self.jobs} processus)...\n")
+                with metrics.stage("page_prefetch"):
+                    self.session.prefetch_parallel(self.jobs, pdf_format=self.pdf_format, budget=self.budget,
+                                                   engine=self.table_engine)
+            
+            # Extraction selon la spec du format
+            with metrics.stage("parsing"):
+                self.extract_format()
         
         # Enrichissement
-        self.add_standard_descriptions()
+        with metrics.stage("add_standard_descriptions"):
+            self.add_standard_descriptions()
         
         # Statistiques
-        stats = self.get_statistics()
-        
-        print(f"{'='*70}")
-        print("STATISTIQUES FINALES")
-        print(f"{'='*70}")
-        print(f"Segments                : {stats['segments']}")
-        print(f"Éléments simples        : {stats['simple_elements']}")
-        print(f"Groupes composites      : {stats['groups']}")
-        print(f"Éléments dans groupes   : {stats['elements_in_groups']}")
-        print(f"Total éléments          : {stats['simple_elements'] + stats['elements_in_groups']}")
-        print(f"Éléments avec format    : {stats['elements_with_format']}")
-        print(f"Éléments avec valeur    : {stats['elements_with_value']}")
-        print(f"Éléments avec usage     : {stats['elements_with_usage']} 🎯")
-        print(f"{'='*70}\n")
+        self.print_statistics()
         
         return list(self.segments_dict.values())
     
-    def extract_vda4932_format(self):
-        """Extrait les segments du format VDA 4932"""
-        print("📖 Extraction format VDA 4932...")
+    def iter_segments(self) -> Iterator[Dict[str, Any]]:
+        """Extraction en flux : produit chaque segment dès qu'il est complet
         
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                # Chercher les segments : "Segment: NAD Cons. No.: 14 Level: 1 Name and address"
-                segment_matches = re.finditer(
-                    r'Segment:\s+([A-Z]{3})\s+Cons\.\s*No\.:\s*(\d+)\s+Level:\s*(\d+)\s+(.*?)(?=\n|$)',
-                    text
-                )
-                
-                for match in segment_matches:
-                    segment_code = match.group(1)
-                    cons_no = match.group(2)
-                    level = match.group(3)
-                    description = match.group(4).strip()
-                    
-                    # Créer ou mettre à jour le segment
-                    if segment_code not in self.segments_dict:
-                        self.segments_dict[segment_code] = {
-                            "segment": segment_code,
-                            "description": description,
-                            "elements": []
-                        }
+        Les objets de mise en page de chaque page sont libérés après son parsing,
+        la mémoire ne croît donc pas avec le nombre de pages. Les segments sont
+        produits dans l'ordre du document :
+        - en-têtes dans le texte (VDA 4932) : un segment est complet dès que le suivant est ouvert
+        - en-têtes dans les tableaux (Faurecia) : un segment peut réapparaître plus loin
+          (ex. DTM, NAD), les segments ne sont donc complets qu'en fin de document
+        """
+        logger.info(f"{'='*70}")
+        logger.info("EXTRACTION ADAPTATIVE EDI (FLUX)")
+        logger.info(f"{'='*70}\n")
+        
+        emitted = 0
+        self._started = time.perf_counter()
+        with self._session_scope() as session:
+            self.pdf_format = self.detect_pdf_format()
+            if self.pdf_format == UNKNOWN_FORMAT:
+                return
+            spec = self.spec
+            logger.info(f"📖 Extraction en flux format {spec.label}...")
+            
+            for page_num in range(1, session.page_count + 1):
+                with self.metrics.page(page_num):
+                    self._extract_page_within_budget(session, page_num)
+                session.release_page(page_num - 1)
                 
-                # Extraire les tableaux de données
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 3:
-                        continue
-                    
-                    self._parse_vda_table(table, page_num)
-        
-        print(f"   ✓ {len(self.segments_dict)} segments trouvés\n")
-    
-    def _parse_vda_table(self, table: List[List[str]], page_num: int):
-        """Parse un tableau VDA 4932 avec la vraie structure"""
-        if not self.segments_dict:
+                if not spec.segments_in_tables:
+                    # Les tableaux ne complètent que le dernier segment ouvert
+                    complete = len(self.segments_dict) - 1
+                    for segment in islice(self.segments_dict.values(), emitted, max(complete, emitted)):
+                        self._finalize_segment(segment.segment, segment)
+                        yield segment.to_dict()
+                    emitted = max(complete, emitted)
+        
+        for segment in islice(self.segments_dict.values(), emitted, None):
+            self._finalize_segment(segment.segment, segment)
+            yield segment.to_dict()
+        
+        logger.info(f"   ✓ {len(self.segments_dict)} segments trouvés\n")
+        self.print_statistics()
+    
+    def print_statistics(self):
+        """Affiche les statistiques finales (et les enregistre dans les métriques)"""
+        with self.metrics.stage("get_statistics"):
+            stats = self.get_statistics()
+        self.metrics.extra["statistics"] = stats
+        self.metrics.extra["pdf_format"] = self.pdf_format
+        if self.table_engine is not None:
+            self.metrics.extra["table_engine"] = {"engine": self.table_engine.name, **self.table_engine.stats}
+        
+        logger.info(f"{'='*70}")
+        logger.info("STATISTIQUES FINALES")
+        logger.info(f"{'='*70}")
+        logger.info(f"Segments                : {stats['segments']}")
+        logger.info(f"Éléments simples        : {stats['simple_elements']}")
+        logger.info(f"Groupes composites      : {stats['groups']}")
+        logger.info(f"Éléments dans groupes   : {stats['elements_in_groups']}")
+        logger.info(f"Total éléments          : {stats['simple_elements'] + stats['elements_in_groups']}")
+        logger.info(f"Éléments avec format    : {stats['elements_with_format']}")
+        logger.info(f"Éléments avec valeur    : {stats['elements_with_value']}")
+        logger.info(f"Éléments avec usage     : {stats['elements_with_usage']} 🎯")
+        logger.info(f"{'='*70}\n")
+    
+    @property
+    def spec(self) -> FormatSpec:
+        """Spec du format détecté (colonnes, en-têtes, règles de suite d'usage)"""
+        return FORMAT_SPECS[self.pdf_format]
+    
+    def extract_format(self):
+        """Extrait les segments de toutes les pages selon la spec du format détecté"""
+        logger.info(f"📖 Extraction format {self.spec.label}...")
+        
+        with self._session_scope() as session:
+            for page_num in range(1, session.page_count + 1):
+                with self.metrics.page(page_num):
+                    self._extract_page_within_budget(session, page_num)
+        
+        logger.info(f"   ✓ {len(self.segments_dict)} segments trouvés\n")
+    
+    def _extract_page_within_budget(self, session, page_num: int):
+        """Extrait une page dans les limites du budget : une page hors budget est ignorée et signalée
+        
+        Seule la lecture de la page (texte, tableaux) est interruptible ; le modèle n'est
+        alimenté qu'une fois la page entièrement lue, jamais par une moitié de page.
+        """
+        budget = self.budget
+        if budget is None:
+            self._extract_page(session, page_num)
             return
         
-        # Dernier segment traité
-        last_segment = list(self.segments_dict.values())[-1]
-        current_group = None
+        budget.check_document(self._started if self._started is not None else time.perf_counter())
+        try:
+            with page_time_limit(budget.page_seconds, page_num):
+                headers, tables = self._read_page(session, page_num)
+        except (PageBudgetExceeded, MemoryError) as e:
+            reason = str(e) or f"page {page_num}: mémoire insuffisante"
+            logger.warning(f"   ⚠️  Page {page_num} ignorée (hors budget): {reason}")
+            self.metrics.incr("pages_over_budget")
+            self.metrics.extra.setdefault("pages_over_budget", []).append({"page": page_num, "reason": reason})
+            if session.has_layout:
+                session.mark_over_budget(page_num - 1, reason)
+            session.release_page(page_num - 1)
+            gc.collect()
+            return
+        self._merge_page(headers, tables, page_num)
+    
+    def _extract_page(self, session, page_num: int):
+        """Extrait les segments d'une page"""
+        self._merge_page(*self._read_page(session, page_num), page_num)
+    
+    def _read_page(self, session, page_num: int) -> Tuple[List[Tuple[str, str]], List[List[List[Optional[str]]]]]:
+        """Lit une page sans modifier le modèle : (en-têtes de segment du texte, tableaux)"""
+        spec = self.spec
+        text = session.page_text(page_num - 1)
         
-        for row_idx, row in enumerate(table):
-            if not row or len(row) < 2:
-                continue
-            
-            row_clean = [str(cell).strip() if cell else '' for cell in row]
-            
-            # Col 0 contient "CODE Description" (ex: "3035 Party qualifier")
-            col0 = row_clean[0] if row_clean else ''
-            col1 = row_clean[1] if len(row_clean) > 1 else ''  # Format
-            col2 = row_clean[2] if len(row_clean) > 2 else ''  # Exemple/Valeur
-            col3 = row_clean[3] if len(row_clean) > 3 else ''  # Usage/Application
-            
-            # Ignorer les lignes d'en-tête
-            if not col0 or col0.startswith('S.Format') or 'Segment can/must' in col0:
-                continue
+        # En-têtes de segment dans le texte : "Segment: NAD Cons. No.: 14 Level: 1 Name and address"
+        headers = []
+        if spec.segment_text_re is not None:
+            headers = [(match.group("code"), match.group("description").strip())
+                       for match in spec.segment_text_re.finditer(text)]
             
-            # Extraire le code et la description de col0
-            # Patterns: "3035 Party qualifier" ou "C082 Party identification details"
-            code_match = re.match(r'^([SC]?\d{3,4})\s+(.+)$', col0)
-            if not code_match:
+            # Sans segment ouvert, aucun tableau ne peut être rattaché
+            if not headers and not self.segments_dict:
+                self.metrics.incr("pages_skipped")
+                return headers, []
+        
+        # Extraire les tableaux de données
+        return headers, self._segment_tables(session, page_num - 1, text)
+    
+    def _merge_page(self, headers: List[Tuple[str, str]], tables: List[List[List[Optional[str]]]], page_num: int):
+        """Ajoute au modèle les segments et les tableaux d'une page lue"""
+        spec = self.spec
+        for code, description in headers:
+            self._open_segment(code, description)
+        
+        self.metrics.incr("tables_seen", len(tables))
+        for table in tables:
+            if not table or len(table) < spec.min_table_rows:
                 continue
             
-            code = code_match.group(1)
-            description = code_match.group(2).strip()
-            
-            # Nettoyer la description
-            description = self.clean_description(description)
-            
-            # Nettoyer le format (col1)
-            format_str = col1.strip()
-            
-            # Nettoyer la valeur (col2)
-            valeur = col2.strip()
-            
-            # Collecter tous les usages multi-lignes (col3)
-            usage_clean = ''
-            if col3 and col3.strip() != '--':
-                usage_parts = [col3.strip()]
-                next_idx = row_idx + 1
-                # Look-ahead pour les lignes suivantes d'usage
-                while next_idx < len(table):
-                    next_row = table[next_idx]
-                    if not next_row or len(next_row) < 4:
-                        break
-                    next_row_clean = [str(cell).strip() if cell else '' for cell in next_row]
-                    next_code = next_row_clean[0]
-                    next_usage = next_row_clean[3] if len(next_row_clean) > 3 else ''
-                    
-                    # Si la ligne suivante a un code, on arrête la consolidation
-                    if next_code and (re.match(r'^\d{4}$', next_code) or re.match(r'^[SC]\d{3}$', next_code)):
-                        break
-                    
-                    # Si la ligne contient un usage avec pattern 'XXX'= ou code=, on l'ajoute
-                    if next_usage and (re.match(r"^['\"]?[A-Z0-9]+['\"]?\s*=", next_usage.strip()) or 
-                                       re.match(r'^[A-Z][a-z]+\s+[A-Z]', next_usage.strip())):
-                        usage_parts.append(next_usage.strip())
-                        next_idx += 1
-                    else:
-                        break
-                
-                usage_clean = '\n'.join(usage_parts) if usage_parts else ''
-            
-            # Groupe composite (C082, S001, etc.)
-            if re.match(r'^[SC]\d{3}$', code):
-                current_group = {
-                    "groupe": code,
-                    "description": description,
-                    "champs": []
-                }
-                last_segment["elements"].append(current_group)
-            
-            # Élément de données (3035, 1131, 3039, etc.)
-            elif re.match(r'^\d{4}$', code):
-                element = {
-                    "champ": code,
-                    "description": description,
-                    "format": format_str,
-                    "valeur": valeur,
-                    "usage": usage_clean
-                }
-                
-                if current_group:
-                    current_group["champs"].append(element)
-                else:
-                    last_segment["elements"].append(element)
-    
-    def extract_faurecia_format(self):
-        """Extrait les segments du format Faurecia (code existant)"""
-        print("📖 Extraction format Faurecia...")
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                
-                for table in tables:
-                    if not table or len(table) < 5:
-                        continue
-                    
-                    self._parse_faurecia_table(table, page_num)
+            self._parse_table(table, page_num)
+    
+    def _segment_tables(self, session, index: int, text: str) -> List[List[List[Optional[str]]]]:
+        """Tableaux d'une page qualifiée par le préfiltre (liste vide sinon)
         
-        print(f"   ✓ {len(self.segments_dict)} segments trouvés\n")
+        Avec le PDF, la détection des tableaux est limitée à la zone de segments
+        de la page. Les pages brutes persistées fournissent les tableaux de zone
+        parsés à l'extraction s'ils ont la même signature (format, réglages) ; sinon
+        leurs tableaux pleine page servent de repli, compté dans les métriques.
+        """
+        if not self.spec.page_marker.search(text):
+            self.metrics.incr("pages_skipped")
+            return []
+        if session.has_layout:
+            if self.budget is not None:
+                session.check_page_budget(index, self.budget)
+            return session.page_region_tables(index, self.pdf_format, self.table_engine)
+        reason = session.page_over_budget(index)
+        if reason is not None:
+            logger.warning(f"   ⚠️  Page {index + 1} persistée sans tableaux (hors budget à l'extraction): {reason}")
+            self.metrics.incr("pages_over_budget")
+            return []
+        tables = session.page_region_tables(index, region_signature(self.pdf_format))
+        if tables is None:
+            self.metrics.incr("pages_full_table_fallback")
+            tables = session.page_tables(index)
+        return tables
     
-    def _parse_faurecia_table(self, table: List[List[str]], page_num: int):
-        """Parse un tableau Faurecia (code existant optimisé)"""
+    def _open_segment(self, segment_code: str, description: str) -> Segment:
+        """Crée un segment à sa première occurrence et le retourne"""
+        segment = self.model.open_segment(segment_code, description)
+        if segment is None:
+            return self.segments_dict[segment_code]
+        self.metrics.incr("segments_created")
+        return segment
+    
+    def _parse_table(self, table: List[List[str]], page_num: int):
+        """Parse un tableau avec la boucle compilée de la spec du format
+        
+        En-têtes dans le texte : le tableau complète le dernier segment ouvert.
+        En-têtes dans le tableau : les lignes avant le premier en-tête sont ignorées.
+        """
+        spec = self.spec
         current_segment = None
+        if not spec.segments_in_tables:
+            if not self.segments_dict:
+                return
+            current_segment = next(reversed(self.segments_dict.values()))
         current_group = None
+        rows_parsed = 0
+        model = self.model
+        clean_description = self.clean_description
+        add_usage = self.code_lists.add_usage
         
-        for row_idx, row in enumerate(table):
-            if not row:
-                continue
-            
-            row_clean = [str(cell).strip() if cell else '' for cell in row]
-            row_text = ' '.join(row_clean)
-            
-            # Détecter l'en-tête de segment
-            segment_match = re.search(r'Segment:\s*([A-Z]{3})', row_text)
-            if segment_match:
-                current_segment = segment_match.group(1)
-                desc_match = re.search(r'Pos\.:\s*\d+.*?([A-Z][\w\s/]+)$', row_text)
-                description = desc_match.group(1).strip() if desc_match else ""
-                
-                if current_segment not in self.segments_dict:
-                    self.segments_dict[current_segment] = {
-                        "segment": current_segment,
-                        "description": self.clean_description(description),
-                        "elements": []
-                    }
+        for kind, code, description, format_str, valeur, usage in spec.iter_rows(table):
+            # En-tête de segment
+            if kind == ROW_SEGMENT:
+                rows_parsed += 1
+                current_segment = self._open_segment(code, self.clean_description(description))
                 current_group = None
                 continue
             
-            if not current_segment:
+            if current_segment is None:
                 continue
+            rows_parsed += 1
             
-            # Extraire les colonnes
-            code = row_clean[0] if len(row_clean) > 0 else ''
-            description = row_clean[1] if len(row_clean) > 1 else ''
-            format_str = row_clean[4] if len(row_clean) > 4 else ''
-            valeur = row_clean[6] if len(row_clean) > 6 else ''
-            usage_desc = row_clean[7] if len(row_clean) > 7 else ''
-            
-            # Nettoyer
-            description = self.clean_description(description)
-            format_clean = ' '.join(format_str.split()) if format_str else ''
-            valeur_clean = valeur.strip() if valeur else ''
-            
-            # Collecter tous les usages multi-lignes
-            usage_clean = ''
-            if usage_desc:
-                usage_parts = [usage_desc.strip()]
-                next_idx = row_idx + 1
-                while next_idx < len(table):
-                    next_row = table[next_idx]
-                    if not next_row or len(next_row) < 8:
-                        break
-                    next_row_clean = [str(cell).strip() if cell else '' for cell in next_row]
-                    next_code = next_row_clean[0]
-                    next_usage = next_row_clean[7] if len(next_row_clean) > 7 else ''
-                    if next_code and (re.match(r'^\d{4}$', next_code) or re.match(r'^[SC]\d{3}$', next_code)):
-                        break
-                    if next_usage and re.match(r'^[A-Z0-9]+\s*=', next_usage.strip()):
-                        usage_parts.append(next_usage.strip())
-                        next_idx += 1
-                    else:
-                        break
-                usage_clean = '\n'.join(usage_parts) if usage_parts else ''
-            
-            # Groupe composite
-            if re.match(r'^[SC]\d{3}$', code):
-                current_group = {
-                    "groupe": code,
-                    "description": description,
-                    "champs": []
-                }
-                self.segments_dict[current_segment]["elements"].append(current_group)
+            # Groupe composite (C082, S001, etc.)
+            if kind == ROW_GROUP:
+                current_group = model.add_group(current_segment, code, clean_description(description))
             
-            # Élément de données
-            elif re.match(r'^\d{4}$', code):
-                element = {
-                    "champ": code,
-                    "description": description,
-                    "format": format_clean,
-                    "valeur": valeur_clean,
-                    "usage": usage_clean
-                }
-                if current_group:
-                    current_group["champs"].append(element)
-                else:
-                    self.segments_dict[current_segment]["elements"].append(element)
+            # Élément de données (3035, 1131, 3039, etc.) : Format | Exemple/Valeur | Usage
+            else:
+                model.add_element(current_segment, current_group, code, clean_description(description),
+                                  format_str, valeur, usage)
+                if usage:
+                    add_usage(current_segment.segment, current_group.groupe if current_group is not None else None,
+                              code, usage, page_num)
+        
+        self._count_rows(table, rows_parsed)
+    
+    def _count_rows(self, table: List[List[str]], rows_parsed: int):
+        """Compteurs de lignes retenues / ignorées d'un tableau"""
+        self.metrics.incr("rows_parsed", rows_parsed)
+        self.metrics.incr("rows_skipped", len(table) - rows_parsed)
     
     def clean_description(self, description: str) -> str:
         """Nettoie la description"""
@@ -337,144 +709,302 @@ class AdaptiveEDIExtractor:
     
     def add_standard_descriptions(self):
         """Ajoute les descriptions EDIFACT standard"""
-        print("📚 Ajout des descriptions standard...")
-        
-        standard_descriptions = {
-            "UNB": "Interchange header", "UNH": "Message header",
-            "BGM": "Beginning of message", "DTM": "Date/time/period",
-            "RFF": "Reference", "NAD": "Name and address",
-            "CTA": "Contact information", "COM": "Communication contact",
-            "TAX": "Duty/tax/fee details", "CUX": "Currencies",
-            "PAT": "Payment terms basis", "PCD": "Percentage details",
-            "MOA": "Monetary amount", "LIN": "Line item",
-            "PIA": "Additional product id", "IMD": "Item description",
-            "QTY": "Quantity", "ALI": "Additional information",
-            "GIN": "Goods identity number", "GIR": "Related identification numbers",
-            "QVR": "Quantity variances", "DOC": "Document/message details",
-            "PRI": "Price details", "APR": "Additional price information",
-            "RNG": "Range details", "LOC": "Place/location identification",
-            "TOD": "Terms of delivery or transport", "PAC": "Package",
-            "PCI": "Package identification", "ALC": "Allowance or charge",
-            "RCS": "Requirements and conditions", "UNS": "Section control",
-            "CNT": "Control total", "UNT": "Message trailer",
-            "UNZ": "Interchange trailer", "FTX": "Free text",
-            "FII": "Financial institution information", "MEA": "Measurements",
-            "PAI": "Payment instructions"
-        }
+        logger.info("📚 Ajout des descriptions standard...")
         
         for segment_code, segment_data in self.segments_dict.items():
-            if segment_data.get("description"):
-                segment_data["description"] = self.clean_description(segment_data["description"])
-            if not segment_data.get("description") or segment_data.get("description") in ["0", "1", ""]:
-                if segment_code in standard_descriptions:
-                    segment_data["description"] = standard_descriptions[segment_code]
+            self._finalize_segment(segment_code, segment_data)
         
-        print(f"   ✓ Descriptions ajoutées\n")
+        logger.info(f"   ✓ Descriptions ajoutées\n")
+    
+    def _finalize_segment(self, segment_code: str, segment: Segment):
+        """Nettoie la description d'un segment et la complète par la description standard"""
+        if segment.description:
+            segment.description = self.clean_description(segment.description)
+        if not segment.description or segment.description in ["0", "1", ""]:
+            if segment_code in STANDARD_DESCRIPTIONS:
+                segment.description = STANDARD_DESCRIPTIONS[segment_code]
     
     def get_statistics(self) -> Dict[str, int]:
-        """Calcule les statistiques"""
-        stats = {
-            "segments": len(self.segments_dict),
-            "total_elements": 0, "simple_elements": 0, "groups": 0,
-            "elements_in_groups": 0, "elements_with_format": 0,
-            "elements_with_value": 0, "elements_with_usage": 0
-        }
-        
-        for segment in self.segments_dict.values():
-            for elem in segment.get("elements", []):
-                stats["total_elements"] += 1
-                if "champ" in elem:
-                    stats["simple_elements"] += 1
-                    if elem.get("format"): stats["elements_with_format"] += 1
-                    if elem.get("valeur"): stats["elements_with_value"] += 1
-                    if elem.get("usage"): stats["elements_with_usage"] += 1
-                elif "groupe" in elem:
-                    stats["groups"] += 1
-                    for champ in elem.get("champs", []):
-                        stats["elements_in_groups"] += 1
-                        if champ.get("format"): stats["elements_with_format"] += 1
-                        if champ.get("valeur"): stats["elements_with_value"] += 1
-                        if champ.get("usage"): stats["elements_with_usage"] += 1
-        
-        return stats
-    
-    def save_to_json(self, output_path: str):
-        """Sauvegarde au format JSON"""
+        """Statistiques (tenues à jour par le modèle pendant l'extraction)"""
+        return self.model.statistics()
+    
+    def save_to_json(self, output_path: str, export_format: str = "json"):
+        """Sauvegarde les segments triés par code (JSON indenté par défaut, voir edi_export)"""
         output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        segments_list = [self.segments_dict[key] for key in sorted(self.segments_dict.keys())]
+        # Conversion segment par segment vers la forme JSON, sans construire la liste complète
+        with open_export_writer(output_file, export_format) as writer:
+            writer.ensure_open()
+            for key in sorted(self.segments_dict):
+                writer.write(self.segments_dict[key].to_dict())
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(segments_list, f, indent=4, ensure_ascii=False)
-        
-        print(f"✓ Export sauvegardé: {output_file}")
+        logger.info(f"✓ Export sauvegardé: {output_file}")
+
+
+def export_path_for(pdf_path: Path, export_format: str = "json") -> str:
+    """Chemin de l'export d'un PDF source (.json, ou .edib pour l'export binaire)"""
+    json_name = Path(pdf_path).stem.replace(" ", "_").replace("-", "_")
+    return f"export/{json_name}{EXPORT_SUFFIXES[export_format]}"
+
+
+def result_cache_key(pdf_hash: str, engine: str = "tables") -> str:
+    """Clé du cache de résultats : contenu du PDF + versions de l'extracteur (+ moteur hors tables)"""
+    version = f"{EXTRACTOR_VERSION}/{PARSER_VERSION}" + (f"/{engine}" if engine != "tables" else "")
+    return ResultCache.make_key(pdf_hash, version)
 
 
-def process_pdf(pdf_path: Path):
-    """Traite un fichier PDF avec l'extracteur adaptatif"""
-    print(f"\n{'='*70}")
-    print(f"TRAITEMENT: {pdf_path.name}")
-    print(f"{'='*70}\n")
+def restore_cached(extractor: "AdaptiveEDIExtractor", cached: Dict[str, Any]):
+    """Recharge dans l'extracteur un résultat lu dans le cache (format, segments, listes de codes)"""
+    extractor.pdf_format = cached["pdf_format"]
+    extractor.model = Guideline.from_dicts(cached["segments"])
+    if "code_lists" in cached:
+        extractor.code_lists = CodeListIndex.from_dict(cached["code_lists"])
+    else:  # entrée antérieure aux listes de codes : pages inconnues
+        extractor.code_lists = CodeListIndex.from_segments(cached["segments"])
+
+
+def store_cached(cache: Optional[ResultCache], cache_key: str, extractor: "AdaptiveEDIExtractor"):
+    """Met en cache le résultat de l'extracteur, sauf s'il est vide ou si des pages ont été ignorées"""
+    if cache is None or not extractor.segments_dict or extractor.metrics.counters.get("pages_over_budget"):
+        return
+    cache.put(cache_key, extractor.pdf_format, extractor.model.to_dicts(), extractor.code_lists.to_dict())
+
+
+def process_pdf(pdf_path: Path, jobs: int = 1, use_cache: bool = True, rebuild: bool = False,
+                store_raw: bool = False, stream: bool = False, metrics: Optional[Metrics] = None,
+                export_format: str = "json", index: bool = True, budget: Optional[Budget] = None,
+                engine: str = "tables") -> Metrics:
+    """Traite un fichier PDF avec l'extracteur adaptatif et retourne ses métriques
+    
+    stream    : extraction en flux à mémoire bornée, export écrit segment par segment
+                dans l'ordre du document (sans cache ni pages brutes)
+    export_format : json (indenté, défaut), compact ou binary (voir edi_export)
+    use_cache : lit/écrit le cache de résultats (clé = contenu du PDF + versions)
+    rebuild   : ignore une entrée existante et la remplace par une nouvelle extraction
+    store_raw : persiste texte et tableaux bruts de chaque page (voir edi_raw_store)
+    index     : réindexe l'export écrit dans l'index SQLite du corpus (voir edi_index)
+    Les listes de codes des usages sont écrites à côté de l'export (.edic, voir edi_codes).
+    budget    : limites de temps / mémoire par page et par document (voir edi_budget) ;
+                un résultat dont des pages ont été ignorées n'est pas mis en cache ;
+                la limite mémoire est celle du worker qui exécute process_pdf (voir main)
+    engine    : tables (extract_tables() sur chaque page, défaut) ou words (coordonnées
+                des mots, repli automatique, voir edi_words) ; entrées de cache distinctes
+    """
+    logger.info(f"\n{'='*70}")
+    logger.info(f"TRAITEMENT: {pdf_path.name}")
+    logger.info(f"{'='*70}\n")
     
     # Générer le nom de sortie
-    json_name = pdf_path.stem.replace(" ", "_").replace("-", "_")
-    output_json = f"export/{json_name}.json"
+    output_json = export_path_for(pdf_path, export_format)
     
-    # Extraction
-    extractor = AdaptiveEDIExtractor(str(pdf_path))
-    segments = extractor.extract_all()
+    metrics = metrics if metrics is not None else Metrics()
+    extractor = AdaptiveEDIExtractor(str(pdf_path), jobs=jobs, metrics=metrics, budget=budget, engine=engine)
+    
+    if stream:
+        with open_export_writer(output_json, export_format) as writer:
+            for segment in extractor.iter_segments():
+                writer.write(segment)
+        
+        if writer.count:
+            logger.info(f"✓ Export sauvegardé: {output_json}")
+            with metrics.stage("code_lists"):
+                write_code_lists(extractor.code_lists, output_json)
+            if index:
+                with metrics.stage("index_update"):
+                    update_index(output_json, extractor.pdf_format)
+            logger.info(f"\n✅ EXTRACTION TERMINÉE: {output_json}\n")
+        else:
+            logger.error(f"\n❌ ÉCHEC: {pdf_path.name}\n")
+        return metrics
+    
+    with metrics.stage("cache_lookup"):
+        pdf_hash = file_sha256(pdf_path) if (use_cache or store_raw) else None
+        raw_store = RawPageStore() if store_raw else None
+        # Un résultat en cache ne suffit pas si les pages brutes demandées n'existent pas encore
+        need_raw = raw_store is not None and not raw_store.exists(pdf_hash)
+        
+        cache = ResultCache() if use_cache else None
+        cache_key = None
+        cached = None
+        if cache is not None:
+            cache_key = result_cache_key(pdf_hash, engine)
+            if not rebuild and not need_raw:
+                cached = cache.get(cache_key)
+    metrics.extra["cache_hit"] = cached is not None
+    
+    if cached is not None:
+        # PDF et extracteur inchangés : réutiliser le résultat sans relire le PDF
+        logger.info("♻️  Résultat trouvé dans le cache, extraction ignorée\n")
+        restore_cached(extractor, cached)
+        segments = list(extractor.segments_dict.values())
+    elif raw_store is not None:
+        # Extraction en gardant la session ouverte pour persister les pages brutes
+        with PDFSession(pdf_path) as session:
+            extractor.session = session
+            segments = extractor.extract_all()
+            if extractor.pdf_format != UNKNOWN_FORMAT:
+                session.materialize(budget, extractor._started)
+                raw_store.save(pdf_hash, pdf_path.name, session, region_signature(extractor.pdf_format))
+        extractor.session = None
+        store_cached(cache, cache_key, extractor)
+    else:
+        # Extraction
+        segments = extractor.extract_all()
+        store_cached(cache, cache_key, extractor)
     
     if segments:
-        extractor.save_to_json(output_json)
-        print(f"\n✅ EXTRACTION TERMINÉE: {output_json}\n")
+        with metrics.stage("save_to_json"):
+            extractor.save_to_json(output_json, export_format)
+        with metrics.stage("code_lists"):
+            write_code_lists(extractor.code_lists, output_json)
+        if index:
+            with metrics.stage("index_update"):
+                update_index(output_json, extractor.pdf_format)
+        logger.info(f"\n✅ EXTRACTION TERMINÉE: {output_json}\n")
     else:
-        print(f"\n❌ ÉCHEC: {pdf_path.name}\n")
+        logger.error(f"\n❌ ÉCHEC: {pdf_path.name}\n")
+    return metrics
+
+
+def add_instrumentation_arguments(parser):
+    """Options communes de verbosité, métriques et profilage des scripts"""
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="détail par page (temps de chaque page)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="n'afficher que les avertissements et erreurs")
+    parser.add_argument("--metrics", metavar="FICHIER",
+                        help="écrire les métriques de l'exécution (JSON)")
+    parser.add_argument("--profile", metavar="FICHIER",
+                        help="profil cProfile de l'exécution (.prof)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="mesurer le pic mémoire Python (tracemalloc)")
+
+
+def add_export_arguments(parser):
+    """Options communes d'export des scripts (format, index du corpus)"""
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="json", dest="export_format",
+                        help="format d'export : json indenté (défaut), compact ou binary (.edib)")
+    parser.add_argument("--no-index", action="store_false", dest="index",
+                        help="ne pas mettre à jour l'index SQLite du corpus (edi_index)")
+
+
+def add_engine_arguments(parser):
+    """Option commune du moteur de tableaux (voir edi_words)"""
+    parser.add_argument("--engine", choices=TABLE_ENGINES, default="tables",
+                        help="tableaux : tables = extract_tables() sur chaque page (défaut), "
+                             "words = coordonnées des mots, repli sur extract_tables() si la mise en page change")
+
+
+def add_budget_arguments(parser):
+    """Options communes des budgets de temps et de mémoire (voir edi_budget)"""
+    parser.add_argument("--page-timeout", type=float, metavar="SECONDES",
+                        help="durée maximale d'analyse d'une page (page ignorée au-delà, Unix)")
+    parser.add_argument("--max-page-objects", type=int, metavar="N",
+                        help="objets de mise en page au-delà desquels une page est ignorée")
+    parser.add_argument("--doc-timeout", type=float, metavar="SECONDES",
+                        help="durée maximale d'extraction d'un document (échec au-delà)")
+    parser.add_argument("--max-memory", type=int, metavar="MO",
+                        help="mémoire maximale d'un processus d'extraction (Unix)")
+
+
+def budget_from_args(args) -> Optional[Budget]:
+    """Budget des options de la ligne de commande (None si aucune limite)"""
+    limits = (args.page_timeout, args.max_page_objects, args.doc_timeout, args.max_memory)
+    if all(limit is None for limit in limits):
+        return None
+    return Budget(page_seconds=args.page_timeout, page_objects=args.max_page_objects,
+                  document_seconds=args.doc_timeout, memory_mb=args.max_memory)
+
+
+def verbosity_from_args(args) -> int:
+    return 0 if args.quiet else 2 if args.verbose else 1
 
 
 def main():
     """Fonction principale - Extraction générique"""
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extraction EDI adaptative des PDF de 'schema/'")
+    parser.add_argument("pdf_filename", nargs="?",
+                        help="nom du PDF dans 'schema/' (sinon choix interactif)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="processus pour l'analyse des pages d'un même PDF (défaut : 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ne pas lire ni écrire le cache de résultats")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ré-extraire même si le résultat est en cache")
+    parser.add_argument("--store-raw", action="store_true",
+                        help="persister texte et tableaux bruts des pages (re-parsing sans PDF)")
+    parser.add_argument("--stream", action="store_true",
+                        help="extraction en flux à mémoire bornée (export dans l'ordre du document)")
+    add_export_arguments(parser)
+    add_engine_arguments(parser)
+    add_budget_arguments(parser)
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(verbosity_from_args(args))
+    cache_options = {"use_cache": not args.no_cache, "rebuild": args.rebuild,
+                     "store_raw": args.store_raw, "stream": args.stream,
+                     "export_format": args.export_format, "index": args.index,
+                     "budget": budget_from_args(args), "engine": args.engine}
     
-    if len(sys.argv) > 1:
-        pdf_filename = sys.argv[1]
-        pdf_path = Path("schema") / pdf_filename
+    if args.jobs < 1:
+        parser.error("--jobs doit être >= 1")
+    
+    if args.pdf_filename:
+        pdf_path = Path("schema") / args.pdf_filename
         if not pdf_path.exists():
-            print(f"❌ Fichier introuvable: {pdf_path}")
+            logger.error(f"❌ Fichier introuvable: {pdf_path}")
             return
-        process_pdf(pdf_path)
+        selected = [pdf_path]
     else:
         # Traiter tous les PDF du dossier
         schema_dir = Path("schema")
         if not schema_dir.exists():
-            print(f"❌ Dossier 'schema/' introuvable")
+            logger.error(f"❌ Dossier 'schema/' introuvable")
             return
         
         pdf_files = list(schema_dir.glob("*.pdf"))
         if not pdf_files:
-            print(f"❌ Aucun PDF dans 'schema/'")
+            logger.error(f"❌ Aucun PDF dans 'schema/'")
             return
         
-        print(f"\n{'='*70}")
-        print("FICHIERS PDF DISPONIBLES")
-        print(f"{'='*70}")
+        logger.info(f"\n{'='*70}")
+        logger.info("FICHIERS PDF DISPONIBLES")
+        logger.info(f"{'='*70}")
         for i, pdf_file in enumerate(pdf_files, 1):
-            print(f"{i}. {pdf_file.name}")
-        print(f"{'='*70}\n")
+            logger.info(f"{i}. {pdf_file.name}")
+        logger.info(f"{'='*70}\n")
         
         try:
             choice = input("Choisissez (numéro) ou Entrée pour TOUS: ").strip()
             if choice == "":
-                for pdf_file in pdf_files:
-                    process_pdf(pdf_file)
+                selected = pdf_files
             else:
                 idx = int(choice) - 1
-                if 0 <= idx < len(pdf_files):
-                    process_pdf(pdf_files[idx])
-                else:
-                    print("❌ Choix invalide")
+                if not 0 <= idx < len(pdf_files):
+                    logger.error("❌ Choix invalide")
+                    return
+                selected = [pdf_files[idx]]
         except (ValueError, KeyboardInterrupt):
-            print("\n❌ Annulé")
+            logger.info("\n❌ Annulé")
+            return
+    
+    # Limite mémoire : chaque PDF est extrait dans un worker limité, pas dans ce processus
+    memory_mb = cache_options["budget"].memory_mb if cache_options["budget"] is not None else None
+    run_metrics = Metrics()
+    documents = []
+    with profiling(run_metrics, args.profile, args.trace_memory), run_metrics.stage("total"):
+        for pdf_file in selected:
+            try:
+                metrics = run_with_memory_limit(memory_mb, process_pdf, pdf_file, jobs=args.jobs, **cache_options)
+            except (BudgetExceeded, MemoryError) as e:
+                logger.error(f"\n❌ ÉCHEC (hors budget): {pdf_file.name}: {e or 'mémoire insuffisante'}\n")
+                continue
+            documents.append({"file": pdf_file.name, **metrics.to_dict()})
+    
+    if args.metrics:
+        write_metrics(args.metrics, {**run_metrics.to_dict(), "documents": documents})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""Ancre de la zone de segments (_anchor_top, _region_bbox) : positions du texte joint → caractères"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_rows import FORMAT_SPECS
+from extract_edi_adaptive import _anchor_top, _region_bbox
+
+
+def _chars(*items):
+    """Caractères pdfplumber minimaux : (texte, haut)"""
+    return [{"text": text, "top": top} for text, top in items]
+
+
+def _line(text, top):
+    return [(letter, top) for letter in text]
+
+
+def test_cid_glyph_before_anchor_keeps_char_positions():
+    chars = _chars(("(cid:123)", 10.0), *_line("Segment:", 50.0))  # IndexError auparavant
+    assert _anchor_top(chars, FORMAT_SPECS["faurecia"].table_anchor) == 50.0
+
+
+def test_cid_digits_are_not_an_anchor():
+    chars = _chars(*_line("Page ", 5.0), ("(cid:1234)", 8.0), *_line("Intro", 20.0), *_line("S009 Message", 70.0))
+    assert _anchor_top(chars, FORMAT_SPECS["vda4932"].table_anchor) == 70.0
+
+
+def test_multi_letter_glyph_maps_to_its_char():
+    chars = _chars(("ﬁ", 12.0), ("fi", 14.0), *_line("Segment:", 30.0))
+    assert _anchor_top(chars, FORMAT_SPECS["faurecia"].table_anchor) == 30.0
+
+
+def test_no_anchor():
+    chars = _chars(("(cid:5)", 10.0), *_line("Table of contents", 20.0))
+    assert _anchor_top(chars, FORMAT_SPECS["faurecia"].table_anchor) is None
+
+
+class _Page:
+    """Page pdfplumber minimale : caractères et filets horizontaux"""
+
+    width, height = 595, 842
+
+    def __init__(self, chars, rules):
+        self.chars = chars
+        self.objects = {"line": [{"top": y, "bottom": y} for y in rules], "rect": []}
+
+
+def _vda_page_with_wrapped_header():
+    """Page de suite VDA : en-tête sur deux lignes (libellé centré) au-dessus du premier élément"""
+    chars = _chars(*_line("Guideline VDA 4932 revision 2", 40.0),
+                   *_line("Usage of", 94.0), *_line("the code", 105.0),   # libellé replié
+                   *_line("S.Format Description", 100.0),                  # libellé centré
+                   *_line("3035 Party qualifier", 129.0), *_line("an..3", 129.0))
+    return _Page(chars, rules=[90.0, 118.0, 140.0])
+
+
+def test_vda_anchor_on_wrapped_header_row():
+    page = _vda_page_with_wrapped_header()
+    spec = FORMAT_SPECS["vda4932"]
+    # Ancre sur l'en-tête, pas sur le nombre du texte courant ni sur le premier élément
+    assert _anchor_top(page.chars, spec.table_anchor) == 100.0
+    # Le filet supérieur de l'en-tête reste dans la zone (l'ancre seule moins 20 points le couperait)
+    assert _region_bbox(page, spec)[1] < 90.0
+
+
+def test_vda_code_anchor_starts_a_line():
+    spec = FORMAT_SPECS["vda4932"]
+    chars = _chars(*_line("See qualifier 3035 below", 40.0), *_line("3035 Party qualifier", 129.0))
+    assert _anchor_top(chars, spec.table_anchor) == 129.0
+    page = _Page(chars, rules=[])
+    assert _region_bbox(page, spec) == (0, 109.0, page.width, page.height)
@@ -0,0 +1,38 @@
+"""Métriques du traitement en masse : pic mémoire tracemalloc dans le fichier écrit"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import extract_all_pdfs
+
+
+def _fake_process_one(pdf_file, capture_output=False, verbosity=1, **process_options):
+    data = [bytearray(1024) for _ in range(64)]
+    return {'file': pdf_file.name, 'status': 'SUCCESS', 'duration': 0.0,
+            'metrics': {'counters': {'segments': len(data)}}}
+
+
+def test_trace_memory_peak_in_batch_metrics(tmp_path, monkeypatch):
+    (tmp_path / "schema").mkdir()
+    (tmp_path / "schema" / "guide.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(extract_all_pdfs, "_process_one", _fake_process_one)
+    
+    extract_all_pdfs.process_all_pdfs(metrics_path="metrics.json", trace_memory=True)
+    
+    data = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert data["tracemalloc_peak_bytes"] >= 64 * 1024
+    assert data["counters"] == {"segments": 64}
+
+
+def test_no_peak_without_trace_memory(tmp_path, monkeypatch):
+    (tmp_path / "schema").mkdir()
+    (tmp_path / "schema" / "guide.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(extract_all_pdfs, "_process_one", _fake_process_one)
+    
+    extract_all_pdfs.process_all_pdfs(metrics_path="metrics.json")
+    
+    assert "tracemalloc_peak_bytes" not in json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
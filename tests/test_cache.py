@@ -0,0 +1,60 @@
+"""Cache des résultats : éviction LRU, clés adressées par contenu"""
+
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+from edi_cache import ResultCache
+from extract_edi_adaptive import process_pdf
+
+SEGMENTS = [{"segment": "NAD", "description": "Name and address", "elements": [{"champ": "3035"}]}]
+
+
+def _age(cache, key, seconds):
+    mtime = time.time() - seconds
+    os.utime(cache.cache_dir / f"{key}.json", (mtime, mtime))
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10 ** 9)
+    cache.put("a", "faurecia", SEGMENTS)
+    entry_size = (tmp_path / "cache" / "a.json").stat().st_size
+    cache.max_bytes = 2 * entry_size
+
+    cache.put("b", "faurecia", SEGMENTS)
+    _age(cache, "a", 30)
+    _age(cache, "b", 20)
+    assert cache.get("a") is not None  # "a" redevient la plus récente
+
+    cache.put("c", "faurecia", SEGMENTS)
+    assert cache.get("b") is None
+    assert cache.get("a")["segments"] == SEGMENTS
+    assert cache.get("c") is not None
+    assert sorted(path.name for path in (tmp_path / "cache").iterdir()) == ["a.json", "c.json"]
+
+
+def test_renamed_identical_pdf_hits_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    guideline = synthetic.make_guideline("vda4932", 2)
+    pdf_path = synthetic.write_pdf(guideline, tmp_path / "schema" / "guide.pdf")
+
+    first = process_pdf(pdf_path, index=False)
+    assert first.extra["cache_hit"] is False
+
+    renamed = pdf_path.with_name("guide renommé.pdf")
+    shutil.move(pdf_path, renamed)
+    second = process_pdf(renamed, index=False)
+    assert second.extra["cache_hit"] is True
+    assert (tmp_path / "export" / "guide.json").read_text(encoding="utf-8") == \
+        (tmp_path / "export" / "guide_renommé.json").read_text(encoding="utf-8")
+
+    # Contenu modifié : nouvelle clé, nouvelle extraction
+    with open(renamed, "ab") as f:
+        f.write(b"\n% v2\n")
+    assert process_pdf(renamed, index=False).extra["cache_hit"] is False
@@ -0,0 +1,39 @@
+"""Listes de codes des textes d'usage (parse_usage_codes)"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_codes import parse_usage_codes
+
+
+def test_code_list_lines():
+    usage = "Document name code\n380 = Commercial Invoice\n381 = Credit note"
+    assert parse_usage_codes(usage) == [("380", "Commercial Invoice"), ("381", "Credit note")]
+
+
+def test_quoted_codes_and_trailers():
+    assert parse_usage_codes("'PCE'=Piece or\n‘ZZZ’=Contractual agreement") == [
+        ("PCE", "Piece"), ("ZZZ", "Contractual agreement")]
+
+
+def test_repeated_pattern_on_one_line():
+    assert parse_usage_codes("Codes: 9 = Original 5 = Duplicated") == [("9", "Original"), ("5", "Duplicated")]
+
+
+def test_equation_in_free_text_is_not_a_code():
+    assert parse_usage_codes("Note: if A = B then use X") == []
+
+
+def test_format_mention_is_not_a_code():
+    assert parse_usage_codes("Date in format CCYYMMDD = 102") == []
+
+
+def test_sentence_before_code_list():
+    usage = "Response type, coded\nIn Germany, only the state 'AP'=accepted is used.\n'AP'=Accepted"
+    assert parse_usage_codes(usage) == [("AP", "Accepted")]
+
+
+def test_free_text_line_inside_code_list():
+    usage = "1 = First\nNote: if A = B then use X\n2 = Second"
+    assert parse_usage_codes(usage) == [("1", "First"), ("2", "Second")]
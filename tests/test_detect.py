@@ -0,0 +1,88 @@
+"""Détection du format (edi_detect) : texte brut PyPDF2, repli sur la mise en page, format inconnu"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+import edi_detect
+import extract_all_pdfs
+from edi_detect import METHOD_LAYOUT, METHOD_NONE, METHOD_SNIFF, MIN_CONFIDENCE, UNKNOWN_FORMAT, detect_format
+from extract_edi_adaptive import PDFSession
+
+
+class FakeSession:
+    """Session avec le texte de mise en page fourni (le PDF n'est lu que par PyPDF2)"""
+
+    has_layout = True
+
+    def __init__(self, pdf_path, pages):
+        self.pdf_path = Path(pdf_path)
+        self._pages = pages
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def page_text(self, index):
+        return self._pages[index]
+
+
+def _pdf(tmp_path, fmt, spec_pages=2, filler_pages=0):
+    guideline = synthetic.make_guideline(fmt, spec_pages, filler_pages, seed=5)
+    return synthetic.write_pdf(guideline, tmp_path / "schema" / f"{fmt}.pdf")
+
+
+@pytest.mark.parametrize("fmt", synthetic.FORMATS)
+def test_clear_win_from_sniffed_text(tmp_path, fmt):
+    with PDFSession(_pdf(tmp_path, fmt, filler_pages=1)) as session:
+        detection = detect_format(session)
+    assert (detection["format"], detection["method"]) == (fmt, METHOD_SNIFF)
+    assert detection["confidence"] >= MIN_CONFIDENCE
+
+
+def test_ambiguous_scores_fall_back_to_layout_text(tmp_path, monkeypatch):
+    # Texte brut qui note les deux formats à égalité : confiance nulle
+    ambiguous = "Segment: NAD Cons. No.: 1 Level: 1\nSegment: UNB Pos.: 1 Level: 0"
+    monkeypatch.setattr(edi_detect, "_sniff_texts", lambda pdf_path: iter([ambiguous] * 3))
+    with PDFSession(_pdf(tmp_path, "vda4932")) as session:
+        detection = detect_format(session)
+    assert (detection["format"], detection["method"]) == ("vda4932", METHOD_LAYOUT)
+    assert detection["confidence"] >= MIN_CONFIDENCE
+
+
+def test_unreadable_by_pypdf2_uses_layout_text(tmp_path):
+    pdf_path = tmp_path / "broken.pdf"
+    pdf_path.write_bytes(b"not a pdf")
+    session = FakeSession(pdf_path, ["Table of contents", "Segment: NAD Cons. No.: 14 Level: 1 Name and address"])
+    detection = detect_format(session)
+    assert (detection["format"], detection["method"]) == ("vda4932", METHOD_LAYOUT)
+    assert detection["pages_read"] == 2
+
+
+def test_no_pattern_is_unknown(tmp_path):
+    pdf_path = tmp_path / "broken.pdf"
+    pdf_path.write_bytes(b"not a pdf")
+    detection = detect_format(FakeSession(pdf_path, ["Table of contents", "Change history"]))
+    assert (detection["format"], detection["method"], detection["confidence"]) == (UNKNOWN_FORMAT, METHOD_NONE, 0.0)
+
+
+def test_unknown_format_listed_in_batch_summary(tmp_path, monkeypatch, capsys):
+    _pdf(tmp_path, "vda4932")
+    _pdf(tmp_path, "faurecia", spec_pages=0, filler_pages=2)  # aucun segment : format non reconnu
+    monkeypatch.chdir(tmp_path)
+
+    results = extract_all_pdfs.process_all_pdfs(use_cache=False, index=False)
+
+    formats = {result["file"]: result["metrics"]["format_detection"]["format"] for result in results}
+    assert formats == {"vda4932.pdf": "vda4932", "faurecia.pdf": UNKNOWN_FORMAT}
+    assert not (tmp_path / "export" / "faurecia.json").exists()
+    summary = capsys.readouterr().out.split("RÉSUMÉ DU TRAITEMENT EN MASSE")[1]
+    assert "FORMATS INCONNUS" in summary
+    assert "❌ faurecia.pdf: aucun format reconnu" in summary
+    assert "✅ faurecia.pdf" not in summary
+    assert "TRAITEMENT TERMINÉ: 1/2 fichiers extraits" in summary
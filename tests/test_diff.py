@@ -0,0 +1,63 @@
+"""Différences structurelles entre deux guides (edi_diff)"""
+
+import copy
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_diff import diff_guidelines
+
+OLD = [
+    {"segment": "BGM", "description": "Beginning of message", "elements": [
+        {"champ": "1001", "format": "C an..3", "usage": "380 = Commercial invoice"},
+        {"champ": "1004", "format": "M an..35"},
+    ]},
+    {"segment": "NAD", "description": "Name and address", "elements": [
+        {"champ": "3035", "format": "M an..3"},
+        {"groupe": "C082", "description": "Party identification details",
+         "champs": [{"champ": "3039", "format": "M an..35"}, {"champ": "1131", "format": "C an..17"}]},
+    ]},
+]
+
+
+def _changes(result):
+    return sorted((change["path"], change["change"]) for change in result["changes"])
+
+
+def test_identical_guides():
+    result = diff_guidelines(OLD, copy.deepcopy(OLD))
+    assert result["identical"]
+    assert result["changes"] == []
+    assert set(result["summary"].values()) == {0}
+
+
+def test_segment_order_is_not_significant():
+    assert diff_guidelines(OLD, list(reversed(OLD)))["identical"]
+
+
+def test_added_removed_and_modified_elements():
+    new = copy.deepcopy(OLD)
+    new[0]["elements"][0]["format"] = "M an..3"                          # modifié
+    new[1]["elements"][1]["champs"].pop()                                # supprimé
+    new[1]["elements"].append({"champ": "3164", "format": "C an..35"})   # ajouté
+    new.append({"segment": "DTM", "elements": [{"champ": "2005"}]})      # segment ajouté
+
+    result = diff_guidelines(OLD, new)
+    assert not result["identical"]
+    assert _changes(result) == [
+        ("BGM/1001", "modified"),
+        ("DTM", "added"),
+        ("NAD/3164", "added"),
+        ("NAD/C082/1131", "removed"),
+    ]
+    modified = next(change for change in result["changes"] if change["change"] == "modified")
+    assert modified["fields"] == {"format": {"old": "C an..3", "new": "M an..3"}}
+    assert result["summary"] == {"added": 2, "removed": 1, "modified": 1, "reordered": 0}
+
+
+def test_repeated_codes_and_reordering():
+    new = copy.deepcopy(OLD)
+    elements = new[1]["elements"]
+    elements.append({"champ": "3035", "format": "C an..3"})
+    elements[0], elements[1] = elements[1], elements[0]
+    assert _changes(diff_guidelines(OLD, new)) == [("NAD", "reordered"), ("NAD/3035#1", "added")]
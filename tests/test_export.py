@@ -0,0 +1,107 @@
+"""Writers et relecture des exports (edi_export)"""
+
+import json
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import edi_export
+from edi_export import BinaryStreamWriter, JSONStreamWriter, iter_binary, load_segments
+
+SEGMENTS = [
+    {
+        "segment": "NAD",
+        "description": "Nom et adresse – “acheteur”\nligne 2",
+        "elements": [
+            {"champ": "3035", "format": "M an..3", "valeur": "+BY", "usage": "BY = Buyer"},
+            {"groupe": "C082", "description": "Party identification details",
+             "champs": [{"champ": "3039", "format": "M an..35"}, {"champ": "1131", "format": "C an..17"}]},
+            {"groupe": "C058", "champs": []},
+        ],
+        "attributs": {},
+        "niveau": 2,
+    },
+    {"segment": "UNT", "elements": []},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if edi_export.orjson is None:
+            pytest.skip("orjson non installé")
+    else:
+        monkeypatch.setattr(edi_export, "orjson", None)
+    return request.param
+
+
+def _write_json(path, segments, compact=False):
+    with JSONStreamWriter(path, compact=compact) as writer:
+        for segment in segments:
+            writer.write(segment)
+    return writer
+
+
+def test_json_writer_matches_json_dumps(tmp_path, backend):
+    output = tmp_path / "guide.json"
+    writer = _write_json(output, SEGMENTS)
+    assert writer.count == len(SEGMENTS)
+    assert output.read_text(encoding="utf-8") == json.dumps(SEGMENTS, indent=4, ensure_ascii=False)
+    assert load_segments(output) == SEGMENTS
+
+
+def test_compact_writer_round_trip(tmp_path, backend):
+    output = tmp_path / "guide.json"
+    _write_json(output, SEGMENTS, compact=True)
+    assert output.read_text(encoding="utf-8") == json.dumps(SEGMENTS, ensure_ascii=False, separators=(',', ':'))
+    assert load_segments(output) == SEGMENTS
+
+
+def test_binary_writer_round_trip(tmp_path, backend):
+    output = tmp_path / "guide.edib"
+    with BinaryStreamWriter(output) as writer:
+        for segment in SEGMENTS:
+            writer.write(segment)
+    assert list(iter_binary(output)) == SEGMENTS
+    assert load_segments(output) == SEGMENTS
+
+
+def _binary(tmp_path, cut):
+    output = tmp_path / "guide.edib"
+    with BinaryStreamWriter(output) as writer:
+        writer.write(SEGMENTS[0])
+    data = output.read_bytes()
+    output.write_bytes(data[:cut(data)])
+    return output
+
+
+def test_truncated_length_prefix(tmp_path):
+    output = _binary(tmp_path, lambda data: len(data))
+    with open(output, "ab") as f:
+        f.write(struct.pack(">I", 10)[:2])
+    with pytest.raises(ValueError, match="tronqué"):
+        list(iter_binary(output))
+
+
+def test_truncated_payload(tmp_path):
+    output = _binary(tmp_path, lambda data: len(data) - 1)
+    with pytest.raises(ValueError, match="tronqué"):
+        list(iter_binary(output))
+
+
+def test_no_file_when_nothing_written(tmp_path):
+    for writer in (JSONStreamWriter(tmp_path / "guide.json"), BinaryStreamWriter(tmp_path / "guide.edib")):
+        with writer:
+            pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_no_file_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with JSONStreamWriter(tmp_path / "guide.json") as writer:
+            writer.write(SEGMENTS[0])
+            raise RuntimeError("interrompu")
+    assert list(tmp_path.iterdir()) == []
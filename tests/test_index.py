@@ -0,0 +1,70 @@
+"""Index SQLite du corpus : occurrences de groupes, identité des documents"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_export import BinaryStreamWriter
+from edi_index import CorpusIndex
+
+NAD = {
+    "segment": "NAD",
+    "description": "Name and address",
+    "elements": [
+        {"champ": "3035", "description": "Party qualifier"},
+        {"groupe": "C082", "description": "Party identification details",
+         "champs": [{"champ": "3039"}, {"champ": "1131"}, {"champ": "3055"}]},
+        {"groupe": "C082", "description": "Party identification details",
+         "champs": [{"champ": "3039"}]},
+    ],
+}
+
+
+def _export(tmp_path):
+    export_path = tmp_path / "export" / "guide.json"
+    export_path.parent.mkdir()
+    export_path.write_text(json.dumps([NAD]), encoding="utf-8")
+    return export_path
+
+
+def test_repeated_group_counts_its_own_elements(tmp_path):
+    with CorpusIndex(tmp_path / "corpus.sqlite") as index:
+        index.index_export(_export(tmp_path))
+        groups = index.find_groups("C082", "NAD")
+    assert [group["champs"] for group in groups] == [3, 1]
+
+
+def test_relative_and_absolute_paths_are_one_document(tmp_path, monkeypatch):
+    export_path = _export(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    with CorpusIndex(tmp_path / "corpus.sqlite") as index:
+        index.index_export(export_path)
+        index.index_export(Path("export") / "guide.json")
+        assert len(index.documents()) == 1
+        assert index.sync("export") == {"indexed": 0, "unchanged": 1, "removed": 0}
+        os.remove(export_path)
+        assert index.sync(tmp_path / "export")["removed"] == 1
+        assert index.documents() == []
+
+
+def test_json_and_binary_exports_are_one_document(tmp_path):
+    export_path = _export(tmp_path)
+    binary_path = export_path.with_suffix(".edib")
+    with BinaryStreamWriter(binary_path) as writer:
+        writer.write(NAD)
+    mtime = export_path.stat().st_mtime
+    os.utime(binary_path, (mtime + 10, mtime + 10))
+
+    with CorpusIndex(tmp_path / "corpus.sqlite") as index:
+        assert index.sync(tmp_path / "export") == {"indexed": 1, "unchanged": 0, "removed": 0}
+        assert [document["path"] for document in index.documents()] == [str(binary_path.resolve())]
+        assert len(index.find_groups("C082", "NAD")) == 2
+
+        # Export JSON réécrit puis indexé (process_pdf) : il remplace le .edib dans l'index
+        os.utime(export_path, (mtime + 20, mtime + 20))
+        index.index_export(export_path, "faurecia")
+        assert [document["path"] for document in index.documents()] == [str(export_path.resolve())]
+        assert len(index.find_groups("C082", "NAD")) == 2
+        assert index.sync(tmp_path / "export") == {"indexed": 0, "unchanged": 1, "removed": 0}
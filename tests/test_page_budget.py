@@ -0,0 +1,107 @@
+"""Budget par page : une page interrompue n'ajoute rien au modèle"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pdfplumber
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+from edi_budget import Budget, PageBudgetExceeded
+from extract_edi_adaptive import AdaptiveEDIExtractor, _page_object_count, process_pdf
+
+VDA_PAGE = "Segment: NAD Cons. No.: 14 Level: 1 Name and address\n3035 Party qualifier"
+VDA_TABLE = [["CODE Description", "Format", "Valeur", "Usage"],
+             ["3035 Party qualifier", "an..3", "BY", "Buyer"], ["3039 Party id", "an..35", "", ""]]
+
+
+class FakeSession:
+    """Session minimale : texte et tableaux en mémoire, tableaux interrompus pour les pages `slow`"""
+
+    has_layout = True
+
+    def __init__(self, pages, slow=()):
+        self.pages = pages
+        self.slow = set(slow)
+        self.over_budget = {}
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def page_text(self, index):
+        return self.pages[index]
+
+    def check_page_budget(self, index, budget):
+        pass
+
+    def page_region_tables(self, index, pdf_format, engine=None):
+        if index in self.slow:
+            raise PageBudgetExceeded(f"page {index + 1}: analyse interrompue")
+        return [VDA_TABLE]
+
+    def mark_over_budget(self, index, reason):
+        self.over_budget[index] = reason
+
+    def release_page(self, index):
+        pass
+
+
+def _extract(session):
+    extractor = AdaptiveEDIExtractor("fake.pdf", session=session, budget=Budget(page_seconds=60))
+    extractor.pdf_format = "vda4932"
+    extractor.extract_format()
+    return extractor
+
+
+def test_interrupted_page_leaves_no_segment():
+    extractor = _extract(FakeSession([VDA_PAGE], slow={0}))
+    assert extractor.segments_dict == {}
+    assert extractor.metrics.counters["pages_over_budget"] == 1
+
+
+def test_interrupted_page_does_not_extend_previous_segment():
+    pages = [VDA_PAGE, VDA_PAGE.replace("NAD", "LOC")]
+    extractor = _extract(FakeSession(pages, slow={1}))
+    assert list(extractor.segments_dict) == ["NAD"]
+    assert extractor.get_statistics()["simple_elements"] == 2
+
+
+def test_pages_within_budget_are_merged():
+    extractor = _extract(FakeSession([VDA_PAGE, VDA_PAGE.replace("NAD", "LOC")]))
+    assert list(extractor.segments_dict) == ["NAD", "LOC"]
+    assert extractor.get_statistics()["simple_elements"] == 4
+
+
+def test_store_raw_does_not_reanalyse_over_budget_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    guideline = synthetic.make_guideline("vda4932", 4, seed=3)
+    pdf_path = synthetic.write_pdf(guideline, tmp_path / "schema" / "guide.pdf")
+    with pdfplumber.open(pdf_path) as pdf:
+        counts = [_page_object_count(page) for page in pdf.pages]
+    heaviest = counts.index(max(counts))
+
+    analysed = []
+    extract_tables = pdfplumber.page.Page.extract_tables
+    def recording_extract_tables(page, *args, **kwargs):
+        analysed.append(page.page_number - 1)
+        return extract_tables(page, *args, **kwargs)
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_tables", recording_extract_tables)
+
+    metrics = process_pdf(pdf_path, use_cache=False, store_raw=True, index=False,
+                          budget=Budget(page_objects=max(counts) - 1))
+    assert metrics.counters["pages_over_budget"] == 1
+    assert heaviest not in analysed
+    assert len(analysed) == len(set(analysed))  # tableaux persistés = tableaux parsés, sans seconde analyse
+
+    (raw_path,) = (tmp_path / ".edi_cache" / "raw").glob("*.json.gz")
+    with gzip.open(raw_path, "rt", encoding="utf-8") as f:
+        pages = json.load(f)["pages"]
+    assert "region_tables" not in pages[heaviest]
+    assert "objets de mise en page" in pages[heaviest]["over_budget"]
+    assert all("over_budget" not in page and page["region_tables"]
+               for index, page in enumerate(pages) if index != heaviest)
@@ -0,0 +1,62 @@
+"""Analyse parallèle des pages (prefetch_parallel) : même export qu'en série, pages hors budget conservées"""
+
+import sys
+from pathlib import Path
+
+import pdfplumber
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+from edi_budget import Budget, PageBudgetExceeded
+from extract_edi_adaptive import PDFSession, _page_object_count, process_pdf
+
+
+def _pdf(tmp_path, fmt):
+    guideline = synthetic.make_guideline(fmt, 6, filler_pages=2, seed=11)
+    return synthetic.write_pdf(guideline, tmp_path / "schema" / f"{fmt}.pdf")
+
+
+def _heaviest_page(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        counts = [_page_object_count(page) for page in pdf.pages]
+    return counts.index(max(counts)), Budget(page_objects=max(counts) - 1)
+
+
+def _export(pdf_path, jobs, budget=None):
+    metrics = process_pdf(pdf_path, jobs=jobs, use_cache=False, index=False, budget=budget)
+    return (Path("export") / f"{pdf_path.stem}.json").read_bytes(), metrics
+
+
+@pytest.mark.parametrize("fmt", synthetic.FORMATS)
+def test_parallel_export_matches_serial(tmp_path, monkeypatch, fmt):
+    monkeypatch.chdir(tmp_path)
+    pdf_path = _pdf(tmp_path, fmt)
+    serial, _ = _export(pdf_path, jobs=1)
+    parallel, metrics = _export(pdf_path, jobs=2)
+    assert parallel == serial
+    assert "page_prefetch" in metrics.to_dict()["stages"]
+
+
+def test_parallel_over_budget_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pdf_path = _pdf(tmp_path, "vda4932")
+    _, budget = _heaviest_page(pdf_path)
+    serial, serial_metrics = _export(pdf_path, jobs=1, budget=budget)
+    parallel, parallel_metrics = _export(pdf_path, jobs=2, budget=budget)
+    assert parallel == serial
+    assert parallel_metrics.counters["pages_over_budget"] == serial_metrics.counters["pages_over_budget"] == 1
+
+
+def test_shard_over_budget_marks_carry_over(tmp_path):
+    pdf_path = _pdf(tmp_path, "vda4932")
+    heaviest, budget = _heaviest_page(pdf_path)
+    with PDFSession(pdf_path) as session:
+        session.prefetch_parallel(2, pdf_format="vda4932", budget=budget)
+        # Page marquée par son processus (budget sans limite : seule la marque peut lever)
+        with pytest.raises(PageBudgetExceeded, match="objets de mise en page"):
+            session.check_page_budget(heaviest, Budget())
+        assert "region_tables" not in session.raw_page(heaviest)
+        assert "over_budget" in session.raw_page(heaviest)
@@ -0,0 +1,60 @@
+"""Re-parsing depuis la couche brute : exports réécrits et réindexés"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+from edi_index import CorpusIndex, DEFAULT_INDEX_PATH
+from edi_raw_store import RawPageStore, StoredSession, reparse_all
+
+
+def _store(tmp_path):
+    guideline = synthetic.make_guideline("vda4932", 3)
+    store = RawPageStore(tmp_path / "raw")
+    store.save("0" * 64, "guide.pdf", StoredSession("guide.pdf", synthetic.raw_pages(guideline)))
+    return store, guideline
+
+
+def test_reparse_updates_corpus_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store, guideline = _store(tmp_path)
+    results = reparse_all(store)
+    assert [result["export"] for result in results] == ["export/guide.json"]
+
+    with CorpusIndex(DEFAULT_INDEX_PATH) as index:
+        documents = index.documents()
+        assert [(document["document"], document["pdf_format"]) for document in documents] == [("guide", "vda4932")]
+        assert documents[0]["segments"] == results[0]["segments"] == len(guideline["segments"])
+        assert index.sync("export") == {"indexed": 0, "unchanged": 1, "removed": 0}
+
+
+def test_reparse_without_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store, _ = _store(tmp_path)
+    reparse_all(store, index=False)
+    assert (tmp_path / "export" / "guide.json").exists()
+    assert not DEFAULT_INDEX_PATH.exists()
+
+
+def test_reparse_uses_parsed_region_tables(tmp_path, monkeypatch):
+    from extract_edi_adaptive import process_pdf
+
+    monkeypatch.chdir(tmp_path)
+    guideline = synthetic.make_guideline("faurecia", 3, filler_pages=1, seed=2)
+    pdf_path = synthetic.write_pdf(guideline, tmp_path / "schema" / "guide.pdf")
+    process_pdf(pdf_path, use_cache=False, store_raw=True, index=False)
+    exported = (tmp_path / "export" / "guide.json").read_bytes()
+
+    (result,) = reparse_all(RawPageStore(tmp_path / ".edi_cache" / "raw"), index=False)
+    assert result["fallback_pages"] == 0
+    assert (tmp_path / "export" / "guide.json").read_bytes() == exported
+
+
+def test_reparse_counts_full_page_fallback(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store, guideline = _store(tmp_path)  # fixture sans signature : tableaux pleine page seulement
+    (result,) = reparse_all(store, index=False)
+    assert result["fallback_pages"] == len(guideline["segments"])
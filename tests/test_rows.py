@@ -0,0 +1,104 @@
+"""Boucle compilée des specs (edi_rows) : lignes d'en-tête, suites d'usage, en-têtes de segment"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_raw_store import StoredSession
+from edi_rows import FAURECIA_SPEC, ROW_ELEMENT, ROW_GROUP, ROW_SEGMENT, VDA4932_SPEC
+from extract_edi_adaptive import AdaptiveEDIExtractor
+
+VDA_TITLE = "Segment: NAD Cons. No.: 14 Level: 1 Name and address"
+VDA_TABLE = [
+    ["S.Format Description", "Format", "Example", "Usage"],
+    ["Segment can/must be repeated 5 times", None, None, None],
+    ["3035 Party qualifier", "M an..3", "+BY", "'BY'= Buyer"],
+    ["", "", "", "'SE'= Seller"],
+    ["", "", "", "'SU'= Supplier"],
+    ["C082 Party identification details", "M", "", "--"],
+    ["3039 Party id", "M an..35", "12345", "--"],
+    ["1131 Code list qualifier", "C an..17", "", "'160'= Party identification"],
+]
+VDA_NEXT_PAGE = [  # page de suite, sans titre "Segment:"
+    ["3124 Name and address line", "C an..35", "", ""],
+    ["3036 Party name", "C an..35", "", ""],
+    ["3042 Street", "C an..35", "", ""],
+]
+
+FAURECIA_TABLE = [
+    ["3035", "Party qualifier", "M", "1", "M an..3", "", "+ZZ", "ZZ = Before any segment"],
+    ["", "Segment: NAD", "", "", "", "", "Pos.: 14 Level: 1", "Name and address"],
+    ["Tag", "Name", "S", "R", "Repr.", "", "Value", "Usage"],
+    ["3035", "Party qualifier", "M", "1", "M  an..3", "", "+BY", "BY = Buyer"],
+    ["", "", "", "", "", "", "", "SE = Seller"],
+    ["C082", "Party identification details", "M", "1", "", "", "", ""],
+    ["3039", "Party id", "M", "1", "M an..35", "", "", "--"],
+    ["", "Segment: LOC", "", "", "", "", "Pos.: 15 Level: 1", "Place location"],
+    ["3227", "Location qualifier", "M", "1", "M an..3", "", "+5", "5 = Place of departure"],
+]
+
+
+def test_vda_rows():
+    assert list(VDA4932_SPEC.iter_rows(VDA_TABLE)) == [
+        # En-tête de colonnes et mention "Segment can/must" ignorés ; suites d'usage rattachées
+        (ROW_ELEMENT, "3035", "Party qualifier", "M an..3", "+BY", "'BY'= Buyer\n'SE'= Seller\n'SU'= Supplier"),
+        (ROW_GROUP, "C082", "Party identification details", "", "", ""),
+        # Usage "--" vide de sens
+        (ROW_ELEMENT, "3039", "Party id", "M an..35", "12345", ""),
+        (ROW_ELEMENT, "1131", "Code list qualifier", "C an..17", "", "'160'= Party identification"),
+    ]
+
+
+def test_faurecia_rows():
+    assert list(FAURECIA_SPEC.iter_rows(FAURECIA_TABLE)) == [
+        (ROW_ELEMENT, "3035", "Party qualifier", "M an..3", "+ZZ", "ZZ = Before any segment"),
+        (ROW_SEGMENT, "NAD", "Name and address", "", "", ""),
+        # Ligne "Tag | Name | ..." ignorée, format normalisé, suite d'usage rattachée
+        (ROW_ELEMENT, "3035", "Party qualifier", "M an..3", "+BY", "BY = Buyer\nSE = Seller"),
+        (ROW_GROUP, "C082", "Party identification details", "", "", ""),
+        # Pas d'usage ignoré chez Faurecia
+        (ROW_ELEMENT, "3039", "Party id", "M an..35", "", "--"),
+        (ROW_SEGMENT, "LOC", "Place location", "", "", ""),
+        (ROW_ELEMENT, "3227", "Location qualifier", "M an..3", "+5", "5 = Place of departure"),
+    ]
+
+
+def test_continuation_stops_at_next_code():
+    table = [
+        ["3035", "Party qualifier", "M", "1", "M an..3", "", "", "BY = Buyer"],
+        ["3036", "Party name", "C", "1", "C an..35", "", "", "SE = Seller"],  # élément suivant, pas une suite
+    ]
+    usages = [row[5] for row in FAURECIA_SPEC.iter_rows(table)]
+    assert usages == ["BY = Buyer", "SE = Seller"]
+
+
+def _extract(pdf_format, pages):
+    session = StoredSession("guide.pdf", [{"text": text, "tables": [table]} for text, table in pages])
+    extractor = AdaptiveEDIExtractor("guide.pdf", session=session)
+    extractor.pdf_format = pdf_format
+    extractor.extract_format()
+    return extractor
+
+
+def test_vda_segments_from_page_text():
+    assert not VDA4932_SPEC.segments_in_tables
+    # Sans titre "Segment:" sur la page, le tableau complète le dernier segment ouvert
+    extractor = _extract("vda4932", [(VDA_TITLE, VDA_TABLE), ("3124 Name and address line", VDA_NEXT_PAGE)])
+    assert list(extractor.segments_dict) == ["NAD"]
+    assert extractor.segments_dict["NAD"].description == "Name and address"
+    stats = extractor.get_statistics()
+    assert (stats["simple_elements"], stats["groups"], stats["elements_in_groups"]) == (4, 1, 2)
+
+
+def test_vda_table_without_open_segment_is_ignored():
+    extractor = _extract("vda4932", [("3035 Party qualifier", VDA_TABLE)])
+    assert extractor.segments_dict == {}
+
+
+def test_faurecia_segments_from_table_rows():
+    assert FAURECIA_SPEC.segments_in_tables
+    extractor = _extract("faurecia", [("Segment: NAD Pos.: 14", FAURECIA_TABLE)])
+    # La ligne qui précède le premier en-tête n'est rattachée à aucun segment
+    assert list(extractor.segments_dict) == ["NAD", "LOC"]
+    stats = extractor.get_statistics()
+    assert (stats["simple_elements"], stats["groups"], stats["elements_in_groups"]) == (2, 1, 1)
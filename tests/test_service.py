@@ -0,0 +1,107 @@
+"""Service d'extraction : /health, /extract (chemin et contenu), worker tué, repli du client"""
+
+import os
+import socket
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import edi_service
+from edi_service import ExtractionClient, ExtractionService, _RequestHandler
+
+CRASH = b"%PDF-crash"
+
+
+def fake_extract_document(pdf_path, source_name=None, use_cache=True):
+    """Worker factice : segments fixes, processus tué pour un PDF "crash" """
+    data = Path(pdf_path).read_bytes()
+    if data == CRASH:
+        os._exit(1)
+    return {"source": source_name or Path(pdf_path).name, "pdf_format": "vda4932",
+            "segments": [{"segment": "NAD", "elements": []}], "statistics": {"bytes": len(data)},
+            "cache_hit": False}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(edi_service, "extract_document", fake_extract_document)
+    service = ExtractionService(jobs=1, use_cache=False)
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield service, f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        service.shutdown()
+
+
+def _pdf(tmp_path, name, data=b"%PDF-1.4 fake"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_health(server):
+    service, url = server
+    health = ExtractionClient(url).health()
+    assert health["status"] == "ok"
+    assert {key: health[key] for key in ("workers", "queue_depth", "in_progress", "processed", "failed", "restarts")} == {
+        "workers": 1, "queue_depth": 0, "in_progress": 0, "processed": 0, "failed": 0, "restarts": 0}
+
+
+def test_extract_by_path_and_upload(server, tmp_path):
+    service, url = server
+    client = ExtractionClient(url, fallback=False)
+    pdf_path = _pdf(tmp_path, "guide.pdf")
+
+    by_path = client.extract(pdf_path)
+    assert by_path["served_by"] == "service"
+    assert by_path["source"] == "guide.pdf"
+    assert by_path["segments"] == [{"segment": "NAD", "elements": []}]
+
+    uploaded = client.extract(pdf_path, upload=True)
+    assert uploaded["served_by"] == "service"
+    assert uploaded["source"] == "guide.pdf"
+    assert uploaded["statistics"] == {"bytes": pdf_path.stat().st_size}
+    assert service.health()["processed"] == 2
+
+
+def test_missing_file_is_an_error_without_fallback(server, tmp_path):
+    _, url = server
+    with pytest.raises(RuntimeError, match="introuvable"):
+        ExtractionClient(url).extract(tmp_path / "absent.pdf")
+
+
+def test_killed_worker_restarts_pool(server, tmp_path):
+    service, url = server
+    client = ExtractionClient(url)
+    with pytest.raises(RuntimeError, match="arrêté brutalement"):
+        client.extract(_pdf(tmp_path, "crash.pdf", CRASH))
+    health = client.health()
+    assert (health["status"], health["failed"], health["restarts"]) == ("degraded", 1, 0)
+
+    assert client.extract(_pdf(tmp_path, "guide.pdf"))["served_by"] == "service"
+    health = client.health()
+    assert (health["status"], health["processed"], health["restarts"]) == ("ok", 1, 1)
+
+
+def test_client_falls_back_to_local_extraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(edi_service, "extract_document", fake_extract_document)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = ExtractionClient(f"http://127.0.0.1:{port}")
+    assert client.health() is None
+    result = client.extract(_pdf(tmp_path, "guide.pdf"))
+    assert result["served_by"] == "local"
+    assert result["source"] == "guide.pdf"
+
+    with pytest.raises(OSError):
+        ExtractionClient(f"http://127.0.0.1:{port}", fallback=False).extract(tmp_path / "guide.pdf")
@@ -0,0 +1,72 @@
+"""Table des chemins d'un guide : mêmes recherches en mémoire et par mmap (.edis)"""
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_spec import GuidelineSpec, MappedSpec, load_spec, spec_path_for, _SpecLookup
+
+SEGMENTS = [
+    {"segment": "UNH", "description": "Message header", "elements": [
+        {"champ": "0062", "description": "Message reference number", "format": "M an..14"},
+        {"groupe": "S009", "description": "Message identifier",
+         "champs": [{"champ": "0065", "format": "M an..6", "valeur": "INVOIC"}, {"champ": "0052"}]},
+    ]},
+    {"segment": "NAD", "description": "Name and address – “partie”", "elements": [
+        {"champ": "3035", "valeur": "+BY", "usage": "BY = Buyer"},
+        {"groupe": "C082", "champs": [{"champ": "3039"}, {"champ": "3055"}]},
+        {"champ": "3035", "valeur": "+SE", "usage": "SE = Seller"},
+        {"groupe": "C082", "champs": [{"champ": "3039"}]},
+    ]},
+]
+
+KEYS = ["UNH", "UNH/0062", "UNH/S009", "UNH/S009/0065", "UNH/S009/0052", "NAD", "NAD/3035",
+        "NAD/C082", "NAD/C082/3039", "NAD/C082/3055", "*/3035", "*/3039", "*/0052",
+        "BGM", "NAD/9999", "UNH/S009/9999", ""]
+
+
+@pytest.fixture
+def specs(tmp_path):
+    export_path = tmp_path / "guide.json"
+    export_path.write_text(json.dumps(SEGMENTS, ensure_ascii=False), encoding="utf-8")
+    memory = GuidelineSpec.from_export(export_path)
+    memory.write(spec_path_for(export_path))
+    with load_spec(spec_path_for(export_path)) as mapped:
+        yield memory, mapped
+
+
+def test_mapped_and_memory_lookups_are_identical(specs):
+    memory, mapped = specs
+    assert isinstance(mapped, MappedSpec)
+    assert len(mapped) == len(memory.table)
+    for key in KEYS:
+        assert mapped.resolve_all(key) == memory.resolve_all(key), key
+        assert mapped.resolve(key) == memory.resolve(key), key
+        assert (key in mapped) == (key in memory), key
+    for key in memory.table:
+        assert mapped.entries(key) == memory.entries(key), key
+
+
+def test_lookup_helpers(specs):
+    for spec in specs:
+        assert spec.element("UNH", "0065", group="S009")["valeur"] == "INVOIC"
+        assert [entry["valeur"] for entry in spec.find_element("3035")] == ["+BY", "+SE"]
+        assert [entry["champs"] for entry in spec.resolve_all("NAD/C082")] == [["3039", "3055"], ["3039"]]
+        with pytest.raises(KeyError):
+            spec["NAD/9999"]
+
+
+def test_mapped_spec_pickles_by_path(specs):
+    memory, mapped = specs
+    copy = pickle.loads(pickle.dumps(mapped))
+    assert copy.resolve_all("*/3039") == memory.resolve_all("*/3039")
+    copy.close()
+
+
+def test_spec_lookup_is_abstract():
+    with pytest.raises(TypeError):
+        _SpecLookup()
@@ -0,0 +1,96 @@
+"""Validation de messages EDIFACT contre un guide compilé (edi_validate)"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from edi_codes import CodeListIndex
+from edi_validate import (
+    MessageValidator, ERROR_CODE, ERROR_LENGTH, ERROR_MISSING, ERROR_SEGMENT_COUNT
+)
+
+GUIDE = [
+    {"segment": "UNH", "elements": [
+        {"champ": "0062", "format": "M an..14"},
+        {"groupe": "S009", "champs": [{"champ": "0065", "format": "M an..6"},
+                                      {"champ": "0052", "format": "M an..3"}]},
+    ]},
+    {"segment": "BGM", "elements": [
+        {"champ": "1001", "format": "M an..3", "usage": "380 = Commercial invoice\n381 = Credit note"},
+        {"champ": "1004", "format": "M an..35"},
+        {"champ": "1225", "format": "C an..3"},
+    ]},
+    {"segment": "FTX", "elements": [
+        {"champ": "4451", "format": "M an..3"},
+        {"champ": "4440", "format": "C an..10"},
+    ]},
+]
+
+VALID = "UNH+1+INVOIC:D'BGM+380+DOC1'FTX+AAI+A?+B?'C'UNT+4+1'"
+
+
+def _errors(results):
+    return [(error["path"], error["error"]) for result in results for error in result["errors"]]
+
+
+def test_valid_message():
+    results = MessageValidator(GUIDE).validate(VALID)
+    assert [(result["reference"], result["type"], result["segments"], result["valid"]) for result in results] == [
+        ("1", "INVOIC", 4, True)]
+
+
+def test_una_custom_separators():
+    data = "UNA|*,! \"UNH*1*INVOIC|D\"BGM*380*DOC!*1\"FTX*AAI*A!\"B\"UNT*4*1\""
+    results = MessageValidator(GUIDE).validate(data)
+    assert _errors(results) == []
+    assert results[0]["segments"] == 4
+
+    overlong = data.replace("DOC!*1", "D" * 36)
+    assert _errors(MessageValidator(GUIDE).validate(overlong)) == [("BGM/1004", ERROR_LENGTH)]
+
+
+def test_release_character_across_chunk_boundary():
+    validator = MessageValidator(GUIDE)
+    expected = validator.validate(VALID)
+    for split in range(1, len(VALID)):
+        assert list(validator.iter_messages([VALID[:split], VALID[split:]])) == expected, split
+    # "A?+B?'C" : 5 caractères une fois les échappements retirés, pas deux éléments
+    assert _errors(expected) == []
+
+
+def test_release_escapes_value_length():
+    data = VALID.replace("A?+B?'C", "ABCDEFGHI?'")
+    assert _errors(MessageValidator(GUIDE).validate(data)) == []
+    data = VALID.replace("A?+B?'C", "ABCDEFGHIJ?'")
+    assert _errors(MessageValidator(GUIDE).validate(data)) == [("FTX/4440", ERROR_LENGTH)]
+
+
+def test_missing_mandatory_element():
+    data = VALID.replace("BGM+380+DOC1", "BGM+380")
+    assert _errors(MessageValidator(GUIDE).validate(data)) == [("BGM/1004", ERROR_MISSING)]
+
+
+def test_missing_mandatory_component():
+    data = VALID.replace("INVOIC:D", "INVOIC")
+    assert _errors(MessageValidator(GUIDE).validate(data)) == [("UNH/S009/0052", ERROR_MISSING)]
+
+
+def test_element_over_max_length():
+    data = VALID.replace("DOC1", "D" * 36)
+    results = MessageValidator(GUIDE).validate(data)
+    assert _errors(results) == [("BGM/1004", ERROR_LENGTH)]
+    assert not results[0]["valid"]
+
+
+def test_unt_segment_count_mismatch():
+    data = VALID.replace("UNT+4+1", "UNT+3+1")
+    assert _errors(MessageValidator(GUIDE).validate(data)) == [("UNT/0074", ERROR_SEGMENT_COUNT)]
+
+
+def test_code_not_in_code_list():
+    code_lists = CodeListIndex.from_segments(GUIDE)
+    validator = MessageValidator(GUIDE, code_lists=code_lists)
+    assert _errors(validator.validate(VALID)) == []
+    assert _errors(validator.validate(VALID.replace("BGM+380", "BGM+999"))) == [("BGM/1001", ERROR_CODE)]
+    # Sans listes de codes, le qualifiant n'est contrôlé que par son format
+    assert _errors(MessageValidator(GUIDE).validate(VALID.replace("BGM+380", "BGM+999"))) == []
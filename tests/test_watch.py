@@ -0,0 +1,83 @@
+"""Surveillance de schema/ : fichiers stables, exports à jour, --once"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import edi_watch
+import extract_all_pdfs
+from edi_watch import SchemaWatcher
+
+
+def _pdf(schema_dir, name, age):
+    """PDF modifié il y a `age` secondes"""
+    path = schema_dir / name
+    path.write_bytes(b"%PDF-1.4")
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _schema(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    schema_dir = tmp_path / "schema"
+    schema_dir.mkdir()
+    return schema_dir
+
+
+def test_unsettled_file_is_not_queued(tmp_path, monkeypatch):
+    schema_dir = _schema(tmp_path, monkeypatch)
+    settled = _pdf(schema_dir, "settled.pdf", 60)
+    writing = _pdf(schema_dir, "writing.pdf", 0)
+    watcher = SchemaWatcher(schema_dir, settle=30)
+    watcher.scan(initial=True)
+    assert list(watcher.pending) == [settled]
+    assert watcher.unsettled == {writing}
+
+    mtime = time.time() - 60
+    os.utime(writing, (mtime, mtime))
+    watcher.scan()
+    assert set(watcher.pending) == {settled, writing}
+    assert watcher.unsettled == set()
+
+
+def test_current_export_skipped_at_initial_scan(tmp_path, monkeypatch):
+    schema_dir = _schema(tmp_path, monkeypatch)
+    current = _pdf(schema_dir, "current.pdf", 120)
+    stale = _pdf(schema_dir, "stale-guide.pdf", 60)
+    (tmp_path / "export").mkdir()
+    for name, age in (("current.json", 90), ("stale_guide.json", 90)):
+        export_path = tmp_path / "export" / name
+        export_path.write_text("[]", encoding="utf-8")
+        mtime = time.time() - age
+        os.utime(export_path, (mtime, mtime))
+
+    watcher = SchemaWatcher(schema_dir, settle=1)
+    watcher.scan(initial=True)
+    assert list(watcher.pending) == [stale]
+    assert current in watcher.processed
+
+    # Après le démarrage, une modification remet le PDF en file, export à jour ou non
+    mtime = time.time() - 30
+    os.utime(current, (mtime, mtime))
+    watcher.scan()
+    assert set(watcher.pending) == {current, stale}
+
+
+def test_once_waits_for_file_being_written(tmp_path, monkeypatch):
+    schema_dir = _schema(tmp_path, monkeypatch)
+    _pdf(schema_dir, "writing.pdf", 0)
+    extracted = []
+
+    def process_one(pdf_file, capture_output=False, verbosity=1, **process_options):
+        extracted.append(pdf_file.name)
+        return {'file': pdf_file.name, 'status': 'SUCCESS', 'duration': 0.0}
+
+    monkeypatch.setattr(extract_all_pdfs, "_process_one", process_one)
+    monkeypatch.setattr(edi_watch, "make_process_pool", lambda jobs, *args: ThreadPoolExecutor(jobs))
+    watcher = SchemaWatcher(schema_dir, interval=0.05, settle=0.3, verbosity=0)
+    assert watcher.run(once=True) == {'SUCCESS': 1, 'FAILED': 0}
+    assert extracted == ["writing.pdf"]
@@ -0,0 +1,74 @@
+"""Moteur de tableaux par mots (edi_words) : mêmes lignes que extract_tables() sur un guide tracé"""
+
+import sys
+from pathlib import Path
+
+import pdfplumber
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import synthetic
+from edi_rows import FORMAT_SPECS
+from edi_words import LayoutMismatch, WordTableEngine, ruled_tables, word_tables
+from extract_edi_adaptive import _region_bbox
+
+
+def _pdf(tmp_path, fmt, spec_pages=3, filler_pages=0):
+    guideline = synthetic.make_guideline(fmt, spec_pages, filler_pages, seed=7)
+    return synthetic.write_pdf(guideline, tmp_path / f"{fmt}.pdf"), guideline
+
+
+@pytest.mark.parametrize("fmt", synthetic.FORMATS)
+def test_word_tables_match_ruled_tables(tmp_path, fmt):
+    pdf_path, _ = _pdf(tmp_path, fmt)
+    spec = FORMAT_SPECS[fmt]
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            bbox = _region_bbox(page, spec)
+            expected = ruled_tables(page, bbox, spec.table_settings)
+            tables, layouts = word_tables(page, bbox)
+            assert expected and tables == expected
+            assert [layout[0] for layout in layouts] == [len(synthetic.COLUMN_WIDTHS[fmt])]
+
+
+def test_engine_fast_path_after_learning(tmp_path):
+    pdf_path, _ = _pdf(tmp_path, "faurecia", spec_pages=4)
+    spec = FORMAT_SPECS["faurecia"]
+    engine = WordTableEngine(learn_pages=1)
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            bbox = _region_bbox(page, spec)
+            assert engine.extract_tables(page, bbox, spec.table_settings) == ruled_tables(page, bbox, spec.table_settings)
+    assert engine.stats["pages_learned"] == 1
+    assert engine.stats["pages_fast"] == 3
+    assert not engine.disabled
+
+
+def test_page_without_rulings_falls_back(tmp_path):
+    pdf_path, guideline = _pdf(tmp_path, "faurecia", spec_pages=1, filler_pages=1)
+    spec = FORMAT_SPECS["faurecia"]
+    engine = WordTableEngine(learn_pages=0)
+    with pdfplumber.open(pdf_path) as pdf:
+        page = pdf.pages[guideline["layout"].index(None)]
+        with pytest.raises(LayoutMismatch):
+            word_tables(page, None)
+        assert engine.extract_tables(page, None, spec.table_settings) == ruled_tables(page, None, spec.table_settings)
+    assert engine.stats["pages_fast"] == 0
+    assert engine.stats["fallback_reasons"] == {"sans filets": 1}
+
+
+def test_unverified_pdfplumber_series_falls_back(tmp_path, monkeypatch):
+    import edi_words
+
+    monkeypatch.setattr(edi_words, "PDFPLUMBER_VERIFIED", False)
+    pdf_path, _ = _pdf(tmp_path, "faurecia", spec_pages=2)
+    spec = FORMAT_SPECS["faurecia"]
+    engine = WordTableEngine(learn_pages=0)
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            bbox = _region_bbox(page, spec)
+            assert engine.extract_tables(page, bbox, spec.table_settings) == ruled_tables(page, bbox, spec.table_settings)
+    assert engine.stats["pages_fast"] == 0
+    assert engine.stats["fallback_reasons"] == {f"pdfplumber {edi_words.PDFPLUMBER_SERIES} non vérifié": 2}